@@ -0,0 +1,204 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from .config import (RATE_LIMIT_BACKEND, RATE_LIMIT_USER_RATE, RATE_LIMIT_USER_BURST, RATE_LIMIT_GLOBAL_RATE,
+                     RATE_LIMIT_GLOBAL_BURST, LLM_MAX_CONCURRENCY, LLM_MAX_QUEUE, LLM_QUEUE_TIMEOUT, REDIS_URL)
+from .metrics import REGISTRY, Counter, Histogram
+
+# Overload protection for the LLM path, in two layers:
+#   RateLimiter    token buckets per user and for the whole deployment (shared through
+#                  Redis when RATE_LIMIT_BACKEND=redis), checked before any work is done
+#   AdmissionGate  at most LLM_MAX_CONCURRENCY provider calls in flight per process and
+#                  a bounded queue with a deadline in front of them
+# Both fail fast with Overloaded -> 429 + Retry-After, so admitted requests keep a
+# predictable latency instead of everyone queueing behind provider 429s.
+
+ADMISSION_REJECTED = REGISTRY.register(Counter(
+    "admission_rejected_total", "Chat requests turned away with 429", ("reason",)))
+ADMISSION_WAIT_SECONDS = REGISTRY.register(Histogram(
+    "admission_wait_seconds", "Time admitted requests queued for an LLM slot"))
+
+
+class Overloaded(RuntimeError):
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"overloaded: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class InMemoryBucketBackend:
+    # per-process buckets; idle ones are dropped once they would be full again anyway
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: dict[str, tuple[float, float]] = {}  # key -> (tokens, updated_at)
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> tuple[bool, float]:
+        # -> (allowed, seconds until `cost` tokens are available)
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= cost:
+            self._buckets[key] = (tokens - cost, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return True, 0.0
+        self._buckets[key] = (tokens, now)
+        return False, (cost - tokens) / rate
+
+    def _prune(self, now: float):
+        # a bucket idle for burst/rate seconds is full again, same as a missing one;
+        # rates aren't stored per key, so anything idle for an hour goes
+        stale = [k for k, (_, updated) in self._buckets.items() if now - updated > 3600]
+        for k in stale:
+            del self._buckets[k]
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "buckets": len(self._buckets)}
+
+
+# refill + take in one atomic step, on the Redis server clock so workers agree
+_TAKE_LUA = """
+local rate, burst, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local v = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(v[1]) or burst
+local ts = tonumber(v[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed, wait = 0, 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(wait)}
+"""
+
+
+class RedisBucketBackend:
+    # shared across workers; `client` is anything with redis.asyncio's eval
+    def __init__(self, client, prefix: str = "miko:rl:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: float, cost: float = 1.0) -> tuple[bool, float]:
+        allowed, wait = await self.client.eval(_TAKE_LUA, 1, self.prefix + key, rate, burst, cost)
+        return bool(int(allowed)), float(wait)
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+class RateLimiter:
+    def __init__(self, backend, user_rate: float = RATE_LIMIT_USER_RATE, user_burst: float = RATE_LIMIT_USER_BURST,
+                 global_rate: float = RATE_LIMIT_GLOBAL_RATE, global_burst: float = RATE_LIMIT_GLOBAL_BURST):
+        # backend None = no limits; a rate <= 0 switches that bucket off
+        self.backend = backend
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+
+    async def check(self, user_id: str):
+        if self.backend is None:
+            return
+        # user first, so one noisy user is turned away without draining the shared bucket
+        if self.user_rate > 0:
+            ok, wait = await self.backend.take(f"user:{user_id}", self.user_rate, self.user_burst)
+            if not ok:
+                ADMISSION_REJECTED.inc(reason="user_rate")
+                raise Overloaded("user_rate", wait)
+        if self.global_rate > 0:
+            ok, wait = await self.backend.take("global", self.global_rate, self.global_burst)
+            if not ok:
+                ADMISSION_REJECTED.inc(reason="global_rate")
+                raise Overloaded("global_rate", wait)
+
+    def stats(self) -> dict:
+        if self.backend is None:
+            return {"backend": "off"}
+        return {"user_rate": self.user_rate, "user_burst": self.user_burst, "global_rate": self.global_rate,
+                "global_burst": self.global_burst, **self.backend.stats()}
+
+
+class AdmissionGate:
+    # Semaphore with a bounded, deadline-limited queue. Retry-After for a full queue
+    # comes from recent slot hold times: roughly when the queue ahead will have drained.
+    def __init__(self, max_concurrent: int = LLM_MAX_CONCURRENCY, max_queue: int = LLM_MAX_QUEUE,
+                 queue_timeout: float = LLM_QUEUE_TIMEOUT):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._sem = asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
+        self.inflight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self._hold = deque(maxlen=200)
+
+    def _drain_estimate(self) -> float:
+        hold = sum(self._hold) / len(self._hold) if self._hold else 1.0
+        return hold * (self.waiting + 1) / max(1, self.max_concurrent)
+
+    async def acquire(self) -> float | None:
+        # -> token for release(); raises Overloaded when the queue is full or too slow
+        if self._sem is None:
+            return None
+        if self._sem.locked():
+            if self.waiting >= self.max_queue:
+                ADMISSION_REJECTED.inc(reason="queue_full")
+                raise Overloaded("queue_full", self._drain_estimate())
+        t0 = time.perf_counter()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._sem.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            ADMISSION_REJECTED.inc(reason="queue_timeout")
+            raise Overloaded("queue_timeout", self._drain_estimate())
+        finally:
+            self.waiting -= 1
+        ADMISSION_WAIT_SECONDS.observe(time.perf_counter() - t0)
+        self.inflight += 1
+        self.admitted += 1
+        return time.perf_counter()
+
+    def release(self, acquired_at: float | None):
+        if self._sem is None:
+            return
+        self.inflight -= 1
+        if acquired_at is not None:
+            self._hold.append(time.perf_counter() - acquired_at)
+        self._sem.release()
+
+    @asynccontextmanager
+    async def slot(self):
+        acquired_at = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(acquired_at)
+
+    def stats(self) -> dict:
+        return {"max_concurrent": self.max_concurrent, "inflight": self.inflight, "waiting": self.waiting,
+                "max_queue": self.max_queue, "admitted": self.admitted}
+
+
+def make_rate_limiter(kind: str = RATE_LIMIT_BACKEND) -> RateLimiter:
+    if kind == "off":
+        return RateLimiter(None)
+    if kind == "redis":
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs `pip install redis`")
+        return RateLimiter(RedisBucketBackend(aioredis.from_url(REDIS_URL)))
+    if kind == "memory":
+        return RateLimiter(InMemoryBucketBackend())
+    raise RuntimeError(f"Unknown RATE_LIMIT_BACKEND: {kind}")
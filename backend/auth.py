@@ -1,56 +1,203 @@
 from pathlib import Path
-import sqlite3, uuid
-from passlib.hash import pbkdf2_sha256
+from contextlib import contextmanager
+import asyncio, queue, sqlite3, threading, time, uuid
+from .sessions import make_session_store
+from .hashing import PasswordHasher
+from .config import AUTH_DB_POOL_SIZE, AUTH_DB_BUSY_TIMEOUT_MS
 
 AUTH_DB_PATH = Path(__file__).resolve().parent.parent / "auth.db"
 # backend/auth.py -> parent.parent = project root
-SESSIONS = {}  # session_token -> user_id (hackathon only)
-
-def init_auth_db():
-    conn = sqlite3.connect(AUTH_DB_PATH, timeout=10)
-    print("AUTH_DB_PATH =", AUTH_DB_PATH)
-    cur = conn.cursor()
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users (
-        user_id TEXT PRIMARY KEY,
-        username TEXT UNIQUE,
-        password_hash TEXT
-    )
-    """)
-    conn.commit()
-    conn.close()
-
-def create_user(username: str, password: str) -> str:
+SESSION_STORE = None  # created on first use, see backend/sessions.py
+PASSWORD_HASHER = PasswordHasher()
+
+def session_store():
+    global SESSION_STORE
+    if SESSION_STORE is None:
+        SESSION_STORE = make_session_store()
+    return SESSION_STORE
+
+
+class AuthDBBusy(RuntimeError):
+    # no pooled connection came free, or sqlite stayed locked through every retry
+    pass
+
+
+class SQLitePool:
+    # Fixed-size pool of WAL-mode connections shared by threadpool workers.
+    # sqlite3 caches compiled statements per connection (cached_statements), so
+    # reusing connections with constant SQL strings reuses prepared statements.
+    def __init__(self, path, size: int = AUTH_DB_POOL_SIZE, busy_timeout_ms: int = AUTH_DB_BUSY_TIMEOUT_MS):
+        self.path = path
+        self.size = size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle = queue.LifoQueue()
+        self._created = 0  # open connections, idle or checked out
+        self._generation = 0  # bumped by close(): connections out at the time close on return
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None,
+                               check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        generation = self._generation
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._created < self.size
+                if grow:
+                    self._created += 1
+            if grow:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                try:
+                    conn = self._idle.get(timeout=self.busy_timeout_ms / 1000)
+                except queue.Empty:
+                    raise AuthDBBusy("auth database connection pool exhausted")
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                stale = generation != self._generation
+                if stale:
+                    self._created -= 1
+            if stale:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            self._generation += 1
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                conn.close()
+                self._created -= 1
+
+
+def _retry_busy(fn, attempts: int = 5):
+    # busy_timeout covers most contention; retry the rare "database is locked" that escapes it
+    for i in range(attempts):
+        try:
+            return fn()
+        except sqlite3.OperationalError as e:
+            if "locked" not in str(e) and "busy" not in str(e):
+                raise
+            if i == attempts - 1:
+                raise AuthDBBusy(f"auth database busy: {e}") from e
+            time.sleep(0.01 * 2 ** i)
+
+
+class AuthRepository:
+    INSERT_USER = "INSERT INTO users(user_id, username, password_hash) VALUES(?,?,?)"
+    SELECT_USER = "SELECT user_id, password_hash FROM users WHERE username=?"
+    UPDATE_HASH = "UPDATE users SET password_hash=? WHERE user_id=?"
+
+    def __init__(self, path, pool_size: int = AUTH_DB_POOL_SIZE):
+        self.pool = SQLitePool(path, size=pool_size)
+
+    def init_schema(self):
+        with self.pool.connection() as conn:
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                user_id TEXT PRIMARY KEY,
+                username TEXT UNIQUE,
+                password_hash TEXT
+            )
+            """)
+
+    def insert_user(self, user_id: str, username: str, pw_hash: str):
+        def run():
+            with self.pool.connection() as conn:
+                conn.execute(self.INSERT_USER, (user_id, username, pw_hash))
+        _retry_busy(run)
+
+    def get_credentials(self, username: str) -> tuple[str, str] | None:
+        def run():
+            with self.pool.connection() as conn:
+                return conn.execute(self.SELECT_USER, (username,)).fetchone()
+        return _retry_busy(run)
+
+    def update_password_hash(self, user_id: str, pw_hash: str):
+        def run():
+            with self.pool.connection() as conn:
+                conn.execute(self.UPDATE_HASH, (pw_hash, user_id))
+        _retry_busy(run)
+
+    def close(self):
+        self.pool.close()
+
+
+_repo = None
+
+def auth_repo() -> AuthRepository:
+    global _repo
+    if _repo is None:
+        _repo = AuthRepository(AUTH_DB_PATH)
+    return _repo
+
+def init_auth_db() -> Path:
+    auth_repo().init_schema()
+    return AUTH_DB_PATH
+
+# hashing runs in PASSWORD_HASHER's process pool, sqlite in a thread;
+# they raise HasherBusy / AuthDBBusy when the hashing queue / the database is saturated
+async def create_user(username: str, password: str) -> str:
     user_id = str(uuid.uuid4())
-    pw_hash = pbkdf2_sha256.hash(password)
-
-    conn = sqlite3.connect(AUTH_DB_PATH, timeout=10)
-    cur = conn.cursor()
-    cur.execute("INSERT INTO users(user_id, username, password_hash) VALUES(?,?,?)",
-                (user_id, username, pw_hash))
-    conn.commit()
-    conn.close()
+    pw_hash = await PASSWORD_HASHER.hash(password)
+    await asyncio.to_thread(auth_repo().insert_user, user_id, username, pw_hash)
     return user_id
 
-def verify_user(username: str, password: str) -> str | None:
-    conn = sqlite3.connect(AUTH_DB_PATH, timeout=10)
-    cur = conn.cursor()
-    cur.execute("SELECT user_id, password_hash FROM users WHERE username=?", (username,))
-    row = cur.fetchone()
-    conn.close()
+async def verify_user(username: str, password: str) -> str | None:
+    row = await asyncio.to_thread(auth_repo().get_credentials, username)
     if not row:
         return None
     user_id, pw_hash = row
-    return user_id if pbkdf2_sha256.verify(password, pw_hash) else None
+    ok, needs_rehash = await PASSWORD_HASHER.verify(password, pw_hash)
+    if not ok:
+        return None
+    if needs_rehash:
+        # cost parameters changed since this hash was made: upgrade it off the login path
+        task = asyncio.create_task(_rehash(user_id, password))
+        _rehash_tasks.add(task)
+        task.add_done_callback(_rehash_tasks.discard)
+    return user_id
+
+_rehash_tasks: set[asyncio.Task] = set()
+
+async def _rehash(user_id: str, password: str):
+    # best effort: a failure (HasherBusy included) leaves the old hash for the next login
+    try:
+        new_hash = await PASSWORD_HASHER.hash(password)
+        await asyncio.to_thread(auth_repo().update_password_hash, user_id, new_hash)
+        PASSWORD_HASHER.rehashed += 1
+    except Exception as e:
+        print("password rehash failed:", user_id, e)
+
+async def drain_rehashes(timeout: float):
+    if _rehash_tasks:
+        await asyncio.wait(list(_rehash_tasks), timeout=timeout)
 
 def new_session(user_id: str) -> str:
-    # invalidate old tokens for this user
-    for t, uid in list(SESSIONS.items()):
-        if uid == user_id:
-            del SESSIONS[t]
-    token = str(uuid.uuid4())
-    SESSIONS[token] = user_id
-    return token
+    # invalidates old tokens for this user
+    return session_store().create(user_id)
 
 def user_from_session(token: str) -> str | None:
-    return SESSIONS.get(token)
\ No newline at end of file
+    return session_store().get(token)
+
+def sweep_sessions() -> int:
+    return session_store().sweep()
@@ -0,0 +1,41 @@
+import argparse
+import sys
+from .consolidation import text_hash, simhash
+from .embeddings import get_embedder
+from .neo4j_client import Neo4jClient
+
+# Embed memories written before semantic retrieval existed, then store dedup
+# fingerprints (text_hash / simhash) for nodes written before those were persisted:
+# python -m backend.backfill_embeddings --batch-size 1000
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compute embeddings and dedup fingerprints for Memory nodes that have none")
+    ap.add_argument("--batch-size", type=int, default=1000)
+    args = ap.parse_args(argv)
+
+    embedder = get_embedder()
+    neo = Neo4jClient()
+    total = fingerprinted = 0
+    try:
+        while True:
+            rows = neo.memories_missing_embeddings(limit=args.batch_size)
+            if not rows:
+                break
+            vecs = embedder.embed_many([r["text"] or "" for r in rows])
+            neo.set_embeddings([{"memory_id": r["memory_id"], "embedding": v} for r, v in zip(rows, vecs)])
+            total += len(rows)
+            print(f"embedded {total} memories", file=sys.stderr)
+        while True:
+            rows = neo.memories_missing_fingerprints(limit=args.batch_size)
+            if not rows:
+                break
+            # embeddings are all in place by now; coalesce keeps them
+            neo.set_fingerprints([{"memory_id": r["memory_id"], "text_hash": text_hash(r["text"] or ""),
+                                   "simhash": simhash(r["text"] or ""), "embedding": None} for r in rows])
+            fingerprinted += len(rows)
+            print(f"fingerprinted {fingerprinted} memories", file=sys.stderr)
+    finally:
+        neo.close()
+
+if __name__ == "__main__":
+    main()
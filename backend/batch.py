@@ -0,0 +1,100 @@
+import asyncio
+import json
+from .metrics import REGISTRY, Counter
+
+# /chat/batch pipeline: JSONL lines in, result dicts out in completion order.
+#   input   {"user_id": "...", "message": "...", "id": ...}; id defaults to the line's
+#           0-based position in the request, results carry it back
+#   lines are taken chunk_size at a time and grouped by user: `prepare(user_id, items)`
+#   runs once per user and chunk (one memory load, one embedding pass), then
+#   `answer(item)` runs per item with at most `concurrency` in flight. The next chunk
+#   is prepared while the current one is being answered.
+
+BATCH_ITEMS = REGISTRY.register(Counter("chat_batch_items_total", "Batch chat items processed", ("status",)))
+
+_DONE = object()
+
+
+def parse_item(n: int, line: str | bytes) -> dict:
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return {"id": n, "status": "error", "error": "invalid JSON"}
+    if not isinstance(obj, dict):
+        return {"id": n, "status": "error", "error": "expected a JSON object"}
+    item = {"id": obj.get("id", n), "user_id": obj.get("user_id"), "message": (obj.get("message") or "").strip()}
+    if not item["user_id"] or not item["message"]:
+        return error_result(item, "user_id and message are required")
+    return item
+
+
+def error_result(item: dict, error: str) -> dict:
+    return {"id": item["id"], "user_id": item.get("user_id"), "status": "error", "error": error}
+
+
+async def run_batch(lines: list, prepare, answer, concurrency: int = 8, chunk_size: int = 256):
+    # async generator of result dicts, one per non-blank input line
+    out: asyncio.Queue = asyncio.Queue()
+    work: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    prep_slots = asyncio.Semaphore(concurrency)
+
+    async def prepare_user(user_id: str, items: list[dict]):
+        async with prep_slots:
+            try:
+                await prepare(user_id, items)
+            except Exception as e:
+                for item in items:
+                    await out.put(error_result(item, f"retrieval failed: {e}"))
+                return
+        for item in items:
+            await work.put(item)
+
+    async def prepare_chunk(chunk: list[dict]):
+        groups: dict[str, list[dict]] = {}
+        for item in chunk:
+            groups.setdefault(item["user_id"], []).append(item)
+        await asyncio.gather(*(prepare_user(uid, items) for uid, items in groups.items()))
+
+    async def produce():
+        try:
+            chunk = []
+            for n, line in enumerate(lines):
+                if not line.strip():
+                    continue
+                item = parse_item(n, line)
+                if "error" in item:
+                    await out.put(item)
+                    continue
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    await prepare_chunk(chunk)
+                    chunk = []
+            if chunk:
+                await prepare_chunk(chunk)
+        finally:
+            for _ in range(concurrency):
+                await work.put(None)
+
+    async def worker():
+        while (item := await work.get()) is not None:
+            try:
+                res = await answer(item)
+            except Exception as e:
+                res = error_result(item, str(e))
+            await out.put(res)
+
+    async def run():
+        try:
+            await asyncio.gather(produce(), *(worker() for _ in range(concurrency)))
+        finally:
+            await out.put(_DONE)
+
+    runner = asyncio.create_task(run())
+    try:
+        while (res := await out.get()) is not _DONE:
+            BATCH_ITEMS.inc(status=res.get("status", "ok"))
+            yield res
+        await runner  # surfaces a crash in the pipeline itself
+    finally:
+        # client went away: stop feeding the LLM
+        runner.cancel()
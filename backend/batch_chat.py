@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import sys
+import time
+import httpx
+
+# Replay stored messages through /chat/batch:
+# python -m backend.batch_chat messages.jsonl -o results.jsonl --url http://localhost:8000
+# Each input line: {"user_id": "...", "message": "...", "id": "..."}; id defaults to the
+# 0-based line number of the input file. The key comes from --key or BATCH_API_KEY.
+#
+# The output file is the checkpoint: every result is appended and flushed as it arrives,
+# and a rerun with the same -o skips ids that already have an "ok" result (failed ones
+# are retried). Input is sent in windows of --window lines, one request each.
+
+def load_done(path: str) -> set:
+    # ids with an ok result; a torn last line from a crash is cut off so appends stay valid JSONL
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                res = json.loads(line)
+            except ValueError:
+                continue
+            if res.get("status") == "ok":
+                done.add(_key(res.get("id")))
+    return done
+
+def _key(id_) -> str:
+    # ids round-trip through JSON, so compare them in their JSON form
+    return json.dumps(id_)
+
+def pending_items(lines, done: set):
+    for n, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            obj = None
+        if not isinstance(obj, dict):
+            print(f"line {n}: not a JSON object, skipped", file=sys.stderr)
+            continue
+        obj.setdefault("id", n)
+        if _key(obj["id"]) not in done:
+            yield obj
+
+def _windows(items, size: int):
+    window = []
+    for item in items:
+        window.append(item)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+def run_window(client: httpx.Client, window: list[dict], out, params: dict, retries: int) -> dict:
+    # one request per attempt; items answered before a dropped connection are not re-sent
+    stats = {"ok": 0, "error": 0}
+    remaining = {_key(it["id"]): it for it in window}
+    for attempt in range(retries + 1):
+        body = "".join(json.dumps(it) + "\n" for it in remaining.values())
+        try:
+            with client.stream("POST", "/chat/batch", content=body, params=params) as r:
+                if r.status_code in (401, 403, 413):
+                    r.read()
+                    raise SystemExit(f"/chat/batch: {r.status_code} {r.text}")
+                r.raise_for_status()
+                for line in r.iter_lines():
+                    if not line:
+                        continue
+                    res = json.loads(line)
+                    out.write(line + "\n")
+                    out.flush()
+                    stats[res.get("status", "ok")] = stats.get(res.get("status", "ok"), 0) + 1
+                    remaining.pop(_key(res.get("id")), None)
+            if not remaining:
+                break
+        except httpx.HTTPError as e:
+            print(f"window failed ({e}), {len(remaining)} left", file=sys.stderr)
+        if attempt < retries:
+            time.sleep(min(30, 2 ** attempt))
+    stats["unanswered"] = len(remaining)
+    return stats
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run a JSONL file of (user_id, message) through /chat/batch")
+    ap.add_argument("path", help="JSONL file, or - for stdin")
+    ap.add_argument("-o", "--out", required=True, help="results JSONL, also the resume checkpoint")
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--key", default=os.getenv("BATCH_API_KEY", ""), help="X-Batch-Key (default: $BATCH_API_KEY)")
+    ap.add_argument("--window", type=int, default=500, help="lines per request")
+    ap.add_argument("--concurrency", type=int, help="LLM calls in flight (capped by the server's BATCH_CONCURRENCY)")
+    ap.add_argument("--store-memories", action="store_true", help="persist extracted memories (backfill)")
+    ap.add_argument("--bypass-cache", action="store_true", help="skip the LLM response cache")
+    ap.add_argument("--retries", type=int, default=3, help="per window, after a dropped connection")
+    args = ap.parse_args(argv)
+
+    done = load_done(args.out)
+    if done:
+        print(f"resuming: {len(done)} results already in {args.out}", file=sys.stderr)
+    params = {"store_memories": str(args.store_memories).lower(), "bypass_cache": str(args.bypass_cache).lower()}
+    if args.concurrency:
+        params["concurrency"] = args.concurrency
+
+    f = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    totals = {"ok": 0, "error": 0, "unanswered": 0}
+    t0 = time.perf_counter()
+    try:
+        with httpx.Client(base_url=args.url, headers={"X-Batch-Key": args.key}, timeout=httpx.Timeout(60, read=600)) \
+                as client, open(args.out, "a", encoding="utf-8") as out:
+            for window in _windows(pending_items(f, done), args.window):
+                for k, v in run_window(client, window, out, params, args.retries).items():
+                    totals[k] = totals.get(k, 0) + v
+                n = totals["ok"] + totals["error"]
+                print(f"{n} results ({n / (time.perf_counter() - t0):.1f}/s), {totals['error']} errors, "
+                      f"{totals['unanswered']} unanswered", file=sys.stderr)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    if totals["error"] or totals["unanswered"]:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
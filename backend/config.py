@@ -1,14 +1,159 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
-load_dotenv()
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# explicit path: no directory walk from the caller's frame on every import
+load_dotenv(os.getenv("DOTENV_PATH") or PROJECT_ROOT / ".env")
 
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
+NEO4J_POOL_SIZE = int(os.getenv("NEO4J_POOL_SIZE", "100"))
+# the API boots without Neo4j: it connects in the background (backoff up to NEO4J_RETRY_MAX
+# seconds), then re-checks every NEO4J_HEALTH_INTERVAL seconds for /health/ready
+NEO4J_CONNECT_TIMEOUT = float(os.getenv("NEO4J_CONNECT_TIMEOUT", "5"))
+NEO4J_RETRY_MAX = float(os.getenv("NEO4J_RETRY_MAX", "30"))
+NEO4J_HEALTH_INTERVAL = float(os.getenv("NEO4J_HEALTH_INTERVAL", "15"))
 
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+GROQ_URL = os.getenv("GROQ_URL", "https://api.groq.com/openai/v1/chat/completions")
 
 GEMINI_API_KEY = os.getenv("API_KEY")  # from .env
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+GEMINI_URL = os.getenv("GEMINI_URL", f"https://generativelanguage.googleapis.com/v1beta/models/{GEMINI_MODEL}:generateContent")
+
+# shared keep-alive pool for outbound LLM calls (async path)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "200"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "50"))
+
+# write-behind queue for extracted memories
+MEMORY_WRITE_QUEUE_SIZE = int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", "1000"))
+MEMORY_WRITE_BATCH = int(os.getenv("MEMORY_WRITE_BATCH", "50"))
+MEMORY_WRITE_PUT_TIMEOUT = float(os.getenv("MEMORY_WRITE_PUT_TIMEOUT", "0.5"))
+MEMORY_WRITE_FLUSH_TIMEOUT = float(os.getenv("MEMORY_WRITE_FLUSH_TIMEOUT", "10"))
+
+# memory retrieval: "hashing" runs fully offline, "sentence-transformers" needs the package + model
+EMBEDDER = os.getenv("EMBEDDER", "hashing")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+RETRIEVAL_LIMIT = int(os.getenv("RETRIEVAL_LIMIT", "12"))
+# "graph": messages that mention known skills/topics/companies are ranked in Neo4j by
+# similarity + entity overlap (MENTIONS / PART_OF, see backend/entities.py); "vector" = similarity only
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "vector")
+GRAPH_WEIGHT = float(os.getenv("GRAPH_WEIGHT", "0.3"))  # score boost for a full entity match
+GRAPH_NEAR_WEIGHT = float(os.getenv("GRAPH_NEAR_WEIGHT", "0.5"))  # an entity reached over PART_OF counts this much
+GRAPH_MAX_HOPS = 2  # PART_OF hops from the message's entities (skill -> topic -> sibling skills)
+ENTITY_MAX_PER_MEMORY = int(os.getenv("ENTITY_MAX_PER_MEMORY", "8"))
+
+# per-user memory cache in front of Neo4j: "memory" (per worker), "redis" (shared) or "off"
+MEMORY_CACHE_BACKEND = os.getenv("MEMORY_CACHE_BACKEND", "memory")
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+MEMORY_CACHE_TTL = float(os.getenv("MEMORY_CACHE_TTL", "300"))
+MEMORY_CACHE_MAX_PER_USER = int(os.getenv("MEMORY_CACHE_MAX_PER_USER", "2000"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# near-duplicate detection for memories
+DEDUP_SIMHASH_MAX_DISTANCE = int(os.getenv("DEDUP_SIMHASH_MAX_DISTANCE", "3"))
+DEDUP_COSINE_THRESHOLD = float(os.getenv("DEDUP_COSINE_THRESHOLD", "0.9"))
+
+# prompt assembly (tokens, see backend/prompt.py)
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))
+PROMPT_MESSAGE_MAX_TOKENS = int(os.getenv("PROMPT_MESSAGE_MAX_TOKENS", "800"))
+PROMPT_MEMORY_LINE_MAX_TOKENS = int(os.getenv("PROMPT_MEMORY_LINE_MAX_TOKENS", "80"))
+PROMPT_HISTORY_MAX_TOKENS = int(os.getenv("PROMPT_HISTORY_MAX_TOKENS", "600"))  # summary + recent turns
+PROMPT_TURN_MAX_TOKENS = int(os.getenv("PROMPT_TURN_MAX_TOKENS", "150"))
+PROMPT_SUMMARY_MAX_TOKENS = int(os.getenv("PROMPT_SUMMARY_MAX_TOKENS", "250"))
+
+# opt-in LLM response cache (SQLite on disk, survives restarts)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "0") == "1"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(PROJECT_ROOT / "llm_cache.db"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+
+# chat pipeline: "single" = one call returns answer + memories; "split" = answer-only call
+# (smaller prompt / max_tokens) while a dedicated extraction call runs concurrently and its
+# memories are stored after the response
+CHAT_PIPELINE = os.getenv("CHAT_PIPELINE", "single")
+LLM_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "900"))
+LLM_ANSWER_MAX_TOKENS = int(os.getenv("LLM_ANSWER_MAX_TOKENS", "600"))
+EXTRACTOR = os.getenv("EXTRACTOR", "gemini")  # "gemini" or "groq" (EXTRACT_GROQ_MODEL)
+EXTRACT_GROQ_MODEL = os.getenv("EXTRACT_GROQ_MODEL", "llama-3.1-8b-instant")
+EXTRACT_TIMEOUT = float(os.getenv("EXTRACT_TIMEOUT", "20"))
+
+# provider routing (backend/llm_providers.py); providers are tried in this order
+LLM_PROVIDERS = [p.strip() for p in os.getenv("LLM_PROVIDERS", "groq,gemini").split(",") if p.strip()]
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "20"))
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "1"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.2"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "2.0"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "1") == "1"
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))
+LLM_HEDGE_MAX_DELAY = float(os.getenv("LLM_HEDGE_MAX_DELAY", "5.0"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+
+# overload protection for the LLM path (backend/admission.py): token buckets per user and
+# global ("memory" per worker, "redis" shared, "off"), rates in requests/second; plus at most
+# LLM_MAX_CONCURRENCY provider calls per process with a queue of LLM_MAX_QUEUE that waits
+# at most LLM_QUEUE_TIMEOUT seconds. Rejections are 429 with Retry-After.
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_USER_RATE = float(os.getenv("RATE_LIMIT_USER_RATE", "0.5"))
+RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", "10"))
+RATE_LIMIT_GLOBAL_RATE = float(os.getenv("RATE_LIMIT_GLOBAL_RATE", "50"))
+RATE_LIMIT_GLOBAL_BURST = float(os.getenv("RATE_LIMIT_GLOBAL_BURST", "100"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "64"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+
+# /chat/batch (backend/batch_chat.py is the client): off unless BATCH_API_KEY is set, since it
+# acts on arbitrary user_ids; BATCH_CONCURRENCY LLM calls per batch, on top of the admission gate
+BATCH_API_KEY = os.getenv("BATCH_API_KEY", "")
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "256"))  # input lines grouped per user for retrieval
+BATCH_MAX_LINES = int(os.getenv("BATCH_MAX_LINES", "10000"))  # per request; the CLI sends windows below this
+
+# sessions: "memory" (single worker), "sqlite" or "redis" (shared across workers)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "sqlite")
+SESSION_TTL = float(os.getenv("SESSION_TTL", str(7 * 24 * 3600)))
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", "300"))
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", str(PROJECT_ROOT / "sessions.db"))
+
+# server-side conversation history per session (backend/conversations.py)
+CONVERSATION_DIR = os.getenv("CONVERSATION_DIR", str(PROJECT_ROOT / "conversations"))
+CONVERSATION_RECENT_TURNS = int(os.getenv("CONVERSATION_RECENT_TURNS", "6"))
+CONVERSATION_SUMMARY_EVERY = int(os.getenv("CONVERSATION_SUMMARY_EVERY", "6"))  # turns folded per summary call
+CONVERSATION_CACHE_SESSIONS = int(os.getenv("CONVERSATION_CACHE_SESSIONS", "2000"))
+CONVERSATION_TTL = float(os.getenv("CONVERSATION_TTL", str(SESSION_TTL)))
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "llama-3.1-8b-instant")
+SUMMARY_TIMEOUT = float(os.getenv("SUMMARY_TIMEOUT", "30"))
+
+# debug_trace in chat responses: "off", "timings" (stage + ms only) or "full" (previews, stats);
+# TRACE_LEVEL is the default, requests can ask for another level up to TRACE_MAX_LEVEL
+TRACE_LEVEL = os.getenv("TRACE_LEVEL", "timings")
+TRACE_MAX_LEVEL = os.getenv("TRACE_MAX_LEVEL", "full")
+
+# auth SQLite connection pool
+AUTH_DB_POOL_SIZE = int(os.getenv("AUTH_DB_POOL_SIZE", "8"))
+AUTH_DB_BUSY_TIMEOUT_MS = int(os.getenv("AUTH_DB_BUSY_TIMEOUT_MS", "5000"))
+
+# password hashing (process pool, see backend/hashing.py); HASH_WORKERS=0 hashes in a thread instead
+PBKDF2_ROUNDS = int(os.getenv("PBKDF2_ROUNDS", "29000"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))
+
+# memory lifecycle (backend/lifecycle.py): TTLs per kind in days, "none" = keep forever
+MEMORY_KIND_TTLS = {
+    k.strip(): (None if v.strip() == "none" else float(v))
+    for k, v in (item.split("=") for item in os.getenv(
+        "MEMORY_KIND_TTLS",
+        "fact=none,goal=180,preference=365,weakness=180,strength=365,constraint=90",
+    ).split(",") if "=" in item)
+}
+MEMORY_HALF_LIFE_DAYS = float(os.getenv("MEMORY_HALF_LIFE_DAYS", "90"))
+MEMORY_ARCHIVE_THRESHOLD = float(os.getenv("MEMORY_ARCHIVE_THRESHOLD", "0.2"))
+MEMORY_ARCHIVE_DIR = os.getenv("MEMORY_ARCHIVE_DIR", str(PROJECT_ROOT / "memory_archive"))
+MEMORY_TOUCH_FLUSH_INTERVAL = float(os.getenv("MEMORY_TOUCH_FLUSH_INTERVAL", "2"))
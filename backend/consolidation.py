@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import re
+import sys
+from array import array
+from .config import DEDUP_SIMHASH_MAX_DISTANCE, DEDUP_COSINE_THRESHOLD
+from .embeddings import tokenize, cosine, get_embedder
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_WS_RE = re.compile(r"\s+")
+_MASK64 = (1 << 64) - 1
+_BANDS = 4  # 4 x 16-bit bands: any pair within distance 3 shares at least one band
+
+def normalize_text(text: str) -> str:
+    return _WS_RE.sub(" ", _PUNCT_RE.sub(" ", (text or "").lower())).strip()
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()[:16]
+
+# Table-driven SimHash: each of the 64 hash bits gets its own 16-bit counter field in one
+# big int, so summing "spread" hashes counts set bits for all 64 positions at once.
+# _SPREAD[i][v] is byte v (at byte position i) with each bit moved to its counter field.
+_FIELD = 16  # read back as native uint16 ("H")
+_MAX_FEATURES = (1 << _FIELD) - 1  # counters must not carry into the next field
+
+
+def _spread_byte(v: int, pos: int) -> int:
+    out = 0
+    for bit in range(8):
+        if (v >> bit) & 1:
+            out |= 1 << ((pos * 8 + bit) * _FIELD)
+    return out
+
+_SPREAD = [[_spread_byte(v, pos) for v in range(256)] for pos in range(8)]
+
+
+def simhash(text: str) -> int:
+    # 64-bit SimHash over tokens + bigrams, returned signed so it fits a Neo4j integer.
+    # A bit is set when more than half the features have it (same as +1/-1 weights > 0).
+    toks = tokenize(text or "")
+    feats = (toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])])[:_MAX_FEATURES]
+    s0, s1, s2, s3, s4, s5, s6, s7 = _SPREAD
+    total = 0
+    for f in feats:
+        d = hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest()
+        total += (s0[d[0]] | s1[d[1]] | s2[d[2]] | s3[d[3]] | s4[d[4]] | s5[d[5]] | s6[d[6]] | s7[d[7]])
+    half = len(feats) / 2
+    # fields are laid out little-endian whatever the host, so every worker stores the same value
+    counts = array("H", total.to_bytes(64 * _FIELD // 8, "little"))
+    if sys.byteorder == "big":
+        counts.byteswap()
+    out = 0
+    for bit, c in enumerate(counts):
+        if c > half:
+            out |= 1 << bit
+    return out - (1 << 64) if out >= 1 << 63 else out
+
+def hamming(a: int, b: int) -> int:
+    return ((a ^ b) & _MASK64).bit_count()
+
+def needs_fingerprint(memory: dict) -> bool:
+    return not memory.get("text_hash") or memory.get("simhash") is None or not memory.get("embedding")
+
+def fingerprint_row(memory: dict) -> dict:
+    # SET_FINGERPRINTS_QUERY row for a node fingerprinted in process
+    return {k: memory.get(k) for k in ("memory_id", "text_hash", "simhash", "embedding")}
+
+def fingerprint(memory: dict) -> dict:
+    # fills text_hash / simhash / embedding in place when missing (legacy nodes)
+    text = memory.get("text") or ""
+    if not memory.get("text_hash"):
+        memory["text_hash"] = text_hash(text)
+    if memory.get("simhash") is None:
+        memory["simhash"] = simhash(text)
+    if not memory.get("embedding"):
+        memory["embedding"] = get_embedder().embed(text)
+    return memory
+
+
+class DuplicateIndex:
+    # Candidate lookup by exact text hash and SimHash bands; candidates are
+    # confirmed by Hamming distance or embedding similarity.
+    def __init__(self, max_distance: int = DEDUP_SIMHASH_MAX_DISTANCE,
+                 min_cosine: float = DEDUP_COSINE_THRESHOLD):
+        self.max_distance = max_distance
+        self.min_cosine = min_cosine
+        self._by_hash = {}
+        self._bands = {}
+
+    @staticmethod
+    def _band_keys(sh: int):
+        u = sh & _MASK64
+        return [(i, (u >> (16 * i)) & 0xFFFF) for i in range(_BANDS)]
+
+    def add(self, memory: dict):
+        fingerprint(memory)
+        self._by_hash.setdefault(memory["text_hash"], memory)
+        for key in self._band_keys(memory["simhash"]):
+            self._bands.setdefault(key, []).append(memory)
+
+    def find(self, memory: dict) -> dict | None:
+        fingerprint(memory)
+        same = self._by_hash.get(memory["text_hash"])
+        if same is not None:
+            return same
+        best, best_score = None, 0.0
+        seen = set()
+        for key in self._band_keys(memory["simhash"]):
+            for cand in self._bands.get(key, ()):
+                if id(cand) in seen:
+                    continue
+                seen.add(id(cand))
+                if hamming(cand["simhash"], memory["simhash"]) <= self.max_distance:
+                    return cand
+                score = cosine(cand.get("embedding"), memory.get("embedding"))
+                if score >= self.min_cosine and score > best_score:
+                    best, best_score = cand, score
+        return best
+
+
+def plan_writes(new_memories: list[dict], existing: list[dict]) -> tuple[list[dict], list[dict]]:
+    # -> (memories to create, merges into existing nodes {memory_id, confidence})
+    index = DuplicateIndex()
+    for m in existing:
+        index.add(m)
+
+    creates, merges = [], {}
+    for m in new_memories:
+        match = index.find(m)
+        if match is None:
+            creates.append(m)
+            index.add(m)
+            continue
+        if match.get("memory_id") in merges:
+            merges[match["memory_id"]]["confidence"] = max(merges[match["memory_id"]]["confidence"],
+                                                           float(m.get("confidence") or 0.0))
+        elif any(match is c for c in creates):
+            # duplicate inside the same batch: keep the stronger confidence on the new node
+            match["confidence"] = max(float(match.get("confidence") or 0.0), float(m.get("confidence") or 0.0))
+        else:
+            merges[match["memory_id"]] = {"memory_id": match["memory_id"],
+                                          "confidence": float(m.get("confidence") or 0.0)}
+    return creates, list(merges.values())
+
+
+def duplicate_groups(memories: list[dict]) -> list[dict]:
+    # memories newest-first (as loaded); the oldest node of each cluster survives
+    index = DuplicateIndex()
+    groups = {}
+    for m in reversed(memories):
+        match = index.find(m)
+        if match is None:
+            index.add(m)
+            groups[m["memory_id"]] = {"keep": m["memory_id"], "drop": [],
+                                      "confidence": float(m.get("confidence") or 0.0),
+                                      "seen_count": int(m.get("seen_count") or 1)}
+            continue
+        g = groups[match["memory_id"]]
+        g["drop"].append(m["memory_id"])
+        g["confidence"] = max(g["confidence"], float(m.get("confidence") or 0.0))
+        g["seen_count"] += int(m.get("seen_count") or 1)
+    return [g for g in groups.values() if g["drop"]]
+
+
+def compact(neo, batch_users: int = 100, max_memories: int = 5000) -> dict:
+    # periodic job: collapse existing duplicates, one write transaction per user batch
+    stats = {"users": 0, "groups": 0, "deleted": 0}
+    after = ""
+    while True:
+        user_ids = neo.list_user_ids(after=after, limit=batch_users)
+        if not user_ids:
+            break
+        after = user_ids[-1]
+        groups = []
+        for uid in user_ids:
+            groups.extend(duplicate_groups(neo.get_memories_with_embeddings(uid, limit=max_memories)))
+        neo.compact_memories(groups)
+        stats["users"] += len(user_ids)
+        stats["groups"] += len(groups)
+        stats["deleted"] += sum(len(g["drop"]) for g in groups)
+        print(f"compacted {stats['users']} users: {stats['groups']} groups, "
+              f"{stats['deleted']} duplicates removed", file=sys.stderr)
+    return stats
+
+
+def main(argv=None):
+    from .neo4j_client import Neo4jClient
+
+    ap = argparse.ArgumentParser(description="Collapse duplicate Memory nodes per user")
+    ap.add_argument("--batch-users", type=int, default=100)
+    ap.add_argument("--max-memories", type=int, default=5000, help="per-user memories scanned")
+    args = ap.parse_args(argv)
+
+    neo = Neo4jClient()
+    try:
+        compact(neo, batch_users=args.batch_users, max_memories=args.max_memories)
+    finally:
+        neo.close()
+
+if __name__ == "__main__":
+    main()
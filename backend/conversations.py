@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from .config import (CONVERSATION_DIR, CONVERSATION_RECENT_TURNS, CONVERSATION_SUMMARY_EVERY,
+                     CONVERSATION_CACHE_SESSIONS, CONVERSATION_TTL)
+
+# Server-side conversation history: one append-only JSONL file per session, named by a
+# hash of the session token (the token itself never touches the disk). Records:
+#   {"n": 7, "ts": 1712345678.1, "u": "user message", "a": "answer"}   a turn
+#   {"s": "summary text", "upto": 6}                                  summary of turns n <= upto
+# Prompts get the latest summary plus the turns after it (the last `recent_turns`);
+# once `summary_every` more turns have fallen out of that window they are folded into
+# the summary by a background LLM call, so prompt size stays flat however long the
+# conversation runs.
+
+
+class Conversation:
+    __slots__ = ("turns", "summary", "summary_upto", "next_n")
+
+    def __init__(self, max_turns: int):
+        self.turns = deque(maxlen=max_turns)  # unsummarized turns, oldest first
+        self.summary = ""
+        self.summary_upto = -1
+        self.next_n = 0
+
+    def apply(self, rec: dict):
+        if "s" in rec:
+            self.summary = rec["s"]
+            self.summary_upto = rec["upto"]
+            while self.turns and self.turns[0]["n"] <= self.summary_upto:
+                self.turns.popleft()
+        else:
+            self.turns.append(rec)
+            self.next_n = rec["n"] + 1
+
+
+class ConversationStore:
+    def __init__(self, root: str | Path = CONVERSATION_DIR, recent_turns: int = CONVERSATION_RECENT_TURNS,
+                 summary_every: int = CONVERSATION_SUMMARY_EVERY, max_sessions: int = CONVERSATION_CACHE_SESSIONS,
+                 summarizer=None):
+        # summarizer: async (summary, turns) -> new summary; None keeps the recent window only
+        self.root = Path(root)
+        self.recent_turns = recent_turns
+        self.summary_every = max(1, summary_every)
+        self.max_sessions = max_sessions
+        self.summarizer = summarizer
+        self._cache = OrderedDict()  # key -> Conversation, LRU
+        self._cache_lock = threading.Lock()  # sweep() runs in a worker thread
+        self._loading: dict[str, asyncio.Task] = {}
+        self._summarizing: dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.summaries = 0
+        self.summary_failures = 0
+
+    def _key(self, session_token: str) -> str:
+        return hashlib.sha256(session_token.encode("utf-8")).hexdigest()[:32]
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.jsonl"
+
+    def _max_turns(self) -> int:
+        # unsummarized turns kept in memory: the window plus a few summary batches of slack
+        # for a slow or failing summarizer; anything older is only on disk
+        if self.summarizer is None:
+            return self.recent_turns
+        return self.recent_turns + 4 * self.summary_every
+
+    def _read(self, key: str) -> Conversation:
+        conv = Conversation(self._max_turns())
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        conv.apply(json.loads(line))
+                    except (ValueError, KeyError):
+                        continue  # torn last line after a crash
+        except FileNotFoundError:
+            pass
+        return conv
+
+    def _write(self, key: str, rec: dict):
+        line = json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self._path(key), "a", encoding="utf-8") as f:
+                f.write(line)
+
+    async def _get(self, key: str) -> Conversation:
+        with self._cache_lock:
+            conv = self._cache.get(key)
+            if conv is not None:
+                self._cache.move_to_end(key)
+                return conv
+        # one file read per session even when requests race on a cold cache
+        task = self._loading.get(key)
+        if task is None:
+            task = self._loading[key] = asyncio.create_task(asyncio.to_thread(self._read, key))
+            task.add_done_callback(lambda _: self._loading.pop(key, None))
+        conv = await task
+        with self._cache_lock:
+            self._cache[key] = conv
+            while len(self._cache) > self.max_sessions:
+                self._cache.popitem(last=False)
+        return conv
+
+    async def context(self, session_token: str) -> tuple[str, list[dict]]:
+        # -> (rolling summary, recent turns oldest first)
+        conv = await self._get(self._key(session_token))
+        recent = list(conv.turns)[-self.recent_turns:] if self.recent_turns > 0 else []
+        return conv.summary, recent
+
+    async def append(self, session_token: str, message: str, answer: str):
+        key = self._key(session_token)
+        conv = await self._get(key)
+        rec = {"n": conv.next_n, "ts": round(time.time(), 3), "u": message, "a": answer}
+        conv.apply(rec)
+        await asyncio.to_thread(self._write, key, rec)
+        if (self.summarizer is not None and key not in self._summarizing
+                and len(conv.turns) - self.recent_turns >= self.summary_every):
+            task = self._summarizing[key] = asyncio.create_task(self._summarize(key, conv))
+            task.add_done_callback(lambda _: self._summarizing.pop(key, None))
+
+    async def _summarize(self, key: str, conv: Conversation):
+        fold = list(conv.turns)[:len(conv.turns) - self.recent_turns]
+        try:
+            summary = await self.summarizer(conv.summary, fold)
+        except Exception as e:
+            self.summary_failures += 1
+            print("conversation summary failed:", e)
+            return
+        rec = {"s": summary, "upto": fold[-1]["n"]}
+        await asyncio.to_thread(self._write, key, rec)
+        conv.apply(rec)
+        self.summaries += 1
+
+    async def drain(self, timeout: float):
+        if self._summarizing:
+            await asyncio.wait(list(self._summarizing.values()), timeout=timeout)
+
+    def sweep(self, ttl: float = CONVERSATION_TTL) -> int:
+        # conversations outlive their session by at most ttl (file mtime = last turn)
+        if not self.root.exists():
+            return 0
+        cutoff = time.time() - ttl
+        removed = 0
+        for p in self.root.glob("*.jsonl"):
+            try:
+                if p.stat().st_mtime < cutoff:
+                    p.unlink()
+                    with self._cache_lock:
+                        self._cache.pop(p.stem, None)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def stats(self) -> dict:
+        return {"sessions_cached": len(self._cache), "summaries": self.summaries,
+                "summary_failures": self.summary_failures, "summarizing": len(self._summarizing)}
@@ -0,0 +1,145 @@
+import hashlib
+import math
+import operator
+import re
+from functools import lru_cache
+from .config import EMBEDDER, EMBEDDING_DIM, EMBEDDING_MODEL
+
+try:
+    import numpy as np
+except ImportError:  # optional: rank_memories falls back to pure-Python dot products
+    np = None
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "is", "are", "was",
+    "be", "it", "this", "that", "me", "my", "i", "im", "you", "your", "do", "does", "what",
+    "how", "can", "about", "at", "as", "am", "so", "but", "if", "by", "from", "mode",
+    "m", "s", "re", "ve", "ll", "d", "t",  # contraction fragments (i'm, it's, ...)
+}
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dim: int) -> tuple[int, float]:
+    h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, (1.0 if h >> 63 else -1.0)
+
+def _stem(tok: str) -> str:
+    # crude suffix strip so "preparing"/"prepare"/"prepared" share a feature
+    if len(tok) > 4:
+        for suf in ("ing", "ed", "es", "s", "e"):
+            if tok.endswith(suf):
+                return tok[: -len(suf)]
+    return tok
+
+def tokenize(text: str) -> list[str]:
+    return [_stem(t) for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+def _normalize(vec: list[float]) -> list[float]:
+    norm = math.hypot(*vec)  # one C call instead of a 512-step generator
+    if not norm:
+        return vec
+    inv = 1.0 / norm
+    return [x * inv for x in vec]
+
+
+class HashingEmbedder:
+    # Signed feature hashing over words + word bigrams. No model, no network,
+    # stable across processes (blake2b, not hash()).
+    name = "hashing"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def embed(self, text: str) -> list[float]:
+        vec = [0.0] * self.dim
+        toks = tokenize(text)
+        for t in toks:
+            i, sign = _bucket(t, self.dim)
+            vec[i] += sign
+        for a, b in zip(toks, toks[1:]):
+            i, sign = _bucket(f"{a} {b}", self.dim)
+            vec[i] += 0.5 * sign
+        return _normalize(vec)
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed(t) for t in texts]
+
+
+class SentenceTransformerEmbedder:
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise RuntimeError("EMBEDDER=sentence-transformers needs `pip install sentence-transformers`")
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, text: str) -> list[float]:
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        return self.model.encode(texts, normalize_embeddings=True).tolist()
+
+
+_embedder = None
+
+def get_embedder():
+    global _embedder
+    if _embedder is None:
+        if EMBEDDER == "sentence-transformers":
+            _embedder = SentenceTransformerEmbedder()
+        elif EMBEDDER == "hashing":
+            _embedder = HashingEmbedder()
+        else:
+            raise RuntimeError(f"Unknown EMBEDDER: {EMBEDDER}")
+    return _embedder
+
+def embed(text: str) -> list[float]:
+    return get_embedder().embed(text)
+
+def cosine(a: list[float] | None, b: list[float] | None) -> float:
+    # vectors are stored L2-normalised, so the dot product is the cosine
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return sum(map(operator.mul, a, b))
+
+
+class MemoryRows(list):
+    # a user's cached memories; with numpy their embeddings are stacked into one matrix
+    # the first time they are ranked, and reused while the cache entry lives
+    matrix = None
+
+
+def _scores(memories: list[dict], query: list[float]) -> list[float]:
+    if np is None or not memories:
+        return [cosine(m.get("embedding"), query) for m in memories]
+    matrix = getattr(memories, "matrix", None)
+    if matrix is None:
+        dim = len(query)
+        matrix = np.zeros((len(memories), dim), dtype=np.float32)
+        for i, m in enumerate(memories):
+            e = m.get("embedding")
+            if e and len(e) == dim:  # missing or foreign-dimension embeddings score 0, as in cosine()
+                matrix[i] = e
+        if isinstance(memories, MemoryRows):
+            memories.matrix = matrix
+    if matrix.shape[1] != len(query):
+        return [0.0] * len(memories)
+    return (matrix @ np.asarray(query, dtype=np.float32)).tolist()
+
+
+def rank_memories(memories: list[dict], query: list[float], limit: int, keep=None) -> list[dict]:
+    # same ranking as Neo4jClient.search_memories, for memories already in process;
+    # input is newest-first and the sort is stable, so ties keep recency order.
+    # keep(m) -> False drops a memory (expired ones) without rebuilding the matrix.
+    scores = _scores(memories, query)
+    order = sorted(range(len(memories)), key=scores.__getitem__, reverse=True)
+    ranked = []
+    for i in order:
+        if keep is None or keep(memories[i]):
+            ranked.append(dict(memories[i], score=scores[i]))
+            if len(ranked) >= limit:
+                break
+    return ranked
@@ -0,0 +1,172 @@
+import re
+from .config import GRAPH_WEIGHT, GRAPH_NEAR_WEIGHT, GRAPH_MAX_HOPS, ENTITY_MAX_PER_MEMORY
+from .embeddings import cosine
+
+# Entity extraction for the memory graph: Skill / Topic / Company mentions, found with a
+# gazetteer plus a "at/join <Name>" pattern for companies outside the list. Runs fully
+# offline and deterministically, at write time (MENTIONS links) and on the user message
+# at query time, so both sides always agree on keys.
+#
+# Keys are "<type>:<canonical name>"; skills hang off topics through PART_OF edges
+# (synced to Neo4j on startup, see Neo4jClient.init_schema), which is what graph
+# retrieval walks to reach related memories.
+
+# topic -> skills; a skill may sit under several topics
+TAXONOMY = {
+    "databases": ["sql", "indexing", "normalization", "transactions", "nosql", "sharding", "replication",
+                  "postgres", "mysql", "mongodb", "redis", "neo4j", "query optimization"],
+    "system design": ["caching", "load balancing", "message queues", "kafka", "microservices", "rate limiting",
+                      "consistent hashing", "cdn", "api design", "scalability", "sharding", "replication"],
+    "algorithms": ["dynamic programming", "graphs", "trees", "binary search", "sorting", "recursion", "greedy",
+                   "backtracking", "heaps", "linked lists", "arrays", "hash maps", "big o", "leetcode"],
+    "programming": ["python", "java", "javascript", "typescript", "c++", "golang", "rust", "c#", "kotlin", "swift",
+                    "sql"],
+    "machine learning": ["deep learning", "nlp", "computer vision", "pytorch", "tensorflow", "scikit-learn",
+                         "feature engineering", "llms"],
+    "cloud": ["aws", "gcp", "azure", "docker", "kubernetes", "terraform", "ci/cd"],
+    "frontend": ["react", "angular", "vue", "css", "html", "javascript", "typescript"],
+    "data": ["pandas", "spark", "etl", "data modeling", "statistics", "excel", "tableau", "power bi", "sql"],
+    "behavioral": ["star method", "leadership", "conflict resolution", "communication", "storytelling"],
+}
+
+COMPANIES = ["google", "meta", "amazon", "apple", "microsoft", "netflix", "uber", "airbnb", "stripe", "openai",
+             "nvidia", "salesforce", "oracle", "adobe", "linkedin", "spotify", "tcs", "infosys", "wipro",
+             "accenture", "deloitte", "goldman sachs", "jp morgan", "flipkart", "atlassian", "shopify",
+             "databricks", "snowflake", "bloomberg", "intel"]
+
+ALIASES = {
+    "postgresql": "skill:postgres", "k8s": "skill:kubernetes", "js": "skill:javascript", "ts": "skill:typescript",
+    "go lang": "skill:golang", "dp": "skill:dynamic programming", "ml": "topic:machine learning",
+    "dsa": "topic:algorithms", "data structures": "topic:algorithms", "facebook": "company:meta",
+    "aws cloud": "skill:aws", "jpmorgan": "company:jp morgan", "star": "skill:star method",
+    "system-design": "topic:system design", "behavioural": "topic:behavioral",
+}
+
+_VOCAB = {}
+for _topic, _skills in TAXONOMY.items():
+    _VOCAB[_topic] = f"topic:{_topic}"
+    for _skill in _skills:
+        _VOCAB.setdefault(_skill, f"skill:{_skill}")
+_VOCAB.update({c: f"company:{c}" for c in COMPANIES})
+_VOCAB.update(ALIASES)
+
+# longest phrase first so "machine learning" wins over "ml"-style prefixes;
+# boundaries allow the "+"/"#"/"/" inside c++, c#, ci/cd
+_PHRASE_RE = re.compile(r"(?<![\w+#/])(" + "|".join(re.escape(p) for p in sorted(_VOCAB, key=len, reverse=True))
+                        + r")(?![\w+#/])", re.IGNORECASE)
+
+# phrases that are ordinary words as often as they are skills ("a star performer", "I excel
+# at"): they count when another word of the text confirms the sense, or for acronyms when
+# written in capitals ("STAR")
+_NEEDS_CONTEXT = {
+    "star": {"method", "format", "framework", "technique", "answer", "answers", "story", "stories", "behavioral",
+             "behavioural", "situation"},
+    "excel": {"spreadsheet", "spreadsheets", "formula", "formulas", "pivot", "vlookup", "macros", "sheets",
+              "microsoft", "ms"},
+    "swift": {"ios", "xcode", "swiftui", "apple", "iphone", "objective-c", "kotlin"},
+}
+_ACRONYMS = {"star"}
+
+# a company name is one or two capitalised words and stops at any other character, so
+# "joined C++" is not company "c" and "Stripe Inc." ends before the dot
+_COMPANY_RE = re.compile(r"\b(?:at|join|joining|joined)\s+([A-Z][\w&]*(?:\s+[A-Z][\w&]*)?)(?![\w+#])")
+_CORP_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "co", "plc", "gmbh", "pvt"}
+_NOT_COMPANY = {"i", "the", "a", "an", "this", "that", "my", "it", "least", "most", "all", "some", "me", "home",
+                "work", "school", "college", "university", "night", "noon", "midnight", "first", "last", "once",
+                "times", "best", "scale", "interview", "interviews", "christmas", "easter",
+                "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday", "weekend",
+                "january", "february", "march", "april", "june", "july", "august", "september", "october",
+                "november", "december",
+                "english", "hindi", "spanish", "french", "german", "chinese", "mandarin", "japanese", "korean",
+                "arabic", "portuguese", "russian", "italian", "bengali", "tamil", "telugu", "marathi", "urdu"}
+# "good at X" is a skill, not an employer
+_SKILL_AT = {"good", "bad", "better", "best", "great", "worse", "worst", "weak", "strong", "decent", "terrible",
+             "excellent", "fluent", "proficient", "expert", "skilled"}
+
+# undirected PART_OF adjacency, for the in-process twin of the graph query
+_NEIGHBOURS: dict[str, set[str]] = {}
+for _topic, _skills in TAXONOMY.items():
+    for _skill in _skills:
+        _NEIGHBOURS.setdefault(f"topic:{_topic}", set()).add(f"skill:{_skill}")
+        _NEIGHBOURS.setdefault(f"skill:{_skill}", set()).add(f"topic:{_topic}")
+
+
+def _entity(key: str) -> dict:
+    etype, name = key.split(":", 1)
+    return {"key": key, "type": etype, "name": name}
+
+
+def _company(text: str, m: re.Match) -> str | None:
+    before = text[:m.start()].split()
+    if m.group(0).startswith("at") and before and before[-1].lower() in _SKILL_AT:
+        return None
+    words = m.group(1).lower().split()
+    while words and words[-1] in _CORP_SUFFIXES:
+        words.pop()
+    if not words or words[0] in _NOT_COMPANY or words[0] in _VOCAB:
+        # a known skill/company leading the name was already matched as a phrase
+        return None
+    if len(words) > 1 and (words[1] in _NOT_COMPANY or words[1] in _VOCAB):
+        words = words[:1]
+    name = " ".join(words)
+    if len(name) < 2 or name in _VOCAB:
+        return None
+    return name
+
+
+def extract_entities(text: str, limit: int = ENTITY_MAX_PER_MEMORY) -> list[dict]:
+    # -> [{"key", "type", "name"}], first mention order, no duplicates
+    text = text or ""
+    keys = []
+    words = None
+    for m in _PHRASE_RE.finditer(text):
+        phrase = m.group(1).lower()
+        if phrase in _NEEDS_CONTEXT:
+            if words is None:
+                words = set(re.findall(r"[\w+#/-]+", text.lower()))
+            if not (phrase in _ACRONYMS and m.group(1).isupper()) and not words & _NEEDS_CONTEXT[phrase]:
+                continue
+        keys.append(_VOCAB[phrase])
+    for m in _COMPANY_RE.finditer(text):
+        name = _company(text, m)
+        if name:
+            keys.append(f"company:{name}")
+    return [_entity(k) for k in dict.fromkeys(keys)][:limit]
+
+
+def entity_keys(text: str) -> list[str]:
+    return [e["key"] for e in extract_entities(text)]
+
+
+def taxonomy_rows() -> list[dict]:
+    return [{"topic_key": f"topic:{t}", "topic_name": t, "skill_key": f"skill:{s}", "skill_name": s}
+            for t, skills in TAXONOMY.items() for s in skills]
+
+
+def related_keys(keys: list[str], hops: int = GRAPH_MAX_HOPS) -> set[str]:
+    # entities within `hops` PART_OF edges of any key, the keys themselves excluded
+    seen, frontier = set(keys), set(keys)
+    for _ in range(hops):
+        frontier = {n for k in frontier for n in _NEIGHBOURS.get(k, ())} - seen
+        seen |= frontier
+    return seen - set(keys)
+
+
+def graph_score(memory_keys, direct: set[str], related: set[str], near_weight: float = GRAPH_NEAR_WEIGHT) -> float:
+    return sum(1.0 if k in direct else near_weight for k in memory_keys if k in direct or k in related)
+
+
+def rank_memories_graph(memories: list[dict], query: list[float], keys: list[str], limit: int,
+                        graph_weight: float = GRAPH_WEIGHT, near_weight: float = GRAPH_NEAR_WEIGHT) -> list[dict]:
+    # same scoring as Neo4jClient.graph_search_memories, for memories already in process
+    direct, related = set(keys), related_keys(keys)
+    scored = []
+    for m in memories:
+        mkeys = m.get("entity_keys")
+        if mkeys is None:
+            mkeys = entity_keys(m.get("text") or "")
+        g = graph_score(mkeys, direct, related, near_weight)
+        sim = cosine(m.get("embedding"), query)
+        scored.append(dict(m, similarity=sim, graph_score=g, score=sim + graph_weight * min(g, 1.0)))
+    scored.sort(key=lambda m: m["score"], reverse=True)
+    return scored[:limit]
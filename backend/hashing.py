@@ -0,0 +1,78 @@
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from passlib.hash import pbkdf2_sha256
+from .config import PBKDF2_ROUNDS, HASH_WORKERS, HASH_MAX_PENDING
+
+
+class HasherBusy(RuntimeError):
+    pass
+
+
+# module-level so they pickle into the worker processes
+def _hash(password: str, rounds: int) -> str:
+    return pbkdf2_sha256.using(rounds=rounds).hash(password)
+
+def _verify(password: str, pw_hash: str, rounds: int) -> tuple[bool, bool]:
+    # -> (ok, needs_rehash): rehash when the stored cost differs from the configured one
+    ok = pbkdf2_sha256.verify(password, pw_hash)
+    return ok, ok and pbkdf2_sha256.using(rounds=rounds).needs_update(pw_hash)
+
+
+class PasswordHasher:
+    # pbkdf2 holds the GIL for its whole run, so it goes to a separate process
+    # pool; at most max_pending calls may be queued, beyond that HasherBusy.
+    def __init__(self, workers: int = HASH_WORKERS, max_pending: int = HASH_MAX_PENDING,
+                 rounds: int = PBKDF2_ROUNDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._latency = deque(maxlen=500)
+        self._executor = None
+
+    def start(self):
+        if self.workers > 0 and self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+
+    async def _submit(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HasherBusy("password hashing queue is full")
+        self.pending += 1
+        t0 = time.perf_counter()
+        try:
+            if self.workers > 0:
+                self.start()
+                return await asyncio.wrap_future(self._executor.submit(fn, *args))
+            return await asyncio.to_thread(fn, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+            self._latency.append(time.perf_counter() - t0)
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_hash, password, self.rounds)
+
+    async def verify(self, password: str, pw_hash: str) -> tuple[bool, bool]:
+        return await self._submit(_verify, password, pw_hash, self.rounds)
+
+    def shutdown(self):
+        # wait for the workers to exit: with wait=False the interpreter can be torn down
+        # before the pool's semaphores are released (resource_tracker "leaked semaphore")
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        xs = sorted(self._latency)
+        pct = lambda q: int(xs[min(len(xs) - 1, int(q * len(xs)))] * 1000) if xs else 0
+        return {"rounds": self.rounds, "workers": self.workers, "queue_depth": self.pending,
+                "max_pending": self.max_pending, "completed": self.completed, "rejected": self.rejected,
+                "rehashed": self.rehashed, "p50_ms": pct(0.5), "p95_ms": pct(0.95)}
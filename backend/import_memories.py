@@ -0,0 +1,69 @@
+import argparse
+import json
+import sys
+import time
+from .memory import make_memory
+from .neo4j_client import Neo4jClient
+
+# Bulk backfill: python -m backend.import_memories memories.jsonl --batch-size 5000
+# Each line: {"user_id": "...", "text": "...", "kind": "fact", "confidence": 0.9,
+#             "source": "import", "memory_id": "...", "created_at": "2024-01-01T00:00:00Z"}
+# Only user_id and text are required.
+
+def _row(line: str) -> dict | None:
+    obj = json.loads(line)
+    user_id = obj.get("user_id")
+    text = (obj.get("text") or "").strip()
+    if not user_id or not text:
+        return None
+    mem = make_memory(text, kind=obj.get("kind") or "fact", source=obj.get("source") or "import",
+                      confidence=float(obj.get("confidence", 1.0)))
+    if obj.get("memory_id"):
+        mem["memory_id"] = obj["memory_id"]
+    mem["user_id"] = user_id
+    mem["created_at"] = obj.get("created_at")
+    return mem
+
+def _chunks(lines, size: int):
+    chunk, skipped = [], 0
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = _row(line)
+        except (ValueError, TypeError):
+            row = None
+        if row is None:
+            skipped += 1
+            continue
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk, skipped
+            chunk, skipped = [], 0
+    if chunk or skipped:
+        yield chunk, skipped
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Bulk-load memories from JSONL into Neo4j")
+    ap.add_argument("path", help="JSONL file, or - for stdin")
+    ap.add_argument("--batch-size", type=int, default=5000, help="rows per write transaction")
+    args = ap.parse_args(argv)
+
+    f = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    neo = Neo4jClient()
+    total = skipped = 0
+    t0 = time.perf_counter()
+    try:
+        for chunk, bad in _chunks(f, args.batch_size):
+            neo.import_memories(chunk)
+            total += len(chunk)
+            skipped += bad
+            dt = time.perf_counter() - t0
+            print(f"imported {total} memories ({total / dt:.0f}/s), skipped {skipped}", file=sys.stderr)
+    finally:
+        neo.close()
+        if f is not sys.stdin:
+            f.close()
+
+if __name__ == "__main__":
+    main()
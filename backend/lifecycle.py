@@ -0,0 +1,254 @@
+import argparse
+import fcntl
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from .config import (MEMORY_KIND_TTLS, MEMORY_HALF_LIFE_DAYS, MEMORY_ARCHIVE_THRESHOLD, MEMORY_ARCHIVE_DIR)
+
+try:
+    import zstandard
+except ImportError:  # archives fall back to gzip
+    zstandard = None
+
+DAY = 86400.0
+ARCHIVE_FIELDS = ("memory_id", "text", "kind", "confidence", "source", "created_at", "last_seen",
+                  "last_accessed", "seen_count", "access_count")
+
+
+def to_epoch(v) -> float | None:
+    # neo4j DateTime, datetime, ISO string (Redis cache / archives) or None
+    if v is None:
+        return None
+    if hasattr(v, "to_native"):
+        v = v.to_native()
+    if isinstance(v, str):
+        try:
+            v = datetime.fromisoformat(v.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if isinstance(v, datetime):
+        if v.tzinfo is None:
+            v = v.replace(tzinfo=timezone.utc)
+        return v.timestamp()
+    return None
+
+
+def _last_reinforced(m: dict) -> float | None:
+    ts = [to_epoch(m.get(k)) for k in ("created_at", "last_seen", "last_accessed")]
+    ts = [t for t in ts if t is not None]
+    return max(ts) if ts else None
+
+
+def effective_confidence(m: dict, now: float | None = None) -> float:
+    # confidence halves every MEMORY_HALF_LIFE_DAYS without being re-extracted or retrieved
+    conf = float(m.get("confidence") or 0.0)
+    if m.get("source") == "system":
+        return conf
+    ref = _last_reinforced(m)
+    if ref is None:
+        return conf
+    age_days = max(0.0, ((now or time.time()) - ref) / DAY)
+    return conf * 0.5 ** (age_days / MEMORY_HALF_LIFE_DAYS)
+
+
+def is_expired(m: dict, now: float | None = None) -> bool:
+    ttl_days = MEMORY_KIND_TTLS.get(m.get("kind"))
+    if ttl_days is None or m.get("source") == "system":
+        return False
+    ref = _last_reinforced(m)
+    return ref is not None and (now or time.time()) - ref > ttl_days * DAY
+
+
+def kind_ttl_seconds() -> dict[str, float]:
+    # MEMORY_KIND_TTLS as the $kind_ttls parameter of the Neo4j retrieval queries
+    return {k: v * DAY for k, v in MEMORY_KIND_TTLS.items() if v is not None}
+
+
+def is_cold(m: dict, now: float | None = None) -> bool:
+    return is_expired(m, now) or effective_confidence(m, now) < MEMORY_ARCHIVE_THRESHOLD
+
+
+def apply_decay(memories: list[dict], now: float | None = None) -> list[dict]:
+    now = now or time.time()
+    for m in memories:
+        m["effective_confidence"] = round(effective_confidence(m, now), 4)
+    return memories
+
+
+# ---- archive files: one append-only compressed JSONL per user ----
+
+def archive_path(user_id: str, root: str = MEMORY_ARCHIVE_DIR) -> Path:
+    ext = ".jsonl.zst" if zstandard else ".jsonl.gz"
+    return Path(root) / f"{user_id}{ext}"
+
+def _jsonable(m: dict) -> dict:
+    out = {}
+    for k in ARCHIVE_FIELDS:
+        v = m.get(k)
+        if hasattr(v, "iso_format"):
+            v = v.iso_format()
+        elif isinstance(v, datetime):
+            v = v.isoformat()
+        out[k] = v
+    return out
+
+def _write_frame(path: Path, memories: list[dict], mode: str):
+    # each append is a new zstd frame / gzip member; readers go across them
+    data = "".join(json.dumps(_jsonable(m)) + "\n" for m in memories).encode("utf-8")
+    with open(path, mode) as f:
+        if zstandard:
+            f.write(zstandard.ZstdCompressor(level=10).compress(data))
+        else:
+            f.write(gzip.compress(data))
+        f.flush()
+        os.fsync(f.fileno())
+
+class ArchiveLock:
+    # Per-user flock on <user_id>.lock next to the archive. Appends and read-modify-write
+    # (rehydrate) take it, so an archive run can't append a frame that a concurrent
+    # rewrite then replaces. Works across processes (API workers, the CLI) and across
+    # threads of one process, since each instance opens its own file description.
+    def __init__(self, user_id: str, root: str = MEMORY_ARCHIVE_DIR):
+        self.path = Path(root) / f"{user_id}.lock"
+        self._f = None
+
+    def acquire(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+b")
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            f.close()
+            raise
+        self._f = f
+
+    def release(self):
+        if self._f is not None:
+            fcntl.flock(self._f.fileno(), fcntl.LOCK_UN)
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+def append_archive(user_id: str, memories: list[dict], root: str = MEMORY_ARCHIVE_DIR):
+    path = archive_path(user_id, root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with ArchiveLock(user_id, root):
+        _write_frame(path, memories, "ab")
+
+def read_archive(user_id: str, root: str = MEMORY_ARCHIVE_DIR) -> list[dict]:
+    path = archive_path(user_id, root)
+    if not path.exists():
+        return []
+    with open(path, "rb") as f:
+        if zstandard:
+            raw = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True).read()
+        else:
+            raw = gzip.decompress(f.read())
+    return [json.loads(line) for line in raw.decode("utf-8").splitlines() if line.strip()]
+
+def rewrite_archive(user_id: str, memories: list[dict], root: str = MEMORY_ARCHIVE_DIR):
+    # caller holds ArchiveLock from the read that produced `memories` until this returns
+    path = archive_path(user_id, root)
+    if not memories:
+        path.unlink(missing_ok=True)
+        return
+    tmp = path.with_name(path.name + ".tmp")
+    _write_frame(tmp, memories, "wb")
+    os.replace(tmp, path)
+    dir_fd = os.open(path.parent, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)  # the rename itself must survive a crash too
+    finally:
+        os.close(dir_fd)
+
+
+def split_archive(user_id: str, memory_ids: list[str] | None = None,
+                  root: str = MEMORY_ARCHIVE_DIR) -> tuple[list[dict], list[dict]]:
+    # -> (memories to restore, memories that stay archived); None means all of them
+    archived = read_archive(user_id, root)
+    if memory_ids is None:
+        return archived, []
+    wanted = set(memory_ids)
+    return ([m for m in archived if m["memory_id"] in wanted],
+            [m for m in archived if m["memory_id"] not in wanted])
+
+
+# ---- batch jobs (sync driver) ----
+
+def archive_cold(neo, batch_users: int = 100, max_memories: int = 10000, dry_run: bool = False,
+                 invalidate=None) -> dict:
+    # invalidate(user_ids): drops the API's cached memory lists of users that lost memories
+    stats = {"users": 0, "archived": 0}
+    after = ""
+    now = time.time()
+    while True:
+        user_ids = neo.list_user_ids(after=after, limit=batch_users)
+        if not user_ids:
+            break
+        after = user_ids[-1]
+        cold_ids, touched = [], []
+        for uid in user_ids:
+            cold = [m for m in neo.get_memories_with_embeddings(uid, limit=max_memories) if is_cold(m, now)]
+            if cold and not dry_run:
+                append_archive(uid, cold)  # fsynced under the user's lock before the delete below
+                touched.append(uid)
+            cold_ids.extend(m["memory_id"] for m in cold)
+        if cold_ids and not dry_run:
+            neo.delete_memories(cold_ids)
+            if invalidate is not None:
+                invalidate(touched)
+        stats["users"] += len(user_ids)
+        stats["archived"] += len(cold_ids)
+        print(f"scanned {stats['users']} users, archived {stats['archived']} memories", file=sys.stderr)
+    return stats
+
+
+def rehydrate(neo, user_id: str, memory_ids: list[str] | None = None, root: str = MEMORY_ARCHIVE_DIR) -> int:
+    # restore first, then drop from the archive; a crash in between only repeats the MERGE.
+    # The lock spans read -> rewrite so a concurrent archive append can't be overwritten.
+    with ArchiveLock(user_id, root):
+        memories, rest = split_archive(user_id, memory_ids, root)
+        if memories:
+            neo.restore_memories(user_id, memories)
+            rewrite_archive(user_id, rest, root)
+    return len(memories)
+
+
+def main(argv=None):
+    from .neo4j_client import Neo4jClient
+    from .memory_cache import batch_job_invalidator
+
+    ap = argparse.ArgumentParser(description="Archive cold Memory nodes / rehydrate them")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    a = sub.add_parser("archive", help="move expired / decayed memories to compressed per-user files")
+    a.add_argument("--batch-users", type=int, default=100)
+    a.add_argument("--dry-run", action="store_true")
+    r = sub.add_parser("rehydrate", help="put archived memories back into Neo4j")
+    r.add_argument("user_id")
+    r.add_argument("--memory-id", action="append", help="only these ids (repeatable)")
+    args = ap.parse_args(argv)
+
+    neo = Neo4jClient()
+    invalidate = batch_job_invalidator()
+    try:
+        if args.cmd == "archive":
+            archive_cold(neo, batch_users=args.batch_users, dry_run=args.dry_run, invalidate=invalidate)
+        else:
+            print(f"rehydrated {rehydrate(neo, args.user_id, args.memory_id)} memories", file=sys.stderr)
+            if invalidate is not None:
+                invalidate([args.user_id])
+    finally:
+        neo.close()
+
+if __name__ == "__main__":
+    main()
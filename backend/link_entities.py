@@ -0,0 +1,41 @@
+import argparse
+import sys
+from .neo4j_client import Neo4jClient
+
+# Link memories written before the entity graph existed (schema migration 4):
+# python -m backend.link_entities --batch-users 100
+# New memories are linked when they are written; re-running this is harmless.
+
+def link_all(neo, batch_users: int = 100, max_memories: int = 5000) -> dict:
+    stats = {"users": 0, "memories": 0}
+    after = ""
+    while True:
+        user_ids = neo.list_user_ids(after=after, limit=batch_users)
+        if not user_ids:
+            break
+        after = user_ids[-1]
+        memories = []
+        for uid in user_ids:
+            memories.extend(neo.get_memories_with_embeddings(uid, limit=max_memories))
+        neo.link_entities(memories)
+        stats["users"] += len(user_ids)
+        stats["memories"] += len(memories)
+        print(f"linked {stats['users']} users, {stats['memories']} memories", file=sys.stderr)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Create MENTIONS links from existing memories to entity nodes")
+    ap.add_argument("--batch-users", type=int, default=100)
+    ap.add_argument("--max-memories", type=int, default=5000, help="per-user memories scanned")
+    args = ap.parse_args(argv)
+
+    neo = Neo4jClient()
+    try:
+        neo.init_schema()  # entity constraint + taxonomy
+        link_all(neo, batch_users=args.batch_users, max_memories=args.max_memories)
+    finally:
+        neo.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
-import json
-import re
-import requests
+from .http_client import get_http_client
+from .config import GEMINI_URL, GEMINI_MODEL, LLM_MAX_TOKENS
+from .llm_groq import parse_answer_and_memories, TEMPERATURE
+from .llm_json import extract_json, validate_memories
+from .prompt import build_extract_prompt
+
+def _answer_text(data: dict) -> str:
+    try:
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+    except Exception:
+        raise RuntimeError(f"Unexpected Gemini response format: {data}")
 
 def gemini_answer(api_key: str, prompt: str) -> str:
     if not api_key:
         raise ValueError("Missing Gemini API key")
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={api_key}"
+    url = f"{GEMINI_URL}?key={api_key}"
 
     payload = {
         "contents": [
@@ -18,69 +26,74 @@ def gemini_answer(api_key: str, prompt: str) -> str:
         ]
     }
 
+    import requests
     r = requests.post(url, json=payload, timeout=30)
 
     if r.status_code != 200:
         raise RuntimeError(f"Gemini API error: {r.status_code} - {r.text}")
 
-    data = r.json()
+    return _answer_text(r.json())
 
-    try:
-        return data["candidates"][0]["content"]["parts"][0]["text"]
-    except Exception:
-        raise RuntimeError(f"Unexpected Gemini response format: {data}")
-    
+async def gemini_answer_async(api_key: str, prompt: str) -> str:
+    if not api_key:
+        raise ValueError("Missing Gemini API key")
+
+    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    r = await get_http_client().post(f"{GEMINI_URL}?key={api_key}", json=payload, timeout=30)
+    if r.status_code != 200:
+        raise RuntimeError(f"Gemini API error: {r.status_code} - {r.text}")
 
+    return _answer_text(r.json())
 
-def _extract_json(text: str) -> dict:
+async def gemini_answer_and_memories_async(api_key: str, prompt: str, url: str | None = None,
+                                           timeout: float = 30, full_debug: bool = True,
+                                           max_tokens: int = LLM_MAX_TOKENS) -> dict:
+    # same {"answer", "memories", "debug"} contract as the Groq call
+    if not api_key:
+        raise ValueError("Missing Gemini API key")
+
+    payload = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "systemInstruction": {"parts": [{"text": "You are a helpful interview-prep assistant."}]},
+        "generationConfig": {"temperature": TEMPERATURE, "maxOutputTokens": max_tokens,
+                             "responseMimeType": "application/json"},
+    }
+    r = await get_http_client().post(f"{url or GEMINI_URL}?key={api_key}", json=payload, timeout=timeout)
+    if r.status_code != 200:
+        raise RuntimeError(f"Gemini API error: {r.status_code} - {r.text}")
+
+    data = r.json()
+    return parse_answer_and_memories(GEMINI_MODEL, prompt, _answer_text(data), r.text if full_debug else "",
+                                     data.get("usageMetadata", {}), full_debug)
+
+
+def _extract_memories(text: str) -> list[dict]:
     # Gemini sometimes wraps JSON in ```json ... ```
-    m = re.search(r"\{.*\}", text, re.DOTALL)
-    if not m:
+    out, _ = extract_json(text)
+    if out is None:
         raise ValueError("No JSON object found in extractor output")
-    return json.loads(m.group(0))
+    return validate_memories(out.get("memories"))
 
 def gemini_extract_memories(api_key: str, message: str) -> list[dict]:
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={api_key}"
-
-    prompt = f"""
-You extract long-term memory from a user's chat message for an interview-prep assistant.
-
-Only extract if it is STABLE and useful later:
-- personal background (role, level, domain)
-- goals (target role/company, timeline)
-- preferences (learning style, constraints)
-- weaknesses/strengths
-- hard constraints (time per day, deadlines)
-
-Do NOT extract:
-- greetings, filler, single-use requests
-- temporary stuff ("today", "right now") unless it's a deadline
-- the assistant's own text
-
-Return STRICT JSON only in this exact schema:
-{{
-  "memories": [
-    {{
-      "text": "short canonical memory sentence",
-      "kind": "fact|goal|preference|weakness|strength|constraint",
-      "confidence": 0.0
-    }}
-  ]
-}}
-
-If nothing important, return:
-{{ "memories": [] }}
-
-User message:
-{message}
-""".strip()
+    url = f"{GEMINI_URL}?key={api_key}"
 
-    payload = {"contents": [{"parts": [{"text": prompt}]}]}
+    payload = {"contents": [{"parts": [{"text": build_extract_prompt(message)}]}]}
+    import requests
     r = requests.post(url, json=payload, timeout=30)
     if r.status_code != 200:
         raise RuntimeError(f"Gemini API error: {r.status_code} - {r.text}")
 
     data = r.json()
     out = data["candidates"][0]["content"]["parts"][0]["text"]
-    parsed = _extract_json(out)
-    return parsed.get("memories", [])
\ No newline at end of file
+    return _extract_memories(out)
+
+async def gemini_extract_memories_async(api_key: str, message: str, url: str | None = None,
+                                        timeout: float = 30) -> list[dict]:
+    payload = {"contents": [{"parts": [{"text": build_extract_prompt(message)}]}],
+               "generationConfig": {"temperature": 0.0, "responseMimeType": "application/json"}}
+    r = await get_http_client().post(f"{url or GEMINI_URL}?key={api_key}", json=payload, timeout=timeout)
+    if r.status_code != 200:
+        raise RuntimeError(f"Gemini API error: {r.status_code} - {r.text}")
+
+    out = r.json()["candidates"][0]["content"]["parts"][0]["text"]
+    return _extract_memories(out)
@@ -1,32 +1,25 @@
 import json
-import re
-import requests
+from .http_client import get_http_client
+from .config import GROQ_URL, LLM_MAX_TOKENS
+from .metrics import LLM_JSON_PARSE
+from .llm_json import extract_json, strip_fences, validate_memories
+from .prompt import build_extract_prompt, build_summary_prompt
 
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+TEMPERATURE = 0.5
 
-ALLOWED_KINDS = {"fact", "goal", "preference", "weakness", "strength", "constraint"}
 
-def _strip_fences(s: str) -> str:
-    s = s.strip()
-    # remove ```json ... ``` or ``` ... ```
-    s = re.sub(r"^```(?:json)?\s*", "", s)
-    s = re.sub(r"\s*```$", "", s)
-    return s.strip()
-
-
-def groq_answer_and_memories(api_key: str, model: str, prompt: str) -> dict:
-    if not api_key:
-        raise RuntimeError("Missing GROQ_API_KEY")
-
-    headers = {
+def _headers(api_key: str) -> dict:
+    return {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
     }
 
-    payload = {
+
+def _payload(model: str, prompt: str, max_tokens: int = LLM_MAX_TOKENS) -> dict:
+    return {
         "model": model,
-        "temperature": 0.5,
-        "max_tokens": 900,
+        "temperature": TEMPERATURE,
+        "max_tokens": max_tokens,
         "messages": [
             {"role": "system", "content": "You are a helpful interview-prep assistant."},
             {"role": "user", "content": prompt},
@@ -35,66 +28,134 @@ def groq_answer_and_memories(api_key: str, model: str, prompt: str) -> dict:
         "response_format": {"type": "json_object"},
     }
 
-    r = requests.post(GROQ_URL, headers=headers, json=payload, timeout=60)
-
-    raw_http_text = r.text
-    if r.status_code != 200:
-        raise RuntimeError(f"Groq API error: {r.status_code} - {raw_http_text}")
 
-    data = r.json()
+def _parse_response(model: str, prompt: str, data: dict, raw_http_text: str, full_debug: bool = True) -> dict:
     content = data["choices"][0]["message"]["content"]
-    content = _strip_fences(content)
+    return parse_answer_and_memories(model, prompt, content, raw_http_text, data.get("usage", {}), full_debug)
 
-    debug = {
-        "model": model,
-        "prompt": prompt,
-        "raw_content": content,
-        "raw_http_text": raw_http_text,
-        "usage": data.get("usage", {}),
-    }
 
-    # 1) Try strict json
-    out = None
-    try:
-        out = json.loads(content)
-    except Exception:
-        # 2) Try to salvage first JSON object in the text
-        try:
-            m = re.search(r"\{[\s\S]*\}", content)
-            if m:
-                out = json.loads(m.group(0))
-        except Exception:
-            out = None
-
-    if not isinstance(out, dict):
-        # graceful fallback but still return debug
-        return {"answer": content, "memories": [], "debug": debug}
+def parse_answer_and_memories(model: str, prompt: str, content: str, raw_http_text: str = "",
+                              usage: dict | None = None, full_debug: bool = True) -> dict:
+    # full_debug=False keeps only model/usage; prompt and raw bodies stay out of the result
+    content = strip_fences(content)
 
-    answer = (out.get("answer") or "").strip()
-    memories = out.get("memories") or []
+    debug = {"model": model, "usage": usage or {}}
+    if full_debug:
+        debug.update(prompt=prompt, raw_content=content, raw_http_text=raw_http_text)
 
-    cleaned = []
-    for m in memories:
-        try:
-            text = (m.get("text") or "").strip()
-            kind = (m.get("kind") or "").strip()
-            conf = float(m.get("confidence") or 0.0)
-            if not text:
-                continue
-            if kind not in ALLOWED_KINDS:
-                continue
-            conf = max(0.0, min(1.0, conf))
-            cleaned.append({"text": text, "kind": kind, "confidence": conf})
-        except Exception:
-            continue
+    out, parsed = extract_json(content)
+    LLM_JSON_PARSE.inc(result=parsed)
+    if out is None:
+        # graceful fallback but still return debug
+        return {"answer": content, "memories": [], "debug": debug}
 
+    answer = out.get("answer")
+    answer = answer.strip() if isinstance(answer, str) else ""
     return {
         "answer": answer or content,
-        "memories": cleaned,
+        "memories": validate_memories(out.get("memories")),
         "debug": debug,
     }
 
 
+def groq_answer_and_memories(api_key: str, model: str, prompt: str) -> dict:
+    if not api_key:
+        raise RuntimeError("Missing GROQ_API_KEY")
+
+    import requests  # sync path only: the app goes through the httpx pool and never pays for this import
+    r = requests.post(GROQ_URL, headers=_headers(api_key), json=_payload(model, prompt), timeout=60)
+
+    raw_http_text = r.text
+    if r.status_code != 200:
+        raise RuntimeError(f"Groq API error: {r.status_code} - {raw_http_text}")
+
+    return _parse_response(model, prompt, r.json(), raw_http_text)
+
+
+async def groq_answer_and_memories_async(api_key: str, model: str, prompt: str, url: str | None = None,
+                                         timeout: float = 60, full_debug: bool = True,
+                                         max_tokens: int = LLM_MAX_TOKENS) -> dict:
+    # same contract as groq_answer_and_memories, but on the shared async pool
+    if not api_key:
+        raise RuntimeError("Missing GROQ_API_KEY")
+
+    client = get_http_client()
+    r = await client.post(url or GROQ_URL, headers=_headers(api_key), json=_payload(model, prompt, max_tokens),
+                          timeout=timeout)
+
+    if r.status_code != 200:
+        raise RuntimeError(f"Groq API error: {r.status_code} - {r.text}")
+
+    # r.json() parses the bytes; the decoded body is only kept for full debug
+    return _parse_response(model, prompt, r.json(), r.text if full_debug else "", full_debug)
+
+
+async def groq_extract_memories_async(api_key: str, model: str, message: str, url: str | None = None,
+                                      timeout: float = 20) -> list[dict]:
+    # extraction-only call for the split pipeline, same output as gemini_extract_memories_async
+    if not api_key:
+        raise RuntimeError("Missing GROQ_API_KEY")
+
+    payload = _payload(model, build_extract_prompt(message), max_tokens=300)
+    r = await get_http_client().post(url or GROQ_URL, headers=_headers(api_key), json=payload, timeout=timeout)
+    if r.status_code != 200:
+        raise RuntimeError(f"Groq API error: {r.status_code} - {r.text}")
+
+    out, parsed = extract_json(r.json()["choices"][0]["message"]["content"])
+    LLM_JSON_PARSE.inc(result=parsed)
+    return validate_memories(out.get("memories")) if out else []
+
+
+async def groq_summarize_async(api_key: str, model: str, summary: str, turns: list[dict], url: str | None = None,
+                               timeout: float = 30) -> str:
+    # rolling conversation summary (backend/conversations.py)
+    if not api_key:
+        raise RuntimeError("Missing GROQ_API_KEY")
+
+    payload = _payload(model, build_summary_prompt(summary, turns), max_tokens=300)
+    r = await get_http_client().post(url or GROQ_URL, headers=_headers(api_key), json=payload, timeout=timeout)
+    if r.status_code != 200:
+        raise RuntimeError(f"Groq API error: {r.status_code} - {r.text}")
+
+    out, parsed = extract_json(r.json()["choices"][0]["message"]["content"])
+    LLM_JSON_PARSE.inc(result=parsed)
+    if not out or not isinstance(out.get("summary"), str):
+        raise ValueError("summary response without a summary")
+    return out["summary"].strip()
+
+
+async def groq_stream_content(api_key: str, model: str, prompt: str, usage: dict | None = None,
+                              url: str | None = None, max_tokens: int = LLM_MAX_TOKENS):
+    # yields raw content deltas; pass a dict as `usage` to receive token usage at the end
+    if not api_key:
+        raise RuntimeError("Missing GROQ_API_KEY")
+
+    payload = _payload(model, prompt, max_tokens)
+    payload["stream"] = True
+    # JSON mode can't be combined with streaming, the prompt contract has to carry it
+    payload.pop("response_format", None)
+
+    client = get_http_client()
+    async with client.stream("POST", url or GROQ_URL, headers=_headers(api_key), json=payload, timeout=60) as r:
+        if r.status_code != 200:
+            body = (await r.aread()).decode("utf-8", "replace")
+            raise RuntimeError(f"Groq API error: {r.status_code} - {body}")
+
+        async for line in r.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if usage is not None:
+                usage.update((chunk.get("x_groq") or {}).get("usage") or chunk.get("usage") or {})
+            for choice in chunk.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+
 
 # def groq_answer_and_memories(api_key: str, model: str, prompt: str) -> dict:
 #     if not api_key:
@@ -171,4 +232,4 @@ def groq_answer_and_memories(api_key: str, model: str, prompt: str) -> dict:
 #             "raw_http_text": raw_text,
 #             "usage": data.get("usage", {}),
 #         }
-#     }
\ No newline at end of file
+#     }
@@ -0,0 +1,191 @@
+import json
+import math
+import re
+from typing import TypedDict
+
+try:
+    import orjson
+except ImportError:  # stdlib json works the same here, just slower
+    orjson = None
+
+# Tolerant JSON extraction for LLM output, shared by the Groq and Gemini paths.
+# Everything is a left-to-right scan: no regex backtracking over the body, and
+# malformed output costs a bounded number of linear passes (MAX_CANDIDATES).
+
+ALLOWED_KINDS = frozenset({"fact", "goal", "preference", "weakness", "strength", "constraint"})
+MAX_MEMORIES = 20
+MAX_MEMORY_CHARS = 500
+MAX_CANDIDATES = 4  # '{' starts tried before giving up on salvage
+
+
+class ExtractedMemory(TypedDict):
+    text: str
+    kind: str
+    confidence: float
+
+
+def loads(s: str | bytes):
+    return orjson.loads(s) if orjson is not None else json.loads(s)
+
+
+def strip_fences(s: str) -> str:
+    # ```json\n{...}\n``` -> {...}
+    s = s.strip()
+    if s.startswith("```"):
+        nl = s.find("\n")
+        s = s[nl + 1:] if nl != -1 else s[3:]
+        if s.endswith("```"):
+            s = s[:-3]
+        s = s.strip()
+    return s
+
+
+# only structural characters matter to the scanner; string bodies are skipped in one
+# regex match (unrolled loop, no backtracking), so the Python loop runs per token
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+
+
+def scan_object(text: str, start: int) -> tuple[int, list[str], int, list]:
+    # from the '{' at `start`: -> (end index after the matching '}' or -1,
+    # closers still open at the end of the text, position of an unterminated
+    # string's opening quote or -1, last few (comma position, open closers)
+    # for backing off a truncated tail)
+    stack = []
+    cuts = []
+    i = start
+    while True:
+        m = _STRUCTURAL.search(text, i)
+        if m is None:
+            return -1, stack, -1, cuts
+        c = m.group()
+        j = m.start()
+        if c == '"':
+            e = _STRING_REST.match(text, j + 1)
+            if e is None:
+                return -1, stack, j, cuts
+            i = e.end()
+            continue
+        i = j + 1
+        if c == "{":
+            stack.append("}")
+        elif c == "[":
+            stack.append("]")
+        elif c == ",":
+            cuts.append((j, stack[:]))
+            if len(cuts) > MAX_CANDIDATES:
+                del cuts[0]
+        elif not stack or stack.pop() != c:
+            return -1, [], -1, []  # mismatched bracket: not JSON from here
+        elif not stack:
+            return i, [], -1, []
+
+
+def _repair(fragment: str, open_closers: list[str], open_str: int = -1) -> str:
+    # trailing commas out, unterminated string (starting at open_str) and brackets
+    # closed, i.e. what max_tokens truncation leaves behind
+    body = fragment if open_str == -1 else fragment[:open_str]
+    out = []
+    i = 0
+    while True:
+        q = body.find('"', i)
+        if q == -1:
+            out.append(_TRAILING_COMMA.sub(r"\1", body[i:]))
+            break
+        out.append(_TRAILING_COMMA.sub(r"\1", body[i:q]))
+        e = _STRING_REST.match(body, q + 1)
+        out.append(body[q:e.end()])  # terminated: scan_object reported the open one
+        i = e.end()
+    if open_str != -1:
+        rest = fragment[open_str:]
+        if (len(rest) - len(rest.rstrip("\\"))) % 2:
+            rest = rest[:-1]  # dangling escape
+        out.append(rest + '"')
+    tail = "".join(out).rstrip()
+    if tail.endswith(","):
+        tail = tail[:-1]
+    return tail + "".join(reversed(open_closers))
+
+
+def _loads_dict(s: str) -> dict | None:
+    try:
+        out = loads(s)
+    except ValueError:
+        return None
+    return out if isinstance(out, dict) else None
+
+
+def _close_truncated(text: str, pos: int, open_closers: list[str], open_str: int, cuts: list) -> dict | None:
+    # close what is open; if the last element itself is broken ({"text": "a", "ki),
+    # drop it by cutting back to an earlier comma
+    out = _loads_dict(_repair(text[pos:], open_closers, open_str - pos if open_str != -1 else -1))
+    for cut, closers in reversed(cuts):
+        if out is not None:
+            break
+        out = _loads_dict(_repair(text[pos:cut], closers))
+    return out
+
+
+def extract_json(text: str) -> tuple[dict | None, str]:
+    # -> (object, how) with how in strict | salvaged | repaired | failed
+    text = strip_fences(text)
+    if text.startswith("{"):
+        out = _loads_dict(text)
+        if out is not None:
+            return out, "strict"
+
+    pos = text.find("{")
+    for _ in range(MAX_CANDIDATES):
+        if pos == -1:
+            break
+        end, open_closers, open_str, cuts = scan_object(text, pos)
+        if end != -1:
+            fragment = text[pos:end]
+            out = _loads_dict(fragment)
+            if out is not None:
+                return out, "salvaged"
+            out = _loads_dict(_repair(fragment, []))
+            if out is not None:
+                return out, "repaired"
+        elif open_closers:
+            # ran off the end: truncated output (or a stray '{' in prose before the JSON)
+            out = _close_truncated(text, pos, open_closers, open_str, cuts)
+            if out is not None:
+                return out, "repaired"
+        pos = text.find("{", pos + 1)
+    return None, "failed"
+
+
+def _confidence(v) -> float | None:
+    try:
+        c = float(v)
+    except (TypeError, ValueError):
+        return None
+    if math.isnan(c):
+        return None
+    return max(0.0, min(1.0, c))
+
+def validate_memories(raw) -> list[ExtractedMemory]:
+    # drops anything off-schema instead of failing the whole response
+    if not isinstance(raw, list):
+        return []
+    out: list[ExtractedMemory] = []
+    seen = set()
+    for m in raw:
+        if not isinstance(m, dict):
+            continue
+        text = m.get("text")
+        kind = m.get("kind")
+        if not isinstance(text, str) or not isinstance(kind, str):
+            continue
+        text = text.strip()[:MAX_MEMORY_CHARS]
+        kind = kind.strip().lower()
+        conf = _confidence(m.get("confidence") or 0.0)
+        if not text or kind not in ALLOWED_KINDS or conf is None or text in seen:
+            continue
+        seen.add(text)
+        out.append({"text": text, "kind": kind, "confidence": conf})
+        if len(out) >= MAX_MEMORIES:
+            break
+    return out
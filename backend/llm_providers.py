@@ -0,0 +1,346 @@
+import asyncio
+import random
+import time
+from collections import deque
+from .config import (GROQ_API_KEY, GROQ_MODEL, GEMINI_API_KEY, LLM_PROVIDERS, LLM_ATTEMPT_TIMEOUT,
+                     LLM_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_HEDGE, LLM_HEDGE_MIN_DELAY,
+                     LLM_HEDGE_MAX_DELAY, LLM_BREAKER_FAILURES, LLM_BREAKER_RESET, LLM_MAX_TOKENS,
+                     EXTRACTOR, EXTRACT_GROQ_MODEL, EXTRACT_TIMEOUT, SUMMARY_MODEL, SUMMARY_TIMEOUT)
+from .llm_groq import groq_answer_and_memories_async, groq_extract_memories_async, groq_summarize_async
+from .llm_gemini import gemini_answer_and_memories_async, gemini_extract_memories_async
+from .metrics import LLM_CALL_SECONDS, span, record_llm_usage
+
+
+class LLMUnavailable(RuntimeError):
+    pass
+
+
+class LLMProvider:
+    # common contract: complete(prompt) -> {"answer", "memories", "debug"}
+    name = "base"
+
+    async def complete(self, prompt: str, timeout: float, full_debug: bool = False) -> dict:
+        raise NotImplementedError
+
+
+class GroqProvider(LLMProvider):
+    name = "groq"
+
+    def __init__(self, api_key: str | None = GROQ_API_KEY, model: str = GROQ_MODEL, url: str | None = None,
+                 max_tokens: int = LLM_MAX_TOKENS):
+        self.api_key = api_key
+        self.model = model
+        self.url = url
+        self.max_tokens = max_tokens
+
+    async def complete(self, prompt: str, timeout: float, full_debug: bool = False) -> dict:
+        return await groq_answer_and_memories_async(self.api_key, self.model, prompt, url=self.url, timeout=timeout,
+                                                    full_debug=full_debug, max_tokens=self.max_tokens)
+
+
+class GeminiProvider(LLMProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str | None = GEMINI_API_KEY, url: str | None = None,
+                 max_tokens: int = LLM_MAX_TOKENS):
+        self.api_key = api_key
+        self.url = url
+        self.max_tokens = max_tokens
+
+    async def complete(self, prompt: str, timeout: float, full_debug: bool = False) -> dict:
+        return await gemini_answer_and_memories_async(self.api_key, prompt, url=self.url, timeout=timeout,
+                                                      full_debug=full_debug, max_tokens=self.max_tokens)
+
+
+class CircuitBreaker:
+    # closed -> open after N consecutive failures -> half-open after reset_after (one probe)
+    def __init__(self, failure_threshold: int = LLM_BREAKER_FAILURES, reset_after: float = LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def available(self) -> bool:
+        return self.state != "open"
+
+    def allow(self) -> bool:
+        # claims the single half-open probe slot; call right before sending
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def release_probe(self):
+        # the attempt was cancelled (lost a hedge race, client went away): no verdict,
+        # let the next request probe instead of wedging in half-open
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.failures >= self.failure_threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        if len(self.samples) < 20:
+            return None
+        xs = sorted(self.samples)
+        return xs[min(len(xs) - 1, int(q * len(xs)))]
+
+
+class LLMRouter:
+    # Per-attempt timeouts, jittered retries, hedging to the next provider after
+    # the primary's p95 latency, and a circuit breaker per provider.
+    def __init__(self, providers: list[LLMProvider], attempt_timeout: float = LLM_ATTEMPT_TIMEOUT,
+                 retries: int = LLM_RETRIES, backoff_base: float = LLM_BACKOFF_BASE,
+                 backoff_max: float = LLM_BACKOFF_MAX, hedge: bool = LLM_HEDGE,
+                 hedge_min_delay: float = LLM_HEDGE_MIN_DELAY, hedge_max_delay: float = LLM_HEDGE_MAX_DELAY):
+        if not providers:
+            raise ValueError("LLMRouter needs at least one provider")
+        self.providers = providers
+        self.attempt_timeout = attempt_timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_delay = hedge_max_delay
+        self.breakers = {p.name: CircuitBreaker() for p in providers}
+        self.latency = {p.name: LatencyTracker() for p in providers}
+        self.hedges_fired = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self, provider: LLMProvider) -> float:
+        p95 = self.latency[provider.name].quantile(0.95)
+        if p95 is None:
+            return self.hedge_max_delay
+        return min(self.hedge_max_delay, max(self.hedge_min_delay, p95))
+
+    async def _call(self, provider: LLMProvider, prompt: str, full_debug: bool = False) -> dict:
+        with span("llm.call", **{"llm.provider": provider.name, "llm.prompt_chars": len(prompt)}) as s:
+            t0 = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(provider.complete(prompt, self.attempt_timeout, full_debug=full_debug),
+                                                timeout=self.attempt_timeout)
+            except asyncio.CancelledError:
+                # lost a hedge race: says nothing about the provider's health
+                self.breakers[provider.name].release_probe()
+                LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider=provider.name, status="cancelled")
+                raise
+            except asyncio.TimeoutError:
+                self.breakers[provider.name].record_failure()
+                LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider=provider.name, status="timeout")
+                raise TimeoutError(f"{provider.name} timed out after {self.attempt_timeout}s")
+            except Exception:
+                self.breakers[provider.name].record_failure()
+                LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider=provider.name, status="error")
+                raise
+            dt = time.perf_counter() - t0
+            self.breakers[provider.name].record_success()
+            self.latency[provider.name].add(dt)
+            LLM_CALL_SECONDS.observe(dt, provider=provider.name, status="ok")
+            record_llm_usage(provider.name, result.get("debug", {}).get("usage"), s)
+            result["provider"] = provider.name
+            result["provider_ms"] = int(dt * 1000)
+            return result
+
+    async def _race(self, providers: list[LLMProvider], prompt: str, full_debug: bool = False) -> dict:
+        queue = list(providers)
+        pending = {}
+        errors = []
+
+        def launch() -> bool:
+            while queue:
+                p = queue.pop(0)
+                if self.breakers[p.name].allow():
+                    pending[asyncio.create_task(self._call(p, prompt, full_debug))] = p
+                    return True
+            return False
+
+        launch()
+        primary = providers[0]
+        try:
+            while pending:
+                timeout = self.hedge_delay(primary) if (self.hedge and queue) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # primary is slower than its p95: fire the next provider too
+                    self.hedges_fired += 1
+                    launch()
+                    continue
+                for t in done:
+                    p = pending.pop(t)
+                    if t.exception() is None:
+                        if p is not primary:
+                            self.hedge_wins += 1
+                        return t.result()
+                    errors.append(f"{p.name}: {t.exception()}")
+                if not pending:
+                    launch()  # plain fallback after a failure
+        finally:
+            for t in pending:
+                t.cancel()
+        raise LLMUnavailable("; ".join(errors) or "no provider available")
+
+    async def complete(self, prompt: str, full_debug: bool = False) -> dict:
+        # full_debug: keep prompt and raw response bodies in result["debug"]
+        last = None
+        for attempt in range(self.retries + 1):
+            providers = [p for p in self.providers if self.breakers[p.name].available()]
+            if providers:
+                try:
+                    return await self._race(providers, prompt, full_debug)
+                except LLMUnavailable as e:
+                    last = e
+            else:
+                last = LLMUnavailable("all LLM providers have open circuit breakers")
+            if attempt < self.retries:
+                # full jitter backoff
+                await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+        raise last
+
+    def stats(self) -> dict:
+        return {
+            "hedges_fired": self.hedges_fired,
+            "hedge_wins": self.hedge_wins,
+            "providers": {
+                p.name: {
+                    "breaker": self.breakers[p.name].state,
+                    "p50_ms": int((self.latency[p.name].quantile(0.5) or 0) * 1000),
+                    "p95_ms": int((self.latency[p.name].quantile(0.95) or 0) * 1000),
+                }
+                for p in self.providers
+            },
+        }
+
+
+def make_router(max_tokens: int = LLM_MAX_TOKENS) -> LLMRouter:
+    available = {
+        "groq": lambda: GroqProvider(max_tokens=max_tokens) if GROQ_API_KEY else None,
+        "gemini": lambda: GeminiProvider(max_tokens=max_tokens) if GEMINI_API_KEY else None,
+    }
+    providers = []
+    for name in LLM_PROVIDERS:
+        if name not in available:
+            raise RuntimeError(f"Unknown LLM provider: {name}")
+        p = available[name]()
+        if p is not None:
+            providers.append(p)
+    # keep the old behaviour (Groq, failing with "Missing GROQ_API_KEY") when nothing is configured
+    return LLMRouter(providers or [GroqProvider(max_tokens=max_tokens)])
+
+
+class MemoryExtractor:
+    # second stage of the split pipeline: extract(message) -> validated memories.
+    # Runs next to the answer call, never blocks the response, so failures are
+    # counted and swallowed instead of going through the router's retries.
+    name = "base"
+
+    def __init__(self, timeout: float = EXTRACT_TIMEOUT):
+        self.timeout = timeout
+        self.calls = 0
+        self.failures = 0
+        self.memories = 0
+
+    async def _extract(self, message: str) -> list[dict]:
+        raise NotImplementedError
+
+    async def extract(self, message: str) -> list[dict]:
+        with span("llm.extract", **{"llm.provider": self.name}):
+            self.calls += 1
+            t0 = time.perf_counter()
+            try:
+                out = await asyncio.wait_for(self._extract(message), timeout=self.timeout)
+            except asyncio.CancelledError:
+                LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider=self.name, status="cancelled")
+                raise
+            except Exception as e:
+                self.failures += 1
+                status = "timeout" if isinstance(e, asyncio.TimeoutError) else "error"
+                LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider=self.name, status=status)
+                raise
+            LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider=self.name, status="ok")
+            self.memories += len(out)
+            return out
+
+    def stats(self) -> dict:
+        return {"extractor": self.name, "calls": self.calls, "failures": self.failures, "memories": self.memories}
+
+
+class GeminiExtractor(MemoryExtractor):
+    name = "gemini-extract"
+
+    def __init__(self, api_key: str | None = GEMINI_API_KEY, url: str | None = None, **kw):
+        super().__init__(**kw)
+        self.api_key = api_key
+        self.url = url
+
+    async def _extract(self, message: str) -> list[dict]:
+        return await gemini_extract_memories_async(self.api_key, message, url=self.url, timeout=self.timeout)
+
+
+class GroqExtractor(MemoryExtractor):
+    name = "groq-extract"
+
+    def __init__(self, api_key: str | None = GROQ_API_KEY, model: str = EXTRACT_GROQ_MODEL, url: str | None = None,
+                 **kw):
+        super().__init__(**kw)
+        self.api_key = api_key
+        self.model = model
+        self.url = url
+
+    async def _extract(self, message: str) -> list[dict]:
+        return await groq_extract_memories_async(self.api_key, self.model, message, url=self.url,
+                                                 timeout=self.timeout)
+
+
+def make_extractor(name: str = EXTRACTOR) -> MemoryExtractor | None:
+    # None when the chosen extractor has no key: the caller falls back to the single-call pipeline
+    if name == "gemini":
+        return GeminiExtractor() if GEMINI_API_KEY else None
+    if name == "groq":
+        return GroqExtractor() if GROQ_API_KEY else None
+    raise RuntimeError(f"Unknown extractor: {name}")
+
+
+
+def make_summarizer(api_key: str | None = GROQ_API_KEY, model: str = SUMMARY_MODEL, timeout: float = SUMMARY_TIMEOUT):
+    # rolling conversation summaries; None without a key (conversations keep the recent window only)
+    if not api_key:
+        return None
+
+    async def summarize(summary: str, turns: list[dict]) -> str:
+        with span("llm.summarize", **{"llm.provider": "groq-summary", "llm.turns": len(turns)}):
+            t0 = time.perf_counter()
+            try:
+                out = await groq_summarize_async(api_key, model, summary, turns, timeout=timeout)
+            except Exception:
+                LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider="groq-summary", status="error")
+                raise
+            LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider="groq-summary", status="ok")
+            return out
+
+    return summarize
@@ -1,55 +1,235 @@
-from fastapi import FastAPI, HTTPException
-from .models import SignupReq, LoginReq, ChatReq, ChatResp, MemoryCitation
-from .auth import init_auth_db, create_user, verify_user, new_session, user_from_session
-from .neo4j_client import Neo4jClient
+from .startup import STARTUP  # first, so the profile's clock covers every other import
+import asyncio
+import hmac
+import time
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from starlette.background import BackgroundTask
+from .models import SignupReq, LoginReq, ChatReq, ChatResp, MemoryCitation, RehydrateReq
+from .auth import (init_auth_db, create_user, verify_user, new_session, user_from_session, sweep_sessions,
+                   drain_rehashes, AuthDBBusy, PASSWORD_HASHER)
+from .hashing import HasherBusy
+from .neo4j_client import AsyncNeo4jClient
 from .memory import make_memory
-from .llm_groq import groq_answer_and_memories
-from .config import GROQ_API_KEY, GROQ_MODEL
-from .utils import timed
+from .llm_groq import groq_stream_content, parse_answer_and_memories, TEMPERATURE
+from .llm_providers import make_router, make_extractor, make_summarizer, LLMUnavailable
+from .config import (GROQ_API_KEY, GROQ_MODEL, RETRIEVAL_LIMIT, MEMORY_CACHE_MAX_PER_USER, SESSION_SWEEP_INTERVAL,
+                     CHAT_PIPELINE, LLM_MAX_TOKENS, LLM_ANSWER_MAX_TOKENS, EXTRACT_TIMEOUT, SUMMARY_TIMEOUT,
+                     RETRIEVAL_MODE, BATCH_API_KEY, BATCH_CONCURRENCY, BATCH_CHUNK_SIZE, BATCH_MAX_LINES,
+                     NEO4J_CONNECT_TIMEOUT, NEO4J_RETRY_MAX, NEO4J_HEALTH_INTERVAL)
+from .embeddings import embed, rank_memories, get_embedder
+from .entities import entity_keys
+from .prompt import build_chat_prompt, CHAT_INSTRUCTIONS, ANSWER_INSTRUCTIONS
+from .llm_cache import LLMResponseCache, cache_key
+from .utils import timed, Trace, trace_level
+from .metrics import REGISTRY, Gauge, CONTENT_TYPE, LLM_CALL_SECONDS, record_llm_usage
+from .http_client import close_http_client
+from .streaming import AnswerStreamParser, sse_event, jsonl_line
+from .memory_writer import MemoryWriter
+from .memory_cache import make_memory_cache
+from .lifecycle import apply_decay, is_expired, split_archive, rewrite_archive, ArchiveLock
+from .conversations import ConversationStore
+from .admission import make_rate_limiter, AdmissionGate, Overloaded
+from .batch import run_batch
 
 app = FastAPI()
-neo = Neo4jClient()
+neo = AsyncNeo4jClient()
+memory_cache = make_memory_cache()
+writer = MemoryWriter(neo, cache=memory_cache)
+llm_cache = LLMResponseCache()
+llm_gate = AdmissionGate()
+summarizer = make_summarizer()
+# split pipeline: answer-only calls through the router, memories from a concurrent
+# extraction call; stays single-call when the extractor has no API key
+extractor = make_extractor() if CHAT_PIPELINE == "split" else None
+answer_max_tokens = LLM_ANSWER_MAX_TOKENS if extractor else LLM_MAX_TOKENS
+router = make_router(max_tokens=answer_max_tokens)
+limiter = make_rate_limiter()
+background_tasks: list[asyncio.Task] = []
+pending_extractions: set[asyncio.Task] = set()
+
+
+async def _admit_waiting() -> float | None:
+    # background and batch work waits out overload instead of failing: nobody is watching a spinner
+    while True:
+        try:
+            return await llm_gate.acquire()
+        except Overloaded as e:
+            await asyncio.sleep(e.retry_after)
+
+async def _gated(call, *args):
+    # extraction and summary calls are provider calls too, each holds its own slot; the
+    # slot is never held while waiting for another, so callers can't deadlock on the gate
+    acquired_at = await _admit_waiting()
+    try:
+        return await call(*args)
+    finally:
+        llm_gate.release(acquired_at)
+
+async def _summarize(summary: str, turns: list[dict]) -> str:
+    return await _gated(summarizer, summary, turns)
+
+conversations = ConversationStore(summarizer=_summarize if summarizer else None)
+
+REGISTRY.register(Gauge("memory_writer_queue_depth", "Memories waiting in the write-behind queue",
+                        lambda: writer.stats()["queue_depth"]))
+REGISTRY.register(Gauge("memory_writer_failed_memories", "Memories the writer failed to persist",
+                        lambda: writer.stats()["failed"]))
+REGISTRY.register(Gauge("memory_cache_hit_rate", "Per-user memory cache hit rate",
+                        lambda: memory_cache.stats()["hit_rate"]))
+REGISTRY.register(Gauge("llm_cache_hit_rate", "LLM response cache hit rate", lambda: llm_cache.stats()["hit_rate"]))
+REGISTRY.register(Gauge("llm_inflight", "LLM calls holding an admission slot", lambda: llm_gate.inflight))
+REGISTRY.register(Gauge("llm_admission_queue_depth", "Requests waiting for an LLM slot", lambda: llm_gate.waiting))
+REGISTRY.register(Gauge("password_hasher_queue_depth", "Password hashes waiting for a worker",
+                        lambda: PASSWORD_HASHER.stats()["queue_depth"]))
+REGISTRY.register(Gauge("app_ready", "1 when /health/ready passes", lambda: int(STARTUP.ready)))
+STARTUP.expect("auth_db", "neo4j", "accepting")
+STARTUP.imported()
 
 @app.on_event("startup")
-def startup():
-    init_auth_db()
-    neo.init_schema()
+async def startup():
+    # only local work blocks serving; Neo4j comes up in the background and gates /health/ready
+    with STARTUP.stage("auth_db") as st:
+        st["path"] = str(await run_in_threadpool(init_auth_db))
+    STARTUP.check("auth_db", True)
+    with STARTUP.stage("password_hasher"):
+        PASSWORD_HASHER.start()
+    writer.start()
+    background_tasks.append(asyncio.create_task(_watch_neo4j()))
+    background_tasks.append(asyncio.create_task(_sweep_sessions_forever()))
+    STARTUP.check("accepting", True)
+
+async def _watch_neo4j():
+    # connect + migrate with backoff until it works, then keep checking so readiness
+    # follows a later outage (requests meanwhile fail on their own, as before)
+    delay = 0.5
+    while True:
+        try:
+            with STARTUP.stage("neo4j"):
+                await asyncio.wait_for(neo.connect(), timeout=NEO4J_CONNECT_TIMEOUT)
+                await neo.init_schema()
+            STARTUP.check("neo4j", True)
+            break
+        except Exception as e:
+            STARTUP.check("neo4j", False, error=str(e) or type(e).__name__)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, NEO4J_RETRY_MAX)
+    while True:
+        await asyncio.sleep(NEO4J_HEALTH_INTERVAL)
+        try:
+            await asyncio.wait_for(neo.connect(), timeout=NEO4J_CONNECT_TIMEOUT)
+            STARTUP.check("neo4j", True)
+        except Exception as e:
+            STARTUP.check("neo4j", False, error=str(e) or type(e).__name__)
+
+async def _sweep_sessions_forever():
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        try:
+            await run_in_threadpool(sweep_sessions)
+            await run_in_threadpool(conversations.sweep)
+        except Exception as e:
+            print("session sweep failed:", e)
 
 @app.on_event("shutdown")
-def shutdown():
-    neo.close()
+async def shutdown():
+    STARTUP.check("accepting", False)
+    for t in background_tasks:
+        t.cancel()
+    # let in-flight extractions reach the writer before it drains
+    if pending_extractions:
+        await asyncio.wait(pending_extractions, timeout=EXTRACT_TIMEOUT)
+    await conversations.drain(SUMMARY_TIMEOUT)
+    await writer.stop()
+    await neo.close()
+    await close_http_client()
+    llm_cache.close()
+    await drain_rehashes(5)
+    await run_in_threadpool(PASSWORD_HASHER.shutdown)  # joins the worker processes
 
 @app.post("/auth/signup")
-def signup(req: SignupReq):
+async def signup(req: SignupReq):
     try:
-        user_id = create_user(req.username, req.password)
+        user_id = await create_user(req.username, req.password)
+    except (HasherBusy, AuthDBBusy):
+        raise HTTPException(status_code=503, detail="auth busy, retry shortly", headers={"Retry-After": "1"})
     except Exception:
         raise HTTPException(status_code=400, detail="username already exists or invalid")
-    neo.ensure_user_node(user_id, req.username)
+    await neo.ensure_user_node(user_id, req.username)
 
     # seed interview prep onboarding memories (baseline)
     seed = [
         f"Interview prep mode: enabled",
         f"Username: {req.username}"
     ]
-    for s in seed:
-        neo.add_memory(user_id, make_memory(s, kind="fact", source="system"))
+    await neo.add_memories(user_id, [make_memory(s, kind="fact", source="system") for s in seed])
+    await memory_cache.invalidate(user_id)
 
     return {"user_id": user_id}
 
 @app.post("/auth/login")
-def login(req: LoginReq):
-    user_id = verify_user(req.username, req.password)
+async def login(req: LoginReq):
+    try:
+        user_id = await verify_user(req.username, req.password)
+    except (HasherBusy, AuthDBBusy):
+        raise HTTPException(status_code=503, detail="auth busy, retry shortly", headers={"Retry-After": "1"})
     if not user_id:
         raise HTTPException(status_code=401, detail="invalid credentials")
-    token = new_session(user_id)
+    token = await run_in_threadpool(new_session, user_id)
     return {"session_token": token, "user_id": user_id}
 
-@app.post("/chat", response_model=ChatResp)
-def chat(req: ChatReq):
-    trace = []
-    user_id = user_from_session(req.session_token)
-    trace.append({
+MEMORY_CONF_THRESHOLD = 0.75
+RANK_INLINE_MAX = 200  # bigger candidate sets are ranked in the threadpool, off the event loop
+
+def _too_many(e: Overloaded) -> HTTPException:
+    return HTTPException(status_code=429, detail=f"too many requests ({e.reason}), retry later",
+                         headers={"Retry-After": e.header()})
+
+async def _retrieve_memories(user_id: str, message: str, trace: Trace) -> list[dict]:
+    query = embed(message)
+    keys = entity_keys(message) if RETRIEVAL_MODE == "graph" else []
+    if keys:
+        # entity-aware ranking needs the MENTIONS/PART_OF graph: one round trip to Neo4j
+        ranked = await neo.graph_search_memories(user_id, query, keys, limit=RETRIEVAL_LIMIT)
+        trace.detail(lambda: {"stage": "graph_retrieval", "status": "ok", "entities": keys,
+                              "graph_hits": sum(1 for m in ranked if m.get("graph_score"))})
+        return apply_decay(ranked)
+
+    return await _vector_search(user_id, query, await _user_memories(user_id, trace))
+
+async def _user_memories(user_id: str, trace: Trace) -> list[dict] | None:
+    # the user's memories for in-process ranking, None when there are too many
+    cached = await memory_cache.get(user_id)
+    status = "hit"
+    if cached is None:
+        status = "miss"
+        generation = memory_cache.generation(user_id)  # a write landing during the load makes this stale
+        cached = await neo.get_memories_with_embeddings(user_id, limit=MEMORY_CACHE_MAX_PER_USER + 1)
+        if len(cached) > MEMORY_CACHE_MAX_PER_USER:
+            # too many to rank in process, let Neo4j do it
+            cached = None
+            status = "bypass"
+        else:
+            await memory_cache.put(user_id, cached, generation)
+    trace.detail(lambda: {"stage": "memory_cache", "status": status, **memory_cache.stats()})
+    return cached
+
+async def _vector_search(user_id: str, query: list[float], cached: list[dict] | None) -> list[dict]:
+    if cached is None:
+        ranked = await neo.search_memories(user_id, query, limit=RETRIEVAL_LIMIT)
+    else:
+        # expired ones stay out of prompts until the archive job picks them up
+        keep = lambda m: not is_expired(m)
+        if len(cached) > RANK_INLINE_MAX:
+            ranked = await run_in_threadpool(rank_memories, cached, query, RETRIEVAL_LIMIT, keep)
+        else:
+            ranked = rank_memories(cached, query, RETRIEVAL_LIMIT, keep)
+    return apply_decay(ranked)
+
+async def _prepare_chat(req: ChatReq, trace: Trace) -> tuple[str, list[dict], str]:
+    user_id = await run_in_threadpool(user_from_session, req.session_token)
+    trace.detail(lambda: {
         "stage": "auth_scope",
         "status": "ok",
         "user_id": user_id,
@@ -57,66 +237,46 @@ def chat(req: ChatReq):
     })
     if not user_id:
         raise HTTPException(status_code=401, detail="invalid session")
+    try:
+        await limiter.check(user_id)
+    except Overloaded as e:
+        raise _too_many(e)
 
-    # 1) Retrieve memories
+    # 1) Retrieve memories most similar to the message, and this session's conversation so far
     with timed("retrieve_memories", trace):
-        memories = neo.get_memories(user_id, limit=12)
+        memories = await _retrieve_memories(user_id, req.message, trace)
+    summary, turns = "", []
+    if req.use_history:
+        with timed("load_history", trace):
+            summary, turns = await conversations.context(req.session_token)
 
-    # 2) Build prompt with strict JSON contract
-    context_lines = [f"- ({m['kind']}) {m['text']} [id={m['memory_id']}]" for m in memories]
-
-    prompt = f"""
-Return STRICT JSON only (no markdown, no extra text) with this shape:
-{{
-  "answer": "string",
-  "memories": [
-    {{"text": "string", "kind": "fact|goal|preference|weakness|strength|constraint", "confidence": 0.0}}
-  ]
-}}
-
-Answer rules:
-- Give a helpful, complete answer (normally 10-15 lines) around 150–250 words.
-- Use bullets/steps when useful.
-- If the user asks something vague, ask 1 clarifying question at the end.
-
-Memory rules:
-- Extract ONLY durable user-specific info worth saving for future personalization.
-- Max 5 items.
-- confidence in [0,1]. Use >=0.75 only when clearly stated by user.
-- Do NOT store generic questions like "explain normalization", keep it user oriented.
-- If no durable info, return empty memories: [].
-
-User memory context:
-{chr(10).join(context_lines)}
-
-User message:
-{req.message}
-""".strip()
-
-
-    # 3) One Groq call: answer + extracted memories
-    with timed("llm_call_groq", trace):
-        result = groq_answer_and_memories(GROQ_API_KEY, GROQ_MODEL, prompt)
-
-    answer = result.get("answer", "")
-    extracted = result.get("memories", [])
+    # 2) Build prompt with strict JSON contract, packed into the token budget
+    with timed("prompt_build", trace):
+        prompt, memories, prompt_stats = build_chat_prompt(
+            memories, req.message, instructions=ANSWER_INSTRUCTIONS if extractor else CHAT_INSTRUCTIONS,
+            summary=summary, turns=turns)
+    trace.detail(lambda: {"stage": "prompt_tokens", "status": "ok", **prompt_stats})
+    writer.touch([m["memory_id"] for m in memories])
+    return user_id, memories, prompt
 
+def _groq_trace(result: dict) -> dict:
     dbg = result.get("debug", {})
-    trace.append({
+    return {
         "stage": "groq_io",
         "status": "ok",
+        "provider": result.get("provider", "groq"),
         "model": dbg.get("model"),
         "usage": dbg.get("usage"),
         "http_preview_len": len(dbg.get("raw_http_text", "") or ""),
         "prompt_preview": (dbg.get("prompt","")[:1200]),  # avoid huge UI spam
         "raw_preview": (dbg.get("raw_content","")[:1200]),
-    })
-
-    # 4) Store extracted memories (threshold)
-    MEMORY_CONF_THRESHOLD = 0.75
+    }
 
+async def _store_extracted(user_id: str, extracted: list[dict], trace: Trace):
+    # 4) Queue extracted memories (threshold); persisted by the write-behind worker
     with timed("store_memories", trace):
         stored = []
+        to_write = []
         for m in extracted:
             text = (m.get("text") or "").strip()
             kind = (m.get("kind") or "").strip()
@@ -125,18 +285,41 @@ User message:
             if not text or conf < MEMORY_CONF_THRESHOLD:
                 continue
 
-            neo.add_memory(user_id, make_memory(text, kind=kind, source="chat", confidence=conf))
+            to_write.append(make_memory(text, kind=kind, source="chat", confidence=conf))
             stored.append({"text": text, "kind": kind, "confidence": conf})
 
-    trace.append({"stage": "stored_memories", "status": "ok", "count": len(stored), "items": stored[:5]})
+        queued = await writer.submit(user_id, to_write)
+
+    trace.detail(lambda: {"stage": "stored_memories", "status": "ok", "count": len(stored), "items": stored[:5],
+                          "queued": queued, "writer": writer.stats()})
+
+def _start_extraction(user_id: str, message: str, trace: Trace):
+    # split pipeline: runs next to the answer call and stores its memories on its own
+    # time, after the response has gone out
+    if extractor is None:
+        return
+
+    async def run():
+        try:
+            extracted = await _gated(extractor.extract, message)
+        except Exception as e:
+            print("memory extraction failed:", e)
+            return
+        await _store_extracted(user_id, extracted, Trace("off"))
 
-    # 5) citations = retrieved memories (top few)
+    task = asyncio.create_task(run())
+    pending_extractions.add(task)
+    task.add_done_callback(pending_extractions.discard)
+    trace.detail(lambda: {"stage": "memory_extraction", "status": "deferred", "extractor": extractor.name})
+
+def _chat_resp(answer: str, memories: list[dict], trace: Trace) -> ChatResp:
+    # 5) citations = retrieved memories (top few), scored by cosine similarity
     citations = []
-    for i, m in enumerate(memories[:5]):
+    for m in memories[:5]:
         citations.append(MemoryCitation(
             memory_id=m["memory_id"],
             snippet=m["text"][:80],
-            score=1.0 - (i * 0.05)
+            score=round(float(m.get("score") or 0.0), 4)
         ))
 
     # timings
@@ -155,10 +338,270 @@ User message:
         retrieval_time_ms=retrieval_ms,
         llm_time_ms=llm_ms,
         memory_citations=citations,
-        debug_trace=trace
+        debug_trace=trace.export()
     )
 
+def _cacheable(result: dict) -> dict:
+    # raw HTTP body and prompt are not worth keeping on disk
+    dbg = result.get("debug", {})
+    return {"answer": result.get("answer", ""), "memories": result.get("memories", []),
+            "debug": {"model": dbg.get("model"), "usage": dbg.get("usage"), "raw_content": dbg.get("raw_content", "")}}
+
+async def _cache_lookup(req: ChatReq, key: str, trace: Trace) -> dict | None:
+    if not llm_cache.enabled:
+        return None
+    result = None
+    if not req.bypass_cache:
+        with timed("llm_cache_lookup", trace):
+            result = await llm_cache.aget(key)
+    status = "bypass" if req.bypass_cache else ("hit" if result is not None else "miss")
+    trace.detail(lambda: {"stage": "llm_cache", "status": status, **llm_cache.stats()})
+    return result
+
+@app.post("/chat", response_model=ChatResp)
+async def chat(req: ChatReq):
+    trace = Trace(trace_level(req.trace))
+    user_id, memories, prompt = await _prepare_chat(req, trace)
+
+    key = cache_key(GROQ_MODEL, prompt, TEMPERATURE)
+    result = await _cache_lookup(req, key, trace)
+    extracted = []  # a cached answer's memories were stored when it was first computed
+    if result is None:
+        # 3) One LLM call (Groq first, hedged/fallback to Gemini): answer + extracted memories,
+        #    or answer only with the extraction call running alongside (split pipeline)
+        try:
+            with timed("llm_admission", trace):
+                acquired_at = await llm_gate.acquire()
+        except Overloaded as e:
+            raise _too_many(e)
+        try:
+            _start_extraction(user_id, req.message, trace)
+            with timed("llm_call_groq", trace):
+                result = await router.complete(prompt, full_debug=trace.full)
+        except LLMUnavailable as e:
+            raise HTTPException(status_code=503, detail=f"LLM unavailable: {e}")
+        finally:
+            llm_gate.release(acquired_at)
+        extracted = result.get("memories", [])
+        if llm_cache.enabled:
+            await llm_cache.aput(key, _cacheable(result))
+
+    answer = result.get("answer", "")
+    trace.detail(lambda: _groq_trace(result))
+
+    await _store_extracted(user_id, extracted, trace)
+    if req.use_history:
+        await conversations.append(req.session_token, req.message, answer)
+
+    return _chat_resp(answer, memories, trace)
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatReq):
+    # SSE: "token" events carry answer deltas, "done" carries the full ChatResp
+    trace = Trace(trace_level(req.trace))
+    user_id, memories, prompt = await _prepare_chat(req, trace)
+
+    key = cache_key(GROQ_MODEL, prompt, TEMPERATURE)
+    cached = await _cache_lookup(req, key, trace)
+
+    # the slot is taken before the response starts, so overload is still a plain 429;
+    # it is held for the whole stream and released by whichever runs first: the
+    # generator's finally, or the background task (covers a client gone before the first chunk)
+    slot = []
+    if cached is None:
+        try:
+            with timed("llm_admission", trace):
+                slot.append(await llm_gate.acquire())
+        except Overloaded as e:
+            raise _too_many(e)
+
+    def release_slot():
+        if slot:
+            llm_gate.release(slot.pop())
+
+    async def events():
+        try:
+            async for event in _stream_events():
+                yield event
+        finally:
+            release_slot()
+
+    async def _stream_events():
+        if cached is not None:
+            trace.detail(lambda: _groq_trace(cached))
+            yield sse_event("token", {"delta": cached.get("answer", "")})
+            if req.use_history:
+                await conversations.append(req.session_token, req.message, cached.get("answer", ""))
+            yield sse_event("done", _chat_resp(cached.get("answer", ""), memories, trace))
+            return
+
+        _start_extraction(user_id, req.message, trace)
+        parser = AnswerStreamParser()
+        usage = {}
+        t0 = time.perf_counter()
+        try:
+            with timed("llm_call_groq", trace):
+                async for delta in groq_stream_content(GROQ_API_KEY, GROQ_MODEL, prompt, usage,
+                                                       max_tokens=answer_max_tokens):
+                    piece = parser.feed(delta)
+                    if piece:
+                        if len(parser.answer) == len(piece):
+                            trace.append({"stage": "first_token", "status": "ok",
+                                          "ms": int((time.perf_counter() - t0) * 1000)})
+                        yield sse_event("token", {"delta": piece})
+        except Exception as e:
+            LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider="groq", status="error")
+            yield sse_event("error", {"detail": str(e)})
+            return
+        LLM_CALL_SECONDS.observe(time.perf_counter() - t0, provider="groq", status="ok")
+        record_llm_usage("groq", usage)
+
+        # memories only make sense once the whole JSON object is in
+        result = parse_answer_and_memories(GROQ_MODEL, prompt, parser.raw, usage=usage, full_debug=trace.full)
+        trace.detail(lambda: _groq_trace(result))
+        await _store_extracted(user_id, result.get("memories", []), trace)
+        if req.use_history:
+            await conversations.append(req.session_token, req.message, result.get("answer", ""))
+        if llm_cache.enabled:
+            await llm_cache.aput(key, _cacheable(result))
+
+        resp = _chat_resp(result.get("answer", ""), memories, trace)
+        yield sse_event("done", resp)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                             background=BackgroundTask(release_slot))
+
+
+async def _batch_prepare(user_id: str, items: list[dict]):
+    # retrieval for all of one user's messages in a chunk: one embedding pass and at most
+    # one memory load, however many messages the user has in it
+    t0 = time.perf_counter()
+    trace = Trace("off")
+    with timed("batch_retrieve", trace):
+        queries = await run_in_threadpool(get_embedder().embed_many, [it["message"] for it in items])
+        cached, loaded = None, False
+        for item, query in zip(items, queries):
+            keys = entity_keys(item["message"]) if RETRIEVAL_MODE == "graph" else []
+            if keys:
+                ranked = apply_decay(await neo.graph_search_memories(user_id, query, keys, limit=RETRIEVAL_LIMIT))
+            else:
+                if not loaded:
+                    cached, loaded = await _user_memories(user_id, trace), True
+                ranked = await _vector_search(user_id, query, cached)
+            item["memories"] = ranked
+    ms = int((time.perf_counter() - t0) * 1000)
+    for item in items:
+        item["retrieval_ms"] = ms  # shared by the user's messages in this chunk
+
+async def _batch_extract(message: str) -> list[dict]:
+    try:
+        return await _gated(extractor.extract, message)
+    except Exception as e:
+        print("memory extraction failed:", e)
+        return []
+
+async def _batch_answer(item: dict, bypass_cache: bool, store_memories: bool) -> dict:
+    user_id = item["user_id"]
+    trace = Trace("timings")
+    prompt, memories, _ = build_chat_prompt(
+        item["memories"], item["message"], instructions=ANSWER_INSTRUCTIONS if extractor else CHAT_INSTRUCTIONS)
+    key = cache_key(GROQ_MODEL, prompt, TEMPERATURE)
+    result = None
+    if llm_cache.enabled and not bypass_cache:
+        result = await llm_cache.aget(key)
+    cached = result is not None
+    extracted = result.get("memories", []) if cached else []
+    llm_ms = 0
+    if not cached:
+        async def complete():
+            with timed("llm_call_groq", trace):  # the call itself, not the wait for a slot
+                return await router.complete(prompt)
+
+        if extractor:
+            result, extracted = await asyncio.gather(_gated(complete), _batch_extract(item["message"]))
+        else:
+            result = await _gated(complete)
+            extracted = result.get("memories", [])
+        llm_ms = trace[-1]["ms"]
+        if llm_cache.enabled:
+            await llm_cache.aput(key, _cacheable(result))
+    if store_memories and not cached:
+        await _store_extracted(user_id, extracted, trace)
+    return {"id": item["id"], "user_id": user_id, "status": "ok", "answer": result.get("answer", ""),
+            "memories": extracted, "cached": cached,
+            "citations": [{"memory_id": m["memory_id"], "score": round(float(m.get("score") or 0.0), 4)}
+                          for m in memories[:5]],
+            "retrieval_ms": item["retrieval_ms"], "llm_ms": llm_ms}
+
+@app.post("/chat/batch")
+async def chat_batch(request: Request, bypass_cache: bool = False, store_memories: bool = False,
+                     concurrency: int | None = None, x_batch_key: str = Header("")):
+    # Offline replay: JSONL body of {"user_id", "message", "id"?}, JSONL results in completion
+    # order. Acts on any user_id, so it needs BATCH_API_KEY; no history, no per-user rate limit.
+    # store_memories=true persists extracted memories (backfill); off by default so evaluation
+    # runs don't write. backend/batch_chat.py drives this with checkpoint/resume.
+    if not BATCH_API_KEY or not hmac.compare_digest(x_batch_key, BATCH_API_KEY):
+        raise HTTPException(status_code=403, detail="batch API disabled or wrong X-Batch-Key")
+    lines = (await request.body()).splitlines()
+    if len(lines) > BATCH_MAX_LINES:
+        raise HTTPException(status_code=413, detail=f"at most {BATCH_MAX_LINES} lines per request")
+
+    workers = max(1, min(concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY))
+    results = run_batch(lines, _batch_prepare, lambda item: _batch_answer(item, bypass_cache, store_memories),
+                        concurrency=workers, chunk_size=BATCH_CHUNK_SIZE)
+
+    async def body():
+        async for res in results:
+            yield jsonl_line(res)
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+@app.post("/memories/rehydrate")
+async def rehydrate_memories(req: RehydrateReq):
+    user_id = await run_in_threadpool(user_from_session, req.session_token)
+    if not user_id:
+        raise HTTPException(status_code=401, detail="invalid session")
+
+    # same lock as the archive job's appends, held from the read to the rewrite
+    lock = ArchiveLock(user_id)
+    await run_in_threadpool(lock.acquire)
+    try:
+        memories, rest = await run_in_threadpool(split_archive, user_id, req.memory_ids)
+        if memories:
+            await neo.restore_memories(user_id, memories)
+            await run_in_threadpool(rewrite_archive, user_id, rest)
+    finally:
+        lock.release()
+    if memories:
+        await memory_cache.invalidate(user_id)
+    return {"ok": True, "restored": len(memories), "archived": len(rest)}
+
+@app.get("/stats")
+async def stats():
+    return {"memory_writer": writer.stats(), "memory_cache": memory_cache.stats(), "llm_cache": llm_cache.stats(),
+            "llm_router": router.stats(), "password_hasher": PASSWORD_HASHER.stats(),
+            "conversations": conversations.stats(), "startup": STARTUP.report(),
+            "admission": {"rate_limit": limiter.stats(), "llm_gate": llm_gate.stats()},
+            "chat_pipeline": {"mode": "split" if extractor else "single", "pending_extractions": len(pending_extractions),
+                              **(extractor.stats() if extractor else {})}}
+
+@app.get("/metrics")
+async def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
 
 @app.get("/health")
-def health():
-    return {"ok": True}
\ No newline at end of file
+async def health():
+    return {"ok": True}
+
+@app.get("/health/live")
+async def health_live():
+    # the event loop answers; restart only when this stops responding
+    return {"ok": True, "uptime_s": STARTUP.report()["uptime_s"]}
+
+@app.get("/health/ready")
+async def health_ready():
+    # route traffic here only when dependencies are up (503 while Neo4j is down or draining)
+    report = STARTUP.report()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
\ No newline at end of file
@@ -0,0 +1,185 @@
+import json
+import time
+from collections import OrderedDict
+from .config import (MEMORY_CACHE_BACKEND, MEMORY_CACHE_MAX_BYTES, MEMORY_CACHE_TTL, REDIS_URL)
+from .embeddings import MemoryRows
+
+def estimate_size(memories: list[dict]) -> int:
+    # rough in-process footprint: dict overhead + text + boxed floats of the embedding
+    return sum(200 + len(m.get("text") or "") + 32 * len(m.get("embedding") or ()) for m in memories)
+
+
+class InMemoryCacheBackend:
+    # LRU bounded by total bytes, entries expire after ttl seconds
+    def __init__(self, max_bytes: int = MEMORY_CACHE_MAX_BYTES, ttl: float = MEMORY_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+
+    async def get(self, key: str):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, size, value = entry
+        if expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: list[dict], size: int):
+        if size > self.max_bytes:
+            return
+        self._drop(key)
+        self._data[key] = (time.monotonic() + self.ttl, size, value)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._drop(oldest)
+            self.evictions += 1
+
+    async def delete(self, key: str):
+        self._drop(key)
+
+    def _drop(self, key: str):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def stats(self) -> dict:
+        return {"entries": len(self._data), "bytes": self.bytes, "max_bytes": self.max_bytes,
+                "evictions": self.evictions}
+
+
+REDIS_CACHE_PREFIX = "miko:mem:"
+
+
+class RedisCacheBackend:
+    # shared across workers; `client` is anything with redis.asyncio's get/set(ex=)/delete
+    def __init__(self, client, ttl: float = MEMORY_CACHE_TTL, prefix: str = REDIS_CACHE_PREFIX):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    async def get(self, key: str):
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: list[dict], size: int):
+        await self.client.set(self.prefix + key, json.dumps(value, default=str), ex=max(1, int(self.ttl)))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+class MemoryCache:
+    # Readers that load from Neo4j on a miss take generation() before the load and pass it
+    # to put(); an invalidate() of that user in between makes the list stale and it is
+    # dropped instead of cached. Per process: across Redis workers the TTL bounds it.
+    # Invalidations are remembered for stale_window seconds only; a load slower than that
+    # isn't cached at all, so forgetting them is safe and the map stays small.
+    def __init__(self, backend, stale_window: float = 60.0):
+        self.backend = backend
+        self.stale_window = stale_window
+        self.hits = 0
+        self.misses = 0
+        self.stale_puts = 0
+        self._seq = 0
+        self._floor = 0  # newest forgotten invalidation
+        self._invalidated = OrderedDict()  # user_id -> (seq, monotonic time), oldest first
+
+    async def get(self, user_id: str) -> list[dict] | None:
+        if self.backend is None:
+            return None
+        value = await self.backend.get(user_id)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def peek(self, user_id: str) -> list[dict] | None:
+        # lookup without touching hit/miss counters (internal readers)
+        if self.backend is None:
+            return None
+        return await self.backend.get(user_id)
+
+    def generation(self, user_id: str) -> int:
+        return self._seq
+
+    def _stale(self, user_id: str, generation: int) -> bool:
+        seq, _ = self._invalidated.get(user_id, (0, 0.0))
+        return seq > generation or generation < self._floor
+
+    def _forget_old(self):
+        cutoff = time.monotonic() - self.stale_window
+        while self._invalidated:
+            seq, at = next(iter(self._invalidated.values()))
+            if at >= cutoff:
+                break
+            self._invalidated.popitem(last=False)
+            self._floor = max(self._floor, seq)
+
+    async def put(self, user_id: str, memories: list[dict], generation: int | None = None):
+        if generation is not None and self._stale(user_id, generation):
+            self.stale_puts += 1
+            return
+        if self.backend is not None:
+            # in process the same list comes back on every hit, so its embedding matrix is built once
+            await self.backend.set(user_id, MemoryRows(memories), estimate_size(memories))
+
+    async def invalidate(self, user_id: str):
+        self._seq += 1
+        self._invalidated.pop(user_id, None)
+        self._invalidated[user_id] = (self._seq, time.monotonic())
+        self._forget_old()
+        if self.backend is not None:
+            await self.backend.delete(user_id)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        out = {"hits": self.hits, "misses": self.misses, "stale_puts": self.stale_puts,
+               "hit_rate": round(self.hits / total, 4) if total else 0.0}
+        if self.backend is not None:
+            out.update(self.backend.stats())
+        return out
+
+
+def make_memory_cache(kind: str = MEMORY_CACHE_BACKEND) -> MemoryCache:
+    if kind == "off":
+        return MemoryCache(None)
+    if kind == "redis":
+        try:
+            import redis.asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("MEMORY_CACHE_BACKEND=redis needs `pip install redis`")
+        return MemoryCache(RedisCacheBackend(aioredis.from_url(REDIS_URL)))
+    if kind == "memory":
+        return MemoryCache(InMemoryCacheBackend())
+    raise RuntimeError(f"Unknown MEMORY_CACHE_BACKEND: {kind}")
+
+
+def batch_job_invalidator(kind: str = MEMORY_CACHE_BACKEND, client=None):
+    # for the sync batch jobs (archive, rehydrate CLI): -> invalidate(user_ids) dropping the
+    # users' entries from the shared Redis cache, or None. The in-process backend lives inside
+    # each API worker and can't be reached from a job; its entries age out within
+    # MEMORY_CACHE_TTL, which is how long archived memories may still be served there.
+    if kind != "redis":
+        return None
+    if client is None:
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("MEMORY_CACHE_BACKEND=redis needs `pip install redis`")
+        client = redis.Redis.from_url(REDIS_URL)
+
+    def invalidate(user_ids):
+        if user_ids:
+            client.delete(*(REDIS_CACHE_PREFIX + uid for uid in user_ids))
+
+    return invalidate
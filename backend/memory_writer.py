@@ -0,0 +1,180 @@
+import asyncio
+import time
+from .config import (MEMORY_WRITE_QUEUE_SIZE, MEMORY_WRITE_BATCH,
+                     MEMORY_WRITE_PUT_TIMEOUT, MEMORY_WRITE_FLUSH_TIMEOUT, MEMORY_CACHE_MAX_PER_USER,
+                     MEMORY_TOUCH_FLUSH_INTERVAL)
+from .consolidation import plan_writes, needs_fingerprint, fingerprint_row
+
+class MemoryWriter:
+    # Write-behind queue: /chat enqueues extracted memories and returns,
+    # a single worker task persists them to Neo4j in batches.
+    def __init__(self, neo, cache=None, maxsize: int = MEMORY_WRITE_QUEUE_SIZE,
+                 batch_size: int = MEMORY_WRITE_BATCH, put_timeout: float = MEMORY_WRITE_PUT_TIMEOUT,
+                 touch_interval: float = MEMORY_TOUCH_FLUSH_INTERVAL):
+        self.neo = neo
+        self.cache = cache
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self.touch_interval = touch_interval
+        self._touches: dict[str, int] = {}
+        self._last_touch_flush = time.monotonic()
+        self.queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self.enqueued = 0
+        self.written = 0
+        self.merged = 0
+        self.inline_writes = 0
+        self.failed = 0
+        self.touched = 0
+        self.fingerprinted = 0
+        self.last_lag_ms = 0
+        self.max_lag_ms = 0
+
+    def start(self):
+        if self._task is None:
+            self.queue = asyncio.Queue(maxsize=self.maxsize)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, user_id: str, memories: list[dict]) -> bool:
+        # returns True if queued; under sustained backpressure the caller writes inline
+        if not memories:
+            return True
+        if self.queue is None:
+            await self._write(user_id, memories)
+            return False
+
+        item = (time.monotonic(), user_id, memories)
+        try:
+            await asyncio.wait_for(self.queue.put(item), timeout=self.put_timeout)
+        except asyncio.TimeoutError:
+            self.inline_writes += len(memories)
+            await self._write(user_id, memories)
+            return False
+        self.enqueued += len(memories)
+        return True
+
+    def touch(self, memory_ids: list[str]):
+        # retrieval hits are only counted here; the worker flushes them as one UNWIND
+        for mid in memory_ids:
+            if mid:
+                self._touches[mid] = self._touches.get(mid, 0) + 1
+
+    async def _flush_touches(self):
+        self._last_touch_flush = time.monotonic()
+        if not self._touches:
+            return
+        touches, self._touches = self._touches, {}
+        try:
+            await self.neo.touch_memories([{"memory_id": k, "count": v} for k, v in touches.items()])
+            self.touched += len(touches)
+        except Exception as e:
+            print("memory touch failed:", len(touches), "memories:", e)
+
+    async def _write(self, user_id: str, memories: list[dict]):
+        await self._persist({user_id: memories})
+
+    async def _existing(self, user_id: str) -> list[dict]:
+        cached = await self.cache.peek(user_id) if self.cache is not None else None
+        if cached is not None:
+            # plan_writes fingerprints rows in place on a worker thread; the cached ones are
+            # being ranked on the loop, so it gets its own copies
+            return [dict(m) for m in cached]
+        return await self.neo.get_memories_with_embeddings(user_id, limit=MEMORY_CACHE_MAX_PER_USER)
+
+    async def _persist(self, by_user: dict[str, list[dict]]):
+        # near-duplicates of what the user already has are merged, not created
+        rows, merges, legacy = [], [], []
+        for user_id, memories in by_user.items():
+            existing = await self._existing(user_id)
+            unfingerprinted = [m for m in existing if needs_fingerprint(m)]
+            # hashing/embedding up to MEMORY_CACHE_MAX_PER_USER memories is CPU work: off the loop
+            creates, merged = await asyncio.to_thread(plan_writes, memories, existing)
+            rows.extend(dict(m, user_id=user_id) for m in creates)
+            merges.extend(merged)
+            legacy.extend(fingerprint_row(m) for m in unfingerprinted if m.get("memory_id"))
+
+        await self.neo.import_memories(rows)
+        await self.neo.merge_memories(merges)
+        if legacy:
+            # plan_writes fingerprinted these nodes; store it so no later batch repeats the work
+            try:
+                await self.neo.set_fingerprints(legacy)
+                self.fingerprinted += len(legacy)
+            except Exception as e:
+                print("fingerprint write-back failed:", len(legacy), "memories:", e)
+        self.written += len(rows)
+        self.merged += len(merges)
+        await self._invalidate(set(by_user))
+
+    async def _invalidate(self, user_ids: set[str]):
+        # write-through: drop cached memory lists once the write is durable
+        if self.cache is None:
+            return
+        for uid in user_ids:
+            try:
+                await self.cache.invalidate(uid)
+            except Exception as e:
+                print("memory cache invalidate failed:", uid, e)
+
+    async def _run(self):
+        while True:
+            if time.monotonic() - self._last_touch_flush >= self.touch_interval:
+                await self._flush_touches()
+            try:
+                first = await asyncio.wait_for(self.queue.get(), timeout=self.touch_interval)
+            except asyncio.TimeoutError:
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            # whole drained batch goes out as one UNWIND create + one UNWIND merge
+            by_user = {}
+            for _, user_id, memories in batch:
+                by_user.setdefault(user_id, []).extend(memories)
+            try:
+                await self._persist(by_user)
+            except Exception as e:
+                n = sum(len(v) for v in by_user.values())
+                self.failed += n
+                print("memory write failed:", n, "memories:", e)
+            finally:
+                now = time.monotonic()
+                lag = int((now - batch[0][0]) * 1000)  # oldest item in the batch
+                self.last_lag_ms = lag
+                self.max_lag_ms = max(self.max_lag_ms, lag)
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def stop(self, timeout: float = MEMORY_WRITE_FLUSH_TIMEOUT):
+        # flush whatever is queued, then stop the worker
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print("memory writer: flush timed out, dropping", self.queue.qsize(), "items")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._flush_touches()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "queue_max": self.maxsize,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "merged": self.merged,
+            "inline_writes": self.inline_writes,
+            "failed": self.failed,
+            "touched": self.touched,
+            "fingerprinted": self.fingerprinted,
+            "pending_touches": len(self._touches),
+            "last_lag_ms": self.last_lag_ms,
+            "max_lag_ms": self.max_lag_ms,
+        }
@@ -0,0 +1,187 @@
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # spans become no-ops
+    otel_trace = None
+
+# Process-wide metrics in the Prometheus text format, served at /metrics. Small
+# in-house implementation (counters, histograms, callback gauges) rather than a
+# prometheus_client dependency; one process = one registry, so run one scrape
+# target per worker.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _fmt_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = tuple(labels.get(k, "") for k in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(k, "") for k in self.labels), 0.0)
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, v in sorted(self._values.items()):
+                out.append(f"{self.name}{_fmt_labels(self.labels, key)} {v:g}")
+        return out
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(k, "") for k in self.labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if i < len(self.buckets):
+                s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self._series.items())
+        for key, s in series:
+            cumulative = 0
+            for le, n in zip(self.buckets, s):
+                cumulative += n
+                le_label = 'le="%g"' % le
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, le_label)} {cumulative}")
+            inf_label = 'le="+Inf"'
+            out.append(f"{self.name}_bucket{_fmt_labels(self.labels, key, inf_label)} {s[-1]}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, key)} {s[-2]:.6f}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, key)} {s[-1]}")
+        return out
+
+
+class Gauge:
+    # read at scrape time from a callback, e.g. lambda: writer.queue.qsize()
+    def __init__(self, name: str, help: str, fn):
+        self.name, self.help, self.fn = name, help, fn
+
+    def render(self) -> list[str]:
+        try:
+            v = float(self.fn())
+        except Exception:
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {v:g}"]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, object] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for m in self.metrics.values():
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "chat_stage_duration_seconds", "Duration of timed() request stages", ("stage", "status")))
+LLM_CALL_SECONDS = REGISTRY.register(Histogram(
+    "llm_call_duration_seconds", "Duration of single LLM provider calls", ("provider", "status")))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "llm_tokens_total", "Tokens reported by the LLM provider", ("provider", "type")))
+LLM_JSON_PARSE = REGISTRY.register(Counter(
+    "llm_json_parse_total", "LLM JSON outputs by how they parsed (strict, salvaged, repaired, failed)", ("result",)))
+NEO4J_SECONDS = REGISTRY.register(Histogram(
+    "neo4j_query_duration_seconds", "Duration of AsyncNeo4jClient calls", ("operation", "status")))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _NoSpan:
+    def set_attribute(self, key, value):
+        pass
+
+_NO_SPAN = _NoSpan()
+
+@contextmanager
+def span(name: str, **attributes):
+    # OpenTelemetry span when the API is installed (and an SDK configured), no-op otherwise;
+    # exceptions leaving the block are recorded on the span by OTel itself
+    if otel_trace is None:
+        yield _NO_SPAN
+        return
+    with otel_trace.get_tracer("backend").start_as_current_span(name) as s:
+        for k, v in attributes.items():
+            if v is not None:
+                s.set_attribute(k, v)
+        yield s
+
+
+def usage_tokens(usage: dict | None) -> dict[str, int]:
+    # Groq (OpenAI-style) and Gemini usageMetadata -> prompt/completion/total
+    u = usage or {}
+    prompt = u.get("prompt_tokens", u.get("promptTokenCount"))
+    completion = u.get("completion_tokens", u.get("candidatesTokenCount"))
+    total = u.get("total_tokens", u.get("totalTokenCount"))
+    out = {k: int(v) for k, v in (("prompt", prompt), ("completion", completion), ("total", total))
+           if isinstance(v, (int, float))}
+    if "total" not in out and ("prompt" in out or "completion" in out):
+        out["total"] = out.get("prompt", 0) + out.get("completion", 0)
+    return out
+
+def record_llm_usage(provider: str, usage: dict | None, s=_NO_SPAN):
+    for kind, n in usage_tokens(usage).items():
+        s.set_attribute(f"llm.usage.{kind}_tokens", n)
+        if kind != "total":
+            LLM_TOKENS.inc(n, provider=provider, type=kind)
+
+
+def instrumented(operation: str):
+    # for AsyncNeo4jClient methods: histogram + span per call
+    def deco(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            status = "ok"
+            with span(f"neo4j.{operation}", **{"db.system": "neo4j", "db.operation": operation}):
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception:
+                    status = "error"
+                    raise
+                finally:
+                    NEO4J_SECONDS.observe(time.perf_counter() - t0, operation=operation, status=status)
+        return wrapper
+    return deco
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 
 class SignupReq(BaseModel):
     username: str
@@ -12,6 +12,13 @@ class LoginReq(BaseModel):
 class ChatReq(BaseModel):
     session_token: str
     message: str
+    bypass_cache: bool = False  # skip the LLM response cache for this request
+    trace: Optional[Literal["off", "timings", "full"]] = None  # debug_trace level, None = server default
+    use_history: bool = True  # False = stateless: no conversation context, turn not recorded
+
+class RehydrateReq(BaseModel):
+    session_token: str
+    memory_ids: Optional[List[str]] = None  # None restores the whole archive
 
 class MemoryCitation(BaseModel):
     memory_id: str
@@ -1,54 +1,502 @@
-from neo4j import GraphDatabase
-from .config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+import asyncio
+import importlib
+from .config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, NEO4J_POOL_SIZE, GRAPH_WEIGHT, GRAPH_NEAR_WEIGHT
+from .consolidation import fingerprint
+from .entities import extract_entities, taxonomy_rows
+from .schema import migrate, migrate_async
+from .metrics import instrumented
+from .lifecycle import kind_ttl_seconds
+
+ENSURE_USER_QUERY = """
+MERGE (u:User {user_id: $user_id})
+SET u.username = $username
+RETURN u
+"""
+
+# one round trip / one write transaction per batch of memories
+ADD_MEMORIES_QUERY = """
+MATCH (u:User {user_id: $user_id})
+UNWIND $memories AS mem
+CREATE (m:Memory {
+  memory_id: mem.memory_id,
+  user_id: $user_id,
+  text: mem.text,
+  kind: mem.kind,
+  confidence: mem.confidence,
+  source: mem.source,
+  embedding: mem.embedding,
+  text_hash: mem.text_hash,
+  simhash: mem.simhash,
+  seen_count: 1,
+  created_at: datetime(),
+  last_seen: datetime()
+})
+CREATE (u)-[:HAS_MEMORY]->(m)
+"""
+
+# multi-user variant for the write-behind worker and bulk imports; rows carry user_id
+IMPORT_MEMORIES_QUERY = """
+UNWIND $rows AS row
+MERGE (u:User {user_id: row.user_id})
+CREATE (m:Memory {
+  memory_id: row.memory_id,
+  user_id: row.user_id,
+  text: row.text,
+  kind: row.kind,
+  confidence: row.confidence,
+  source: row.source,
+  embedding: row.embedding,
+  text_hash: row.text_hash,
+  simhash: row.simhash,
+  seen_count: 1,
+  created_at: coalesce(datetime(row.created_at), datetime()),
+  last_seen: coalesce(datetime(row.created_at), datetime())
+})
+CREATE (u)-[:HAS_MEMORY]->(m)
+"""
+
+# Reads go through the denormalized Memory.user_id: the (user_id, created_at) index
+# serves both the lookup and the ORDER BY, so latest-N reads LIMIT rows instead of
+# sorting everything the user has (see backend/schema.py)
+GET_MEMORIES_QUERY = """
+MATCH (m:Memory {user_id: $user_id}) WHERE m.created_at IS NOT NULL
+RETURN m.memory_id AS memory_id, m.text AS text, m.kind AS kind, m.confidence AS confidence,
+       m.source AS source, m.created_at AS created_at
+ORDER BY m.created_at DESC
+LIMIT $limit
+"""
+
+# TTL by kind, same rule as lifecycle.is_expired: past its kind's TTL since it was last
+# created/seen/accessed (and not a system memory) = left out of retrieval until the
+# archive job moves it. $kind_ttls maps kind -> seconds, kinds kept forever are absent.
+_NOT_EXPIRED = """(m.source = 'system' OR $kind_ttls[coalesce(m.kind, '')] IS NULL
+  OR coalesce(reduce(t = m.created_at, x IN [m.last_seen, m.last_accessed] |
+                     CASE WHEN t IS NULL OR x > t THEN x ELSE t END)
+              >= datetime() - duration({seconds: $kind_ttls[coalesce(m.kind, '')]}), true))"""
+
+# Ranks a user's memories by cosine similarity to the message embedding.
+# vector.similarity.cosine is rescaled to [0,1] by Neo4j, map it back to [-1,1];
+# memories without a (same-sized) embedding score 0 and fall back to recency.
+SEARCH_MEMORIES_QUERY = """
+MATCH (m:Memory {user_id: $user_id}) WHERE """ + _NOT_EXPIRED + """
+WITH m, CASE
+  WHEN m.embedding IS NOT NULL AND size(m.embedding) = size($embedding)
+  THEN 2 * vector.similarity.cosine(m.embedding, $embedding) - 1
+  ELSE 0.0 END AS score
+RETURN m.memory_id AS memory_id, m.text AS text, m.kind AS kind, m.confidence AS confidence,
+       m.source AS source, m.created_at AS created_at, m.last_seen AS last_seen,
+       m.last_accessed AS last_accessed, score
+ORDER BY score DESC, m.created_at DESC
+LIMIT $limit
+"""
+
+# full per-user list (newest first) with vectors, for the in-process cache
+USER_MEMORIES_QUERY = """
+MATCH (m:Memory {user_id: $user_id}) WHERE m.created_at IS NOT NULL
+RETURN m.memory_id AS memory_id, m.text AS text, m.kind AS kind, m.confidence AS confidence,
+       m.source AS source, m.created_at AS created_at, m.embedding AS embedding,
+       m.text_hash AS text_hash, m.simhash AS simhash, m.seen_count AS seen_count,
+       m.last_seen AS last_seen, m.last_accessed AS last_accessed, m.access_count AS access_count
+ORDER BY m.created_at DESC
+LIMIT $limit
+"""
+
+# a re-extracted fact bumps the existing node instead of creating a new one
+MERGE_MEMORIES_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Memory {memory_id: row.memory_id})
+SET m.confidence = CASE WHEN row.confidence > coalesce(m.confidence, 0.0)
+                        THEN row.confidence ELSE m.confidence END,
+    m.seen_count = coalesce(m.seen_count, 1) + 1,
+    m.last_seen = datetime()
+"""
+
+COMPACT_MEMORIES_QUERY = """
+UNWIND $groups AS g
+MATCH (keep:Memory {memory_id: g.keep})
+SET keep.confidence = g.confidence, keep.seen_count = g.seen_count, keep.last_seen = datetime()
+WITH g
+UNWIND g.drop AS drop_id
+MATCH (dup:Memory {memory_id: drop_id})
+DETACH DELETE dup
+"""
+
+# keyset pagination: seeks the user_id_unique index past the last id of the previous
+# page, so a page costs the same at the end of the store as at the start (SKIP rescans)
+LIST_USERS_QUERY = """
+MATCH (u:User)
+WHERE u.user_id IS NOT NULL AND u.user_id > $after
+RETURN u.user_id AS user_id
+ORDER BY u.user_id
+LIMIT $limit
+"""
+
+# retrieval hits, aggregated by the write-behind worker; feeds decay
+TOUCH_MEMORIES_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Memory {memory_id: row.memory_id})
+SET m.access_count = coalesce(m.access_count, 0) + row.count,
+    m.last_accessed = datetime()
+"""
+
+DELETE_MEMORIES_QUERY = """
+UNWIND $memory_ids AS memory_id
+MATCH (m:Memory {memory_id: memory_id})
+DETACH DELETE m
+"""
+
+# rehydration from the cold archive; MERGE keeps a repeated restore idempotent,
+# and last_seen is reset so the memory isn't archived again on the next run
+RESTORE_MEMORIES_QUERY = """
+MATCH (u:User {user_id: $user_id})
+UNWIND $rows AS row
+MERGE (m:Memory {memory_id: row.memory_id})
+SET m.user_id = $user_id, m.text = row.text, m.kind = row.kind, m.confidence = row.confidence, m.source = row.source,
+    m.embedding = row.embedding, m.text_hash = row.text_hash, m.simhash = row.simhash,
+    m.seen_count = coalesce(row.seen_count, 1), m.access_count = coalesce(row.access_count, 0),
+    m.created_at = coalesce(datetime(row.created_at), datetime()), m.last_seen = datetime()
+MERGE (u)-[:HAS_MEMORY]->(m)
+"""
+
+# (Memory)-[:MENTIONS]->(Entity); skills and topics already exist from SYNC_TAXONOMY_QUERY,
+# so labels are only written when a company shows up for the first time
+LINK_ENTITIES_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Memory {memory_id: row.memory_id})
+MERGE (e:Entity {key: row.key})
+  ON CREATE SET e.name = row.name, e.type = row.type
+FOREACH (_ IN CASE WHEN row.type = 'company' AND NOT e:Company THEN [1] ELSE [] END | SET e:Company)
+FOREACH (_ IN CASE WHEN row.type = 'skill' AND NOT e:Skill THEN [1] ELSE [] END | SET e:Skill)
+FOREACH (_ IN CASE WHEN row.type = 'topic' AND NOT e:Topic THEN [1] ELSE [] END | SET e:Topic)
+MERGE (m)-[:MENTIONS]->(e)
+"""
+
+# (Skill)-[:PART_OF]->(Topic) from backend/entities.py TAXONOMY; idempotent, run on startup
+SYNC_TAXONOMY_QUERY = """
+UNWIND $rows AS row
+MERGE (t:Entity {key: row.topic_key})
+  ON CREATE SET t.name = row.topic_name, t.type = 'topic'
+FOREACH (_ IN CASE WHEN NOT t:Topic THEN [1] ELSE [] END | SET t:Topic)
+MERGE (s:Entity {key: row.skill_key})
+  ON CREATE SET s.name = row.skill_name, s.type = 'skill'
+FOREACH (_ IN CASE WHEN NOT s:Skill THEN [1] ELSE [] END | SET s:Skill)
+MERGE (s)-[:PART_OF]->(t)
+"""
+
+# Graph retrieval: the message's entities (unique-key seeks) plus whatever sits within
+# two PART_OF hops of them (skill -> topic -> sibling skills), then the user's memories
+# from the user_id index, expanded outwards over MENTIONS. Expanding from the memory
+# side keeps a popular entity shared by every user from turning into a supernode scan.
+# score = cosine similarity + graph_weight * min(1, direct matches + near_weight * related ones)
+GRAPH_SEARCH_MEMORIES_QUERY = """
+OPTIONAL MATCH (seed:Entity) WHERE seed.key IN $entity_keys
+OPTIONAL MATCH (seed)-[:PART_OF*1..2]-(near:Entity)
+WITH collect(DISTINCT seed.key) AS direct, collect(DISTINCT near.key) AS related
+MATCH (m:Memory {user_id: $user_id}) WHERE """ + _NOT_EXPIRED + """
+OPTIONAL MATCH (m)-[:MENTIONS]->(e:Entity) WHERE e.key IN direct OR e.key IN related
+WITH m, sum(CASE WHEN e IS NULL THEN 0.0 WHEN e.key IN direct THEN 1.0 ELSE $near_weight END) AS graph_score
+WITH m, graph_score, CASE
+  WHEN m.embedding IS NOT NULL AND size(m.embedding) = size($embedding)
+  THEN 2 * vector.similarity.cosine(m.embedding, $embedding) - 1
+  ELSE 0.0 END AS similarity
+RETURN m.memory_id AS memory_id, m.text AS text, m.kind AS kind, m.confidence AS confidence,
+       m.source AS source, m.created_at AS created_at, m.last_seen AS last_seen,
+       m.last_accessed AS last_accessed, similarity, graph_score,
+       similarity + $graph_weight * CASE WHEN graph_score > 1.0 THEN 1.0 ELSE graph_score END AS score
+ORDER BY score DESC, m.created_at DESC
+LIMIT $limit
+"""
+
+MISSING_EMBEDDINGS_QUERY = """
+MATCH (m:Memory) WHERE m.embedding IS NULL
+RETURN m.memory_id AS memory_id, m.text AS text
+LIMIT $limit
+"""
+
+SET_EMBEDDINGS_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Memory {memory_id: row.memory_id})
+SET m.embedding = row.embedding
+"""
+
+# dedup fingerprints for nodes written before they were stored; the writer also sends
+# these back for any legacy node it had to fingerprint, so each one is computed once
+MISSING_FINGERPRINTS_QUERY = """
+MATCH (m:Memory) WHERE m.text_hash IS NULL OR m.simhash IS NULL
+RETURN m.memory_id AS memory_id, m.text AS text
+LIMIT $limit
+"""
+
+SET_FINGERPRINTS_QUERY = """
+UNWIND $rows AS row
+MATCH (m:Memory {memory_id: row.memory_id})
+SET m.text_hash = row.text_hash, m.simhash = row.simhash, m.embedding = coalesce(m.embedding, row.embedding)
+"""
+
+def _memory_params(memory: dict) -> dict:
+    # embed + fingerprint at write time so retrieval and dedup never recompute them
+    fingerprint(memory)
+    return {k: memory.get(k) for k in ("memory_id", "text", "kind", "confidence", "source",
+                                       "embedding", "text_hash", "simhash")}
+
+def _import_row(row: dict) -> dict:
+    out = _memory_params(row)
+    out["user_id"] = row["user_id"]
+    out["created_at"] = row.get("created_at")
+    return out
+
+def _restore_row(row: dict) -> dict:
+    out = _memory_params(row)
+    for k in ("created_at", "seen_count", "access_count"):
+        out[k] = row.get(k)
+    return out
+
+def _entity_rows(memories: list[dict]) -> list[dict]:
+    return [{"memory_id": m["memory_id"], "key": e["key"], "type": e["type"], "name": e["name"]}
+            for m in memories for e in extract_entities(m.get("text") or "")]
+
+def _with_links(query: str, params: dict, memories: list[dict]) -> list[tuple[str, dict]]:
+    # a memory and its MENTIONS links are written in the same transaction
+    statements = [(query, params)]
+    rows = _entity_rows(memories)
+    if rows:
+        statements.append((LINK_ENTITIES_QUERY, {"rows": rows}))
+    return statements
+
+def _write(tx, query: str, **params):
+    tx.run(query, **params).consume()
+
+async def _write_async(tx, query: str, **params):
+    await (await tx.run(query, **params)).consume()
+
+def _write_all(tx, statements: list[tuple[str, dict]]):
+    for query, params in statements:
+        tx.run(query, **params).consume()
+
+async def _write_all_async(tx, statements: list[tuple[str, dict]]):
+    for query, params in statements:
+        await (await tx.run(query, **params)).consume()
+
+
+# the neo4j package is imported where a driver is made, not at module import: it is
+# the biggest single import of the API (~0.2s) and the API should boot without it
 
 class Neo4jClient:
     def __init__(self):
+        from neo4j import GraphDatabase
         self.driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
 
     def close(self):
         self.driver.close()
 
-    def init_schema(self):
-        q1 = "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.user_id IS UNIQUE"
-        q2 = "CREATE INDEX user_username IF NOT EXISTS FOR (u:User) ON (u.username)"
+    def init_schema(self) -> int:
+        version = migrate(self.driver)
         with self.driver.session() as s:
-            s.run(q1)
-            s.run(q2)
+            s.execute_write(_write, SYNC_TAXONOMY_QUERY, rows=taxonomy_rows())
+        return version
 
     def ensure_user_node(self, user_id: str, username: str):
-        q = """
-        MERGE (u:User {user_id: $user_id})
-        SET u.username = $username
-        RETURN u
-        """
         with self.driver.session() as s:
-            s.run(q, user_id=user_id, username=username)
+            s.run(ENSURE_USER_QUERY, user_id=user_id, username=username)
 
     def add_memory(self, user_id: str, memory: dict):
-        q = """
-        MATCH (u:User {user_id: $user_id})
-        CREATE (m:Memory {
-          memory_id: $memory_id,
-          text: $text,
-          kind: $kind,
-          confidence: $confidence,
-          source: $source,
-          created_at: datetime()
-        })
-        CREATE (u)-[:HAS_MEMORY]->(m)
-        RETURN m
-        """
-        with self.driver.session() as s:
-            s.run(q, user_id=user_id, **memory)
+        self.add_memories(user_id, [memory])
+
+    def add_memories(self, user_id: str, memories: list[dict]):
+        if not memories:
+            return
+        params = {"user_id": user_id, "memories": [_memory_params(m) for m in memories]}
+        with self.driver.session() as s:
+            s.execute_write(_write_all, _with_links(ADD_MEMORIES_QUERY, params, memories))
+
+    def import_memories(self, rows: list[dict]):
+        if not rows:
+            return
+        with self.driver.session() as s:
+            s.execute_write(_write_all, _with_links(IMPORT_MEMORIES_QUERY, {"rows": [_import_row(r) for r in rows]},
+                                                    rows))
+
+    def link_entities(self, memories: list[dict]):
+        # (re)links existing memories; MERGE makes it safe to repeat
+        rows = _entity_rows(memories)
+        if not rows:
+            return
+        with self.driver.session() as s:
+            s.execute_write(_write, LINK_ENTITIES_QUERY, rows=rows)
 
     def get_memories(self, user_id: str, limit: int = 10):
-        q = """
-        MATCH (u:User {user_id: $user_id})-[:HAS_MEMORY]->(m:Memory)
-        RETURN m.memory_id AS memory_id, m.text AS text, m.kind AS kind, m.confidence AS confidence,
-               m.source AS source, m.created_at AS created_at
-        ORDER BY m.created_at DESC
-        LIMIT $limit
-        """
-        with self.driver.session() as s:
-            rows = s.run(q, user_id=user_id, limit=limit)
-            return [dict(r) for r in rows]
\ No newline at end of file
+        with self.driver.session() as s:
+            rows = s.run(GET_MEMORIES_QUERY, user_id=user_id, limit=limit)
+            return [dict(r) for r in rows]
+
+    def search_memories(self, user_id: str, embedding: list[float], limit: int = 10):
+        with self.driver.session() as s:
+            rows = s.run(SEARCH_MEMORIES_QUERY, user_id=user_id, embedding=embedding, limit=limit,
+                         kind_ttls=kind_ttl_seconds())
+            return [dict(r) for r in rows]
+
+    def graph_search_memories(self, user_id: str, embedding: list[float], entity_keys: list[str], limit: int = 10,
+                              graph_weight: float = GRAPH_WEIGHT, near_weight: float = GRAPH_NEAR_WEIGHT):
+        with self.driver.session() as s:
+            rows = s.run(GRAPH_SEARCH_MEMORIES_QUERY, user_id=user_id, embedding=embedding, entity_keys=entity_keys,
+                         limit=limit, graph_weight=graph_weight, near_weight=near_weight, kind_ttls=kind_ttl_seconds())
+            return [dict(r) for r in rows]
+
+    def get_memories_with_embeddings(self, user_id: str, limit: int = 1000):
+        with self.driver.session() as s:
+            return [dict(r) for r in s.run(USER_MEMORIES_QUERY, user_id=user_id, limit=limit)]
+
+    def list_user_ids(self, after: str = "", limit: int = 100) -> list[str]:
+        with self.driver.session() as s:
+            return [r["user_id"] for r in s.run(LIST_USERS_QUERY, after=after, limit=limit)]
+
+    def compact_memories(self, groups: list[dict]):
+        if not groups:
+            return
+        with self.driver.session() as s:
+            s.execute_write(_write, COMPACT_MEMORIES_QUERY, groups=groups)
+
+    def delete_memories(self, memory_ids: list[str]):
+        if not memory_ids:
+            return
+        with self.driver.session() as s:
+            s.execute_write(_write, DELETE_MEMORIES_QUERY, memory_ids=memory_ids)
+
+    def restore_memories(self, user_id: str, memories: list[dict]):
+        if not memories:
+            return
+        params = {"user_id": user_id, "rows": [_restore_row(m) for m in memories]}
+        with self.driver.session() as s:
+            s.execute_write(_write_all, _with_links(RESTORE_MEMORIES_QUERY, params, memories))
+
+    def memories_missing_embeddings(self, limit: int = 1000):
+        with self.driver.session() as s:
+            return [dict(r) for r in s.run(MISSING_EMBEDDINGS_QUERY, limit=limit)]
+
+    def set_embeddings(self, rows: list[dict]):
+        with self.driver.session() as s:
+            s.execute_write(_write, SET_EMBEDDINGS_QUERY, rows=rows)
+
+    def memories_missing_fingerprints(self, limit: int = 1000):
+        with self.driver.session() as s:
+            return [dict(r) for r in s.run(MISSING_FINGERPRINTS_QUERY, limit=limit)]
+
+    def set_fingerprints(self, rows: list[dict]):
+        with self.driver.session() as s:
+            s.execute_write(_write, SET_FINGERPRINTS_QUERY, rows=rows)
+
+
+class AsyncNeo4jClient:
+    # same API as Neo4jClient, for the async request path; the driver is created on first
+    # use (normally by connect() in the app's startup task)
+    def __init__(self):
+        self._driver = None
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            from neo4j import AsyncGraphDatabase
+            self._driver = AsyncGraphDatabase.driver(
+                NEO4J_URI,
+                auth=(NEO4J_USER, NEO4J_PASSWORD),
+                max_connection_pool_size=NEO4J_POOL_SIZE,
+            )
+        return self._driver
+
+    async def connect(self):
+        # import off the event loop, then make sure the server answers
+        if self._driver is None:
+            await asyncio.to_thread(importlib.import_module, "neo4j")
+        await self.driver.verify_connectivity()
+
+    async def close(self):
+        if self._driver is not None:
+            await self._driver.close()
+
+    async def init_schema(self) -> int:
+        version = await migrate_async(self.driver)
+        async with self.driver.session() as s:
+            await s.execute_write(_write_async, SYNC_TAXONOMY_QUERY, rows=taxonomy_rows())
+        return version
+
+    @instrumented("ensure_user_node")
+    async def ensure_user_node(self, user_id: str, username: str):
+        async with self.driver.session() as s:
+            await (await s.run(ENSURE_USER_QUERY, user_id=user_id, username=username)).consume()
+
+    async def add_memory(self, user_id: str, memory: dict):
+        await self.add_memories(user_id, [memory])
+
+    @instrumented("add_memories")
+    async def add_memories(self, user_id: str, memories: list[dict]):
+        if not memories:
+            return
+        params = {"user_id": user_id, "memories": [_memory_params(m) for m in memories]}
+        async with self.driver.session() as s:
+            await s.execute_write(_write_all_async, _with_links(ADD_MEMORIES_QUERY, params, memories))
+
+    @instrumented("import_memories")
+    async def import_memories(self, rows: list[dict]):
+        if not rows:
+            return
+        async with self.driver.session() as s:
+            await s.execute_write(_write_all_async,
+                                  _with_links(IMPORT_MEMORIES_QUERY, {"rows": [_import_row(r) for r in rows]}, rows))
+
+    @instrumented("get_memories")
+    async def get_memories(self, user_id: str, limit: int = 10):
+        async with self.driver.session() as s:
+            rows = await s.run(GET_MEMORIES_QUERY, user_id=user_id, limit=limit)
+            return [dict(r) async for r in rows]
+
+    @instrumented("search_memories")
+    async def search_memories(self, user_id: str, embedding: list[float], limit: int = 10):
+        async with self.driver.session() as s:
+            rows = await s.run(SEARCH_MEMORIES_QUERY, user_id=user_id, embedding=embedding, limit=limit,
+                               kind_ttls=kind_ttl_seconds())
+            return [dict(r) async for r in rows]
+
+    @instrumented("graph_search_memories")
+    async def graph_search_memories(self, user_id: str, embedding: list[float], entity_keys: list[str],
+                                    limit: int = 10, graph_weight: float = GRAPH_WEIGHT,
+                                    near_weight: float = GRAPH_NEAR_WEIGHT):
+        async with self.driver.session() as s:
+            rows = await s.run(GRAPH_SEARCH_MEMORIES_QUERY, user_id=user_id, embedding=embedding,
+                               entity_keys=entity_keys, limit=limit, graph_weight=graph_weight,
+                               near_weight=near_weight, kind_ttls=kind_ttl_seconds())
+            return [dict(r) async for r in rows]
+
+    @instrumented("get_memories_with_embeddings")
+    async def get_memories_with_embeddings(self, user_id: str, limit: int = 1000):
+        async with self.driver.session() as s:
+            rows = await s.run(USER_MEMORIES_QUERY, user_id=user_id, limit=limit)
+            return [dict(r) async for r in rows]
+
+    @instrumented("merge_memories")
+    async def merge_memories(self, rows: list[dict]):
+        if not rows:
+            return
+        async with self.driver.session() as s:
+            await s.execute_write(_write_async, MERGE_MEMORIES_QUERY, rows=rows)
+
+    @instrumented("set_fingerprints")
+    async def set_fingerprints(self, rows: list[dict]):
+        if not rows:
+            return
+        async with self.driver.session() as s:
+            await s.execute_write(_write_async, SET_FINGERPRINTS_QUERY, rows=rows)
+
+    @instrumented("touch_memories")
+    async def touch_memories(self, rows: list[dict]):
+        if not rows:
+            return
+        async with self.driver.session() as s:
+            await s.execute_write(_write_async, TOUCH_MEMORIES_QUERY, rows=rows)
+
+    @instrumented("restore_memories")
+    async def restore_memories(self, user_id: str, memories: list[dict]):
+        if not memories:
+            return
+        params = {"user_id": user_id, "rows": [_restore_row(m) for m in memories]}
+        async with self.driver.session() as s:
+            await s.execute_write(_write_all_async, _with_links(RESTORE_MEMORIES_QUERY, params, memories))
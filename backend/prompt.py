@@ -0,0 +1,218 @@
+import re
+from .config import (PROMPT_TOKEN_BUDGET, PROMPT_MESSAGE_MAX_TOKENS, PROMPT_MEMORY_LINE_MAX_TOKENS,
+                     PROMPT_HISTORY_MAX_TOKENS, PROMPT_TURN_MAX_TOKENS, PROMPT_SUMMARY_MAX_TOKENS)
+
+CHAT_INSTRUCTIONS = """
+Return STRICT JSON only (no markdown, no extra text) with this shape:
+{
+  "answer": "string",
+  "memories": [
+    {"text": "string", "kind": "fact|goal|preference|weakness|strength|constraint", "confidence": 0.0}
+  ]
+}
+
+Answer rules:
+- Give a helpful, complete answer (normally 10-15 lines) around 150–250 words.
+- Use bullets/steps when useful.
+- If the user asks something vague, ask 1 clarifying question at the end.
+
+Memory rules:
+- Extract ONLY durable user-specific info worth saving for future personalization.
+- Max 5 items.
+- confidence in [0,1]. Use >=0.75 only when clearly stated by user.
+- Do NOT store generic questions like "explain normalization", keep it user oriented.
+- If no durable info, return empty memories: [].
+""".strip()
+
+# split pipeline (CHAT_PIPELINE=split): the answer call no longer extracts memories,
+# a separate extraction call does (EXTRACT_INSTRUCTIONS)
+ANSWER_INSTRUCTIONS = """
+Return STRICT JSON only (no markdown, no extra text) with this shape:
+{"answer": "string"}
+
+Answer rules:
+- Give a helpful, complete answer (normally 10-15 lines) around 150–250 words.
+- Use bullets/steps when useful.
+- If the user asks something vague, ask 1 clarifying question at the end.
+""".strip()
+
+EXTRACT_INSTRUCTIONS = """
+You extract long-term memory from a user's chat message for an interview-prep assistant.
+
+Only extract if it is STABLE and useful later:
+- personal background (role, level, domain)
+- goals (target role/company, timeline)
+- preferences (learning style, constraints)
+- weaknesses/strengths
+- hard constraints (time per day, deadlines)
+
+Do NOT extract:
+- greetings, filler, single-use requests
+- temporary stuff ("today", "right now") unless it's a deadline
+- the assistant's own text
+
+Return STRICT JSON only in this exact schema:
+{
+  "memories": [
+    {
+      "text": "short canonical memory sentence",
+      "kind": "fact|goal|preference|weakness|strength|constraint",
+      "confidence": 0.0
+    }
+  ]
+}
+
+If nothing important, return:
+{ "memories": [] }
+""".strip()
+
+SUMMARY_INSTRUCTIONS = """
+You maintain a running summary of a conversation between a user and an interview-prep assistant.
+Merge the previous summary with the new turns into ONE updated summary:
+- keep what the user asked, decided, or is working on, and open questions
+- drop greetings, filler and details of answers that are no longer relevant
+- at most 120 words, third person ("The user ...")
+
+Return STRICT JSON only: {"summary": "string"}
+""".strip()
+
+TRUNCATION_MARK = " …[truncated]"
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+def _estimate_tokens(text: str) -> int:
+    # calibrated against BPE vocabularies (llama-3 / cl100k) on English prose:
+    # one token per short word or punctuation mark, long words split every ~8 chars
+    return sum(1 + (len(p) - 1) // 8 for p in _PIECE_RE.findall(text))
+
+try:
+    import tiktoken
+    _enc = tiktoken.get_encoding("cl100k_base")
+    TOKENIZER = "tiktoken:cl100k_base"
+
+    def count_tokens(text: str) -> int:
+        return len(_enc.encode(text, disallowed_special=()))
+except Exception:
+    TOKENIZER = "estimate"
+
+    def count_tokens(text: str) -> int:
+        return _estimate_tokens(text)
+
+
+def truncate_tokens(text: str, max_tokens: int) -> tuple[str, bool]:
+    n = count_tokens(text)
+    if n <= max_tokens:
+        return text, False
+    # shrink proportionally, then trim until it fits; a budget too small for the mark
+    # gets a bare slice, never more than max_tokens
+    mark = TRUNCATION_MARK if count_tokens(TRUNCATION_MARK) < max_tokens else ""
+    cut = max(0, int(len(text) * max_tokens / n))
+    out = text[:cut]
+    while out and count_tokens(out + mark) > max_tokens:
+        out = out[: int(len(out) * 0.9)]
+    return (out.rstrip() + mark if out else ""), True
+
+
+def _memory_value(m: dict) -> float:
+    # relevance first, (decayed) confidence as a tie-breaker-ish weight
+    conf = m.get("effective_confidence", m.get("confidence"))
+    return float(m.get("score") or 0.0) * (0.5 + 0.5 * float(conf or 0.0))
+
+
+def _turn_lines(turn: dict, turn_max: int) -> list[str]:
+    return [f"User: {truncate_tokens(turn['u'], turn_max)[0]}",
+            f"Assistant: {truncate_tokens(turn['a'], turn_max)[0]}"]
+
+
+def _history_section(summary: str, turns: list[dict], budget: int, turn_max: int) -> tuple[str, int]:
+    # newest turns first until the budget runs out, then back in chronological order
+    if budget <= 0 or not (summary or turns):
+        return "", 0
+    header = "\n\nConversation so far:\n"
+    used = count_tokens(header)
+    parts = []
+    if summary:
+        summary, _ = truncate_tokens(summary, min(PROMPT_SUMMARY_MAX_TOKENS, max(1, budget - used)))
+        used += count_tokens(summary) + 1
+        parts.append(f"Summary: {summary}")
+    kept = []
+    for turn in reversed(turns):
+        lines = _turn_lines(turn, turn_max)
+        n = sum(count_tokens(line) + 1 for line in lines)
+        if used + n > budget:
+            break
+        used += n
+        kept = lines + kept
+    if not parts and not kept:
+        return "", 0
+    return header + "\n".join(parts + kept), used
+
+
+def build_chat_prompt(memories: list[dict], message: str, budget: int = PROMPT_TOKEN_BUDGET,
+                      message_max: int = PROMPT_MESSAGE_MAX_TOKENS,
+                      memory_line_max: int = PROMPT_MEMORY_LINE_MAX_TOKENS,
+                      instructions: str = CHAT_INSTRUCTIONS, summary: str = "", turns: list[dict] | None = None,
+                      history_max: int = PROMPT_HISTORY_MAX_TOKENS,
+                      turn_max: int = PROMPT_TURN_MAX_TOKENS) -> tuple[str, list[dict], dict]:
+    # -> (prompt, memories actually included, per-section token stats)
+    instructions_tokens = count_tokens(instructions)
+    header_tokens = count_tokens("\n\nUser memory context:\n\n\nUser message:\n")
+    # the message always fits; then the conversation (capped at history_max); memories get the rest
+    message_cap = max(1, min(message_max, budget - instructions_tokens - header_tokens))
+    message, message_truncated = truncate_tokens(message, message_cap)
+    message_tokens = count_tokens(message)
+    remaining = budget - instructions_tokens - header_tokens - message_tokens
+    history, history_tokens = _history_section(summary, turns or [], min(history_max, remaining), turn_max)
+    memory_budget = remaining - history_tokens
+
+    packed, lines, used = [], [], 0
+    for m in sorted(memories, key=_memory_value, reverse=True):
+        text, _ = truncate_tokens(m["text"], memory_line_max)
+        line = f"- ({m['kind']}) {text} [id={m['memory_id']}]"
+        n = count_tokens(line) + 1
+        if used + n > memory_budget:
+            continue
+        used += n
+        packed.append(m)
+        lines.append(line)
+
+    prompt = f"""{instructions}
+
+User memory context:
+{chr(10).join(lines)}{history}
+
+User message:
+{message}"""
+
+    stats = {
+        "tokenizer": TOKENIZER,
+        "budget": budget,
+        "instructions_tokens": instructions_tokens,
+        "memory_tokens": used,
+        "history_tokens": history_tokens,
+        "message_tokens": message_tokens,
+        "total_tokens": count_tokens(prompt),
+        "memories_packed": len(packed),
+        "memories_dropped": len(memories) - len(packed),
+        "message_truncated": message_truncated,
+    }
+    return prompt, packed, stats
+
+
+def build_extract_prompt(message: str) -> str:
+    message, _ = truncate_tokens(message, PROMPT_MESSAGE_MAX_TOKENS)
+    return f"""{EXTRACT_INSTRUCTIONS}
+
+User message:
+{message}"""
+
+
+def build_summary_prompt(summary: str, turns: list[dict], turn_max: int = PROMPT_TURN_MAX_TOKENS) -> str:
+    lines = [line for t in turns for line in _turn_lines(t, turn_max)]
+    return f"""{SUMMARY_INSTRUCTIONS}
+
+Previous summary:
+{summary or "(none)"}
+
+New turns:
+{chr(10).join(lines)}"""
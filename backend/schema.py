@@ -0,0 +1,103 @@
+import argparse
+import sys
+from .config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+
+# Versioned schema for the memory graph. Each migration is a list of statements run
+# in auto-commit transactions (schema ops and CALL {...} IN TRANSACTIONS need that);
+# every statement is idempotent, so a crash or two app instances starting at once
+# just re-run a step. Append new migrations, never edit applied ones.
+MIGRATIONS = [
+    (1, "user constraint, memory lookup indexes", [
+        "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.user_id IS UNIQUE",
+        "CREATE INDEX user_username IF NOT EXISTS FOR (u:User) ON (u.username)",
+        "CREATE INDEX memory_text_hash IF NOT EXISTS FOR (m:Memory) ON (m.text_hash)",
+    ]),
+    (2, "unique Memory.memory_id", [
+        # the plain index from before would clash with the constraint's backing index
+        "DROP INDEX memory_id IF EXISTS",
+        "CREATE CONSTRAINT memory_id_unique IF NOT EXISTS FOR (m:Memory) REQUIRE m.memory_id IS UNIQUE",
+    ]),
+    (3, "Memory.user_id with (user_id, created_at) for index-ordered latest-N", [
+        "CREATE INDEX memory_user_created IF NOT EXISTS FOR (m:Memory) ON (m.user_id, m.created_at)",
+        "CREATE INDEX memory_kind IF NOT EXISTS FOR (m:Memory) ON (m.kind)",
+        "CREATE INDEX memory_created_at IF NOT EXISTS FOR (m:Memory) ON (m.created_at)",
+        """
+        MATCH (u:User)-[:HAS_MEMORY]->(m:Memory) WHERE m.user_id IS NULL
+        CALL { WITH u, m SET m.user_id = u.user_id } IN TRANSACTIONS OF 10000 ROWS
+        """,
+    ]),
+    (4, "shared Entity nodes (Skill/Topic/Company) for MENTIONS links", [
+        # existing memories get linked by python -m backend.link_entities
+        "CREATE CONSTRAINT entity_key_unique IF NOT EXISTS FOR (e:Entity) REQUIRE e.key IS UNIQUE",
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+GET_VERSION_QUERY = "MATCH (v:SchemaVersion {id: 'memory-graph'}) RETURN v.version AS version"
+
+SET_VERSION_QUERY = """
+MERGE (v:SchemaVersion {id: 'memory-graph'})
+SET v.version = $version, v.name = $name, v.applied_at = datetime()
+"""
+
+
+def pending(version: int) -> list[tuple[int, str, list[str]]]:
+    return [m for m in MIGRATIONS if m[0] > version]
+
+
+def current_version(driver) -> int:
+    with driver.session() as s:
+        rec = s.run(GET_VERSION_QUERY).single()
+    return (rec and rec["version"]) or 0
+
+def migrate(driver, log=print) -> int:
+    version = current_version(driver)
+    with driver.session() as s:
+        for v, name, statements in pending(version):
+            for q in statements:
+                s.run(q).consume()
+            s.run(SET_VERSION_QUERY, version=v, name=name).consume()
+            log(f"schema: applied {v} ({name})")
+            version = v
+    return version
+
+
+async def current_version_async(driver) -> int:
+    async with driver.session() as s:
+        rec = await (await s.run(GET_VERSION_QUERY)).single()
+    return (rec and rec["version"]) or 0
+
+async def migrate_async(driver, log=print) -> int:
+    version = await current_version_async(driver)
+    async with driver.session() as s:
+        for v, name, statements in pending(version):
+            for q in statements:
+                await (await s.run(q)).consume()
+            await (await s.run(SET_VERSION_QUERY, version=v, name=name)).consume()
+            log(f"schema: applied {v} ({name})")
+            version = v
+    return version
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Apply Neo4j schema migrations")
+    ap.add_argument("--status", action="store_true", help="print current/pending versions and exit")
+    args = ap.parse_args(argv)
+
+    from neo4j import GraphDatabase
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    try:
+        version = current_version(driver)
+        if args.status:
+            print(f"schema version {version}, latest {LATEST_VERSION}")
+            for v, name, _ in pending(version):
+                print(f"  pending {v}: {name}")
+            return
+        version = migrate(driver, log=lambda msg: print(msg, file=sys.stderr))
+        print(f"schema version {version}", file=sys.stderr)
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    main()
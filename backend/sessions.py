@@ -0,0 +1,186 @@
+import heapq
+import sqlite3
+import threading
+import time
+import uuid
+from .config import SESSION_BACKEND, SESSION_TTL, SESSION_DB_PATH, REDIS_URL
+
+# All stores keep one live token per user: create() revokes the user's previous
+# tokens through a user -> tokens index (Redis: user -> current token) instead of
+# scanning every session.
+
+class MemorySessionStore:
+    def __init__(self, ttl: float = SESSION_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions = {}  # token -> (user_id, expires_at)
+        self._by_user = {}   # user_id -> set(tokens)
+        self._expiry = []    # heap of (expires_at, token)
+
+    def create(self, user_id: str) -> str:
+        token = str(uuid.uuid4())
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            for old in self._by_user.pop(user_id, ()):
+                self._sessions.pop(old, None)
+            self._sessions[token] = (user_id, expires_at)
+            self._by_user[user_id] = {token}
+            heapq.heappush(self._expiry, (expires_at, token))
+            self._compact()
+        return token
+
+    def get(self, token: str) -> str | None:
+        entry = self._sessions.get(token)
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry[0]
+
+    def revoke(self, token: str):
+        with self._lock:
+            self._drop(token)
+            self._compact()
+
+    def _compact(self):
+        # revoked and replaced tokens leave their heap entries behind; rebuild once they
+        # outnumber the live ones, so the heap stays O(sessions) however often users log in
+        if len(self._expiry) > 2 * len(self._sessions) + 64:
+            self._expiry = [(exp, t) for exp, t in self._expiry if t in self._sessions]
+            heapq.heapify(self._expiry)
+
+    def _drop(self, token: str):
+        entry = self._sessions.pop(token, None)
+        if entry is not None:
+            tokens = self._by_user.get(entry[0])
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._by_user[entry[0]]
+
+    def sweep(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] < now:
+                _, token = heapq.heappop(self._expiry)
+                entry = self._sessions.get(token)
+                if entry is not None and entry[1] < now:
+                    self._drop(token)
+                    removed += 1
+        return removed
+
+    def count(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    # WAL so several uvicorn workers can share one file
+    def __init__(self, path: str = SESSION_DB_PATH, ttl: float = SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        db = self._db()
+        db.execute("""
+        CREATE TABLE IF NOT EXISTS sessions (
+            token TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """)
+        db.execute("CREATE INDEX IF NOT EXISTS sessions_user ON sessions(user_id)")
+        db.execute("CREATE INDEX IF NOT EXISTS sessions_expires ON sessions(expires_at)")
+
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=10000")
+            self._local.conn = conn
+        return conn
+
+    def create(self, user_id: str) -> str:
+        token = str(uuid.uuid4())
+        db = self._db()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM sessions WHERE user_id=?", (user_id,))
+            db.execute("INSERT INTO sessions(token, user_id, expires_at) VALUES(?,?,?)",
+                       (token, user_id, time.time() + self.ttl))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return token
+
+    def get(self, token: str) -> str | None:
+        row = self._db().execute("SELECT user_id FROM sessions WHERE token=? AND expires_at>?",
+                                 (token, time.time())).fetchone()
+        return row[0] if row else None
+
+    def revoke(self, token: str):
+        self._db().execute("DELETE FROM sessions WHERE token=?", (token,))
+
+    def sweep(self) -> int:
+        return self._db().execute("DELETE FROM sessions WHERE expires_at<?", (time.time(),)).rowcount
+
+    def count(self) -> int:
+        return self._db().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class RedisSessionStore:
+    # `client` is anything with redis-py's sync API; expiry is native (EX), so sweep is a no-op.
+    # The user's key names their current token and a token is valid only while it does, so
+    # create() is two plain SETs: concurrent logins leave exactly one winner, with no
+    # read-then-delete race and no script touching undeclared keys (fine on Redis Cluster).
+    # Superseded token keys stay behind until their own TTL, unusable.
+    def __init__(self, client, ttl: float = SESSION_TTL, prefix: str = "miko:"):
+        self.client = client
+        self.ttl = max(1, int(ttl))
+        self.prefix = prefix
+
+    def _tk(self, token: str) -> str:
+        return f"{self.prefix}sess:{token}"
+
+    def _uk(self, user_id: str) -> str:
+        return f"{self.prefix}user_tok:{user_id}"
+
+    @staticmethod
+    def _str(v) -> str | None:
+        return v.decode() if isinstance(v, bytes) else v
+
+    def create(self, user_id: str) -> str:
+        token = str(uuid.uuid4())
+        # token first: once the user key names it, it must resolve
+        self.client.set(self._tk(token), user_id, ex=self.ttl)
+        self.client.set(self._uk(user_id), token, ex=self.ttl)
+        return token
+
+    def get(self, token: str) -> str | None:
+        user_id = self._str(self.client.get(self._tk(token)))
+        if user_id is None or self._str(self.client.get(self._uk(user_id))) != token:
+            return None
+        return user_id
+
+    def revoke(self, token: str):
+        self.client.delete(self._tk(token))
+
+    def sweep(self) -> int:
+        return 0
+
+    def count(self) -> int:
+        return -1  # not tracked
+
+
+def make_session_store(kind: str = SESSION_BACKEND):
+    if kind == "memory":
+        return MemorySessionStore()
+    if kind == "sqlite":
+        return SQLiteSessionStore()
+    if kind == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SESSION_BACKEND=redis needs `pip install redis`")
+        return RedisSessionStore(redis.Redis.from_url(REDIS_URL))
+    raise RuntimeError(f"Unknown SESSION_BACKEND: {kind}")
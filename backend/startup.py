@@ -0,0 +1,69 @@
+import time
+from contextlib import contextmanager
+
+# Where a worker's time-to-ready goes, served under "startup" in /stats and /health/ready:
+#   imports_s  importing backend.main (FastAPI, models, clients), from the first line of
+#              main.py to the end of its module body
+#   stages     each init step with its last duration and attempts; Neo4j connects in
+#              the background, so its attempts keep counting while it is down
+#   checks     readiness, all must be true for /health/ready to say 200
+#   ready_s    from import start until all checks first passed
+# Per-module import detail: bench/startup_profile.py (python -X importtime underneath).
+
+class StartupProfile:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.imports_s = None
+        self.ready_s = None
+        self.stages: dict[str, dict] = {}
+        self.checks: dict[str, bool] = {}
+        self.errors: dict[str, str] = {}
+
+    def _since(self) -> float:
+        return round(time.perf_counter() - self.t0, 4)
+
+    def imported(self):
+        self.imports_s = self._since()
+
+    def expect(self, *names: str):
+        for name in names:
+            self.checks.setdefault(name, False)
+
+    @contextmanager
+    def stage(self, name: str, **info):
+        entry = self.stages.setdefault(name, {"attempts": 0})
+        entry["attempts"] += 1
+        t0 = time.perf_counter()
+        try:
+            yield entry
+            entry["status"] = "ok"
+        except Exception:
+            entry["status"] = "error"
+            raise
+        finally:
+            entry.update(info, s=round(time.perf_counter() - t0, 4), at_s=self._since())
+
+    def check(self, name: str, ok: bool, error: str | None = None):
+        self.checks[name] = ok
+        if ok:
+            self.errors.pop(name, None)
+        else:
+            self.errors[name] = error or "not ready"
+        if self.ready and self.ready_s is None:
+            self.ready_s = self._since()
+            print(self.summary())
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.checks) and all(self.checks.values())
+
+    def summary(self) -> str:
+        stages = ", ".join(f"{k} {v['s']:.2f}s" for k, v in self.stages.items())
+        return f"startup: ready in {self.ready_s:.2f}s (imports {self.imports_s or 0:.2f}s, {stages})"
+
+    def report(self) -> dict:
+        return {"ready": self.ready, "uptime_s": self._since(), "imports_s": self.imports_s, "ready_s": self.ready_s,
+                "checks": dict(self.checks), "errors": dict(self.errors), "stages": self.stages}
+
+
+STARTUP = StartupProfile()
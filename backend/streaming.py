@@ -0,0 +1,143 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # stdlib json is fine, just slower
+    orjson = None
+
+# Incremental scanner for the {"answer": "...", "memories": [...]} contract.
+# Feeds raw model deltas and hands back decoded answer text as soon as it
+# arrives; everything else is left to the normal parser once the stream ends.
+
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class AnswerStreamParser:
+    def __init__(self, key: str = "answer"):
+        self.key = key
+        self._raw = []
+        self._state = "scan"  # scan -> colon -> value -> answer -> done
+        self._depth = 0
+        self._in_str = False
+        self._esc = False
+        self._expect_key = False
+        self._key_chars = None
+        self._pending = ""
+        self._high = ""
+        self.answer = ""
+
+    @property
+    def raw(self) -> str:
+        return "".join(self._raw)
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> str:
+        self._raw.append(chunk)
+        if self._state == "done":
+            return ""
+        out = []
+        for ch in chunk:
+            state = self._state
+            if state == "answer":
+                self._answer_char(ch, out)
+            elif state == "scan":
+                self._scan_char(ch)
+            elif state == "colon":
+                if ch == ":":
+                    self._state = "value"
+                elif not ch.isspace():
+                    self._state = "scan"
+            elif state == "value":
+                if ch == '"':
+                    self._state = "answer"
+                elif not ch.isspace():
+                    # answer is not a string (null/number) -> nothing to stream
+                    self._state = "done"
+            else:
+                break
+        piece = "".join(out)
+        self.answer += piece
+        return piece
+
+    def _scan_char(self, ch: str):
+        if self._in_str:
+            if self._esc:
+                self._esc = False
+            elif ch == "\\":
+                self._esc = True
+            elif ch == '"':
+                self._in_str = False
+                if self._key_chars is not None:
+                    if "".join(self._key_chars) == self.key:
+                        self._state = "colon"
+                    self._key_chars = None
+                return
+            if self._key_chars is not None:
+                self._key_chars.append(ch)
+            return
+
+        if ch == '"':
+            self._in_str = True
+            self._key_chars = [] if (self._depth == 1 and self._expect_key) else None
+            self._expect_key = False
+        elif ch in "{[":
+            self._depth += 1
+            self._expect_key = ch == "{" and self._depth == 1
+        elif ch in "}]":
+            self._depth -= 1
+        elif ch == "," and self._depth == 1:
+            self._expect_key = True
+
+    def _answer_char(self, ch: str, out: list):
+        if self._pending:
+            self._pending += ch
+            if self._pending[1] == "u" and len(self._pending) < 6:
+                return
+            self._emit_escape(self._pending, out)
+            self._pending = ""
+        elif ch == "\\":
+            self._pending = ch
+        elif ch == '"':
+            if self._high:
+                out.append("\ufffd")
+                self._high = ""
+            self._state = "done"
+        else:
+            if self._high:
+                out.append("\ufffd")
+                self._high = ""
+            out.append(ch)
+
+    def _emit_escape(self, esc: str, out: list):
+        if esc[1] != "u":
+            out.append(_SIMPLE_ESCAPES.get(esc[1], esc[1]))
+            return
+        try:
+            c = json.loads(f'"{esc}"')
+        except ValueError:
+            out.append("\ufffd")
+            return
+        if "\ud800" <= c <= "\udbff":
+            self._high = c
+        elif "\udc00" <= c <= "\udfff" and self._high:
+            out.append((self._high + c).encode("utf-16", "surrogatepass").decode("utf-16"))
+            self._high = ""
+        else:
+            out.append(c)
+
+
+def _dumps(data) -> str:
+    if hasattr(data, "model_dump_json"):
+        return data.model_dump_json()  # pydantic models serialize themselves (Rust core)
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode()
+    return json.dumps(data, default=str)
+
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {_dumps(data)}\n\n"
+
+def jsonl_line(data) -> str:
+    return _dumps(data) + "\n"
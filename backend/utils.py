@@ -1,15 +1,57 @@
 import time
 from contextlib import contextmanager
+from .config import TRACE_LEVEL, TRACE_MAX_LEVEL
+from .metrics import STAGE_SECONDS, span
+
+TRACE_LEVELS = ("off", "timings", "full")
+
+
+def trace_level(requested: str | None = None) -> str:
+    # per-request level, capped by the deployment's TRACE_MAX_LEVEL
+    level = requested or TRACE_LEVEL
+    if level not in TRACE_LEVELS:
+        level = "timings"
+    cap = TRACE_MAX_LEVEL if TRACE_MAX_LEVEL in TRACE_LEVELS else "full"
+    return min(level, cap, key=TRACE_LEVELS.index)
+
+
+class Trace(list):
+    # a request's debug_trace; timed() entries are always recorded (the response's
+    # *_time_ms fields come from them), detail entries are only built at "full"
+    def __init__(self, level: str = "full"):
+        super().__init__()
+        self.level = level
+
+    @property
+    def full(self) -> bool:
+        return self.level == "full"
+
+    def detail(self, build):
+        # build: zero-arg callable returning the entry, so "off"/"timings" never pay for it
+        if self.full:
+            self.append(build())
+
+    def export(self) -> list[dict]:
+        if self.level == "off":
+            return []
+        if self.level == "timings":
+            return [e for e in self if "ms" in e]
+        return list(self)
+
 
 @contextmanager
 def timed(stage_name: str, trace: list):
+    # per-request trace entry + process-wide histogram + (optional) OTel span
     t0 = time.perf_counter()
     trace.append({"stage": stage_name, "status": "start"})
-    try:
-        yield
-        dt = int((time.perf_counter() - t0) * 1000)
-        trace.append({"stage": stage_name, "status": "ok", "ms": dt})
-    except Exception as e:
-        dt = int((time.perf_counter() - t0) * 1000)
-        trace.append({"stage": stage_name, "status": "error", "ms": dt, "error": str(e)})
-        raise
\ No newline at end of file
+    with span(f"stage.{stage_name}"):
+        try:
+            yield
+            dt = time.perf_counter() - t0
+            trace.append({"stage": stage_name, "status": "ok", "ms": int(dt * 1000)})
+            STAGE_SECONDS.observe(dt, stage=stage_name, status="ok")
+        except Exception as e:
+            dt = time.perf_counter() - t0
+            trace.append({"stage": stage_name, "status": "error", "ms": int(dt * 1000), "error": str(e)})
+            STAGE_SECONDS.observe(dt, stage=stage_name, status="error")
+            raise
@@ -0,0 +1,111 @@
+import argparse
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from passlib.hash import pbkdf2_sha256
+from backend.auth import AuthRepository
+
+# Signup/login throughput of the auth database under concurrent workers.
+#   python bench/auth_bench.py --workers 16 --users 2000
+# Password hashing is done once up front so the numbers measure the database
+# path only (connection setup, journaling, locking); add --hash to include it.
+
+class ConnectPerCall:
+    # the pre-pool behaviour: fresh connection per call, rollback journal
+    def __init__(self, path):
+        self.path = path
+
+    def init_schema(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            username TEXT UNIQUE,
+            password_hash TEXT
+        )
+        """)
+        conn.commit()
+        conn.close()
+
+    def insert_user(self, user_id, username, pw_hash):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("INSERT INTO users(user_id, username, password_hash) VALUES(?,?,?)",
+                     (user_id, username, pw_hash))
+        conn.commit()
+        conn.close()
+
+    def get_credentials(self, username):
+        conn = sqlite3.connect(self.path, timeout=10)
+        row = conn.execute("SELECT user_id, password_hash FROM users WHERE username=?", (username,)).fetchone()
+        conn.close()
+        return row
+
+    def close(self):
+        pass
+
+
+def _run(repo, workers: int, users: int, logins_per_user: int, hash_rounds: int | None) -> dict:
+    hasher = pbkdf2_sha256.using(rounds=hash_rounds) if hash_rounds else None
+    fixed_hash = pbkdf2_sha256.using(rounds=1000).hash("pw")
+    names = [f"user-{uuid.uuid4().hex[:12]}" for _ in range(users)]
+    errors = []
+
+    def shard(i):
+        return names[i::workers]
+
+    def signup_worker(i):
+        for name in shard(i):
+            try:
+                repo.insert_user(str(uuid.uuid4()), name, hasher.hash("pw") if hasher else fixed_hash)
+            except Exception as e:
+                errors.append(e)
+
+    def login_worker(i):
+        for name in shard(i):
+            for _ in range(logins_per_user):
+                try:
+                    row = repo.get_credentials(name)
+                    if hasher and row:
+                        hasher.verify("pw", row[1])
+                except Exception as e:
+                    errors.append(e)
+
+    out = {}
+    for label, target, ops in (("signup", signup_worker, users), ("login", login_worker, users * logins_per_user)):
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(workers)]
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        dt = time.perf_counter() - t0
+        out[label] = {"ops": ops, "seconds": round(dt, 3), "ops_per_s": round(ops / dt, 1)}
+    out["errors"] = len(errors)
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Auth DB signup/login throughput")
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--users", type=int, default=2000)
+    ap.add_argument("--logins-per-user", type=int, default=3)
+    ap.add_argument("--hash", type=int, metavar="ROUNDS", help="include pbkdf2 with this many rounds")
+    args = ap.parse_args(argv)
+
+    for label, make in (("connect-per-call", ConnectPerCall), ("pooled-wal", AuthRepository)):
+        with tempfile.TemporaryDirectory() as d:
+            repo = make(Path(d) / "auth.db")
+            repo.init_schema()
+            res = _run(repo, args.workers, args.users, args.logins_per_user, args.hash)
+            repo.close()
+        print(f"{label:18s} signup {res['signup']['ops_per_s']:>9.1f}/s   "
+              f"login {res['login']['ops_per_s']:>9.1f}/s   errors {res['errors']}")
+
+if __name__ == "__main__":
+    main()
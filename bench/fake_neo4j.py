@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timezone
+from backend.consolidation import fingerprint
+from backend.embeddings import cosine
+from backend.entities import rank_memories_graph
+from backend.lifecycle import is_expired
+
+# In-memory stand-in for AsyncNeo4jClient: same method surface, optional fixed
+# per-call latency so benchmarks can model a remote database without running one.
+
+class FakeNeo4jClient:
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.users: dict[str, str] = {}
+        self.memories: dict[str, list[dict]] = {}
+        self.by_id: dict[str, dict] = {}
+        self.calls = 0
+
+    async def _io(self):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def connect(self):
+        await self._io()
+
+    async def close(self):
+        pass
+
+    async def init_schema(self) -> int:
+        await self._io()
+        return 0
+
+    async def ensure_user_node(self, user_id: str, username: str):
+        await self._io()
+        self.users[user_id] = username
+        self.memories.setdefault(user_id, [])
+
+    def _insert(self, user_id: str, memory: dict):
+        m = dict(memory)
+        fingerprint(m)
+        m.setdefault("created_at", datetime.now(timezone.utc))
+        m.update(user_id=user_id, last_seen=m["created_at"], seen_count=1)
+        self.memories.setdefault(user_id, []).append(m)
+        self.by_id[m["memory_id"]] = m
+
+    async def add_memory(self, user_id: str, memory: dict):
+        await self.add_memories(user_id, [memory])
+
+    async def add_memories(self, user_id: str, memories: list[dict]):
+        await self._io()
+        for m in memories:
+            self._insert(user_id, m)
+
+    async def import_memories(self, rows: list[dict]):
+        if not rows:
+            return
+        await self._io()
+        for r in rows:
+            r = dict(r)
+            if r.get("created_at") is None:
+                r.pop("created_at", None)
+            self._insert(r.pop("user_id"), r)
+
+    def _newest(self, user_id: str, limit: int) -> list[dict]:
+        return [dict(m) for m in reversed(self.memories.get(user_id, []))][:limit]
+
+    async def get_memories(self, user_id: str, limit: int = 10):
+        await self._io()
+        return self._newest(user_id, limit)
+
+    async def search_memories(self, user_id: str, embedding: list[float], limit: int = 10):
+        await self._io()
+        rows = [dict(m, score=cosine(m.get("embedding"), embedding)) for m in self._live(user_id)]
+        rows.sort(key=lambda m: m["score"], reverse=True)
+        return rows[:limit]
+
+    async def graph_search_memories(self, user_id: str, embedding: list[float], entity_keys: list[str],
+                                    limit: int = 10, **kw):
+        await self._io()
+        return rank_memories_graph(self._live(user_id), embedding, entity_keys, limit, **kw)
+
+    def _live(self, user_id: str) -> list[dict]:
+        # the real queries leave out expired memories (_NOT_EXPIRED)
+        return [m for m in self._newest(user_id, 10**9) if not is_expired(m)]
+
+    async def get_memories_with_embeddings(self, user_id: str, limit: int = 1000):
+        await self._io()
+        return self._newest(user_id, limit)
+
+    async def merge_memories(self, rows: list[dict]):
+        if not rows:
+            return
+        await self._io()
+        for row in rows:
+            m = self.by_id.get(row["memory_id"])
+            if m:
+                m["confidence"] = max(m.get("confidence") or 0.0, row["confidence"])
+                m["seen_count"] += 1
+                m["last_seen"] = datetime.now(timezone.utc)
+
+    async def set_fingerprints(self, rows: list[dict]):
+        if not rows:
+            return
+        await self._io()
+        for row in rows:
+            m = self.by_id.get(row["memory_id"])
+            if m:
+                m.update(text_hash=row["text_hash"], simhash=row["simhash"])
+                m.setdefault("embedding", row["embedding"])
+
+    async def touch_memories(self, rows: list[dict]):
+        if not rows:
+            return
+        await self._io()
+        for row in rows:
+            m = self.by_id.get(row["memory_id"])
+            if m:
+                m["access_count"] = m.get("access_count", 0) + row["count"]
+                m["last_accessed"] = datetime.now(timezone.utc)
+
+    async def restore_memories(self, user_id: str, memories: list[dict]):
+        await self._io()
+        for m in memories:
+            if m["memory_id"] not in self.by_id:
+                self._insert(user_id, m)
@@ -0,0 +1,208 @@
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from backend.consolidation import fingerprint
+from backend.embeddings import rank_memories, get_embedder
+from backend.entities import TAXONOMY, COMPANIES, entity_keys, rank_memories_graph
+from backend.memory import make_memory
+
+# Vector vs graph retrieval on a synthetic memory graph (default 10k users x 1k memories).
+#
+#   python bench/graph_bench.py --users 10000 --memories 1000 --queries 200
+#       in process: generates only the queried users (deterministic per user) and compares
+#       recall@k and ranking time of rank_memories vs rank_memories_graph
+#   python bench/graph_bench.py --neo4j --load --users 10000 --memories 1000
+#       loads the graph into NEO4J_URI (scratch database, users are "graphbench-<n>"),
+#       then times SEARCH_MEMORIES_QUERY vs GRAPH_SEARCH_MEMORIES_QUERY and PROFILEs db
+#       hits, including a query on the most popular skill (the supernode case).
+#       Loading 10M memories takes a while; --neo4j without --load reuses an earlier load.
+#
+# Skill popularity is Zipf-distributed, so a handful of skills are mentioned by nearly
+# every user. Ground truth: a memory is relevant when it is about the queried skill or
+# topic, or about a skill under the queried topic.
+
+SKILL_TOPICS = {}
+for _topic, _skills in TAXONOMY.items():
+    for _skill in _skills:
+        SKILL_TOPICS.setdefault(_skill, set()).add(_topic)
+SKILLS = sorted(SKILL_TOPICS)
+TOPICS = sorted(TAXONOMY)
+
+TEMPLATES = [
+    "I struggle with {skill} questions",
+    "I have two years of experience with {skill}",
+    "My goal is to get comfortable with {skill} before the onsite",
+    "I prefer practicing {skill} problems in the evening",
+    "I am preparing for interviews at {company} and expect {skill} rounds",
+]
+FILLER = [
+    "I study for about an hour after work",
+    "I like short explanations with an example",
+    "I get nervous during live coding",
+    "My interview is in three weeks",
+    "I learn best by doing mock interviews",
+]
+QUESTIONS = [
+    "How should I prepare for {x} interview questions?",
+    "Can you give me a study plan for {x}?",
+    "What are common {x} pitfalls in interviews?",
+]
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    return [1 / (i + 1) ** s for i in range(n)]
+
+SKILL_WEIGHTS = _zipf_weights(len(SKILLS))
+
+
+def user_memories(user: int, n: int, seed: int = 7) -> list[dict]:
+    # deterministic per user, so a sample can be regenerated without materializing everyone
+    rng = random.Random(seed * 1_000_003 + user)
+    out = []
+    for i in range(n):
+        if rng.random() < 0.25:
+            text, about = rng.choice(FILLER), None
+        else:
+            about = rng.choices(SKILLS, SKILL_WEIGHTS)[0]
+            text = rng.choice(TEMPLATES).format(skill=about, company=rng.choice(COMPANIES).title())
+        m = make_memory(f"{text} (#{i})", kind="fact", source="bench", confidence=0.9)
+        m["about"] = about
+        m["user_id"] = f"graphbench-{user}"
+        out.append(m)
+    return out
+
+
+def query_for(rng: random.Random) -> tuple[str, set[str], set[str]]:
+    # -> (message, relevant skills, relevant topics)
+    if rng.random() < 0.5:
+        skill = rng.choices(SKILLS, SKILL_WEIGHTS)[0]
+        return rng.choice(QUESTIONS).format(x=skill), {skill}, set()
+    topic = rng.choice(TOPICS)
+    return rng.choice(QUESTIONS).format(x=topic), set(TAXONOMY[topic]), {topic}
+
+
+def recall(ranked: list[dict], relevant: set[str], memories: list[dict]) -> float | None:
+    total = sum(1 for m in memories if m["about"] in relevant)
+    if not total:
+        return None
+    hits = sum(1 for m in ranked if m.get("about") in relevant)
+    return hits / min(total, len(ranked))
+
+
+def pct(xs: list[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))] if xs else 0.0
+
+
+def run_offline(args) -> dict:
+    rng = random.Random(args.seed)
+    embedder = get_embedder()
+    res = {"vector": {"recall": [], "ms": []}, "graph": {"recall": [], "ms": []}}
+    for _ in range(args.queries):
+        memories = user_memories(rng.randrange(args.users), args.memories, args.seed)
+        for m in memories:
+            fingerprint(m)
+            m["entity_keys"] = entity_keys(m["text"])  # what the MENTIONS links hold
+        message, relevant, _ = query_for(rng)
+        query, keys = embedder.embed(message), entity_keys(message)
+        for mode in ("vector", "graph"):
+            t0 = time.perf_counter()
+            if mode == "vector":
+                ranked = rank_memories(memories, query, args.k)
+            else:
+                ranked = rank_memories_graph(memories, query, keys, args.k)
+            res[mode]["ms"].append((time.perf_counter() - t0) * 1000)
+            r = recall(ranked, relevant, memories)
+            if r is not None:
+                res[mode]["recall"].append(r)
+    return {mode: {"recall_at_k": round(sum(v["recall"]) / max(1, len(v["recall"])), 4),
+                   "p50_ms": round(pct(v["ms"], 0.5), 2), "p95_ms": round(pct(v["ms"], 0.95), 2)}
+            for mode, v in res.items()}
+
+
+def load_neo4j(driver, args):
+    from backend import neo4j_client as nc
+    with driver.session() as s:
+        s.execute_write(nc._write, nc.SYNC_TAXONOMY_QUERY, rows=nc.taxonomy_rows())
+    batch, done, t0 = [], 0, time.perf_counter()
+    with driver.session() as s:
+        for u in range(args.users):
+            batch.extend(user_memories(u, args.memories, args.seed))
+            if len(batch) >= args.batch_size or u == args.users - 1:
+                s.execute_write(nc._write_all, nc._with_links(
+                    nc.IMPORT_MEMORIES_QUERY, {"rows": [nc._import_row(r) for r in batch]}, batch))
+                done += len(batch)
+                batch = []
+                rate = done / (time.perf_counter() - t0)
+                print(f"loaded {done} memories ({rate:.0f}/s)", file=sys.stderr)
+
+
+def run_neo4j(driver, args) -> dict:
+    from bench.query_plans import profile
+    from backend import neo4j_client as nc
+    embedder = get_embedder()
+    rng = random.Random(args.seed)
+    base = {"limit": args.k, "graph_weight": 0.3, "near_weight": 0.5, "kind_ttls": nc.kind_ttl_seconds()}
+    res = {"vector": {"ms": [], "db_hits": []}, "graph": {"ms": [], "db_hits": []}}
+    with driver.session() as s:
+        for i in range(args.queries):
+            user_id = f"graphbench-{rng.randrange(args.users)}"
+            message, _, _ = query_for(rng)
+            params = dict(base, user_id=user_id, embedding=embedder.embed(message), entity_keys=entity_keys(message))
+            for mode, query in (("vector", nc.SEARCH_MEMORIES_QUERY), ("graph", nc.GRAPH_SEARCH_MEMORIES_QUERY)):
+                t0 = time.perf_counter()
+                s.run(query, **params).consume()
+                res[mode]["ms"].append((time.perf_counter() - t0) * 1000)
+                if i < args.profile:
+                    res[mode]["db_hits"].append(profile(driver, query, params)[0])
+    out = {mode: {"p50_ms": round(pct(v["ms"], 0.5), 2), "p95_ms": round(pct(v["ms"], 0.95), 2),
+                  "p99_ms": round(pct(v["ms"], 0.99), 2), "db_hits_p50": pct(v["db_hits"], 0.5)}
+           for mode, v in res.items()}
+    # supernode check: the most popular skill, mentioned by (nearly) every user
+    hot = dict(base, user_id="graphbench-0", embedding=embedder.embed(SKILLS[0]), entity_keys=[f"skill:{SKILLS[0]}"])
+    out["hot_entity_db_hits"] = profile(driver, nc.GRAPH_SEARCH_MEMORIES_QUERY, hot)[0]
+    return out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Vector vs graph-aware memory retrieval on a synthetic graph")
+    ap.add_argument("--users", type=int, default=10000)
+    ap.add_argument("--memories", type=int, default=1000, help="memories per user")
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("-k", type=int, default=12, help="memories retrieved per query (RETRIEVAL_LIMIT)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--neo4j", action="store_true", help="run against NEO4J_URI instead of in process")
+    ap.add_argument("--load", action="store_true", help="(with --neo4j) load the synthetic graph first")
+    ap.add_argument("--batch-size", type=int, default=5000, help="memories per load transaction")
+    ap.add_argument("--profile", type=int, default=20, help="(with --neo4j) queries to PROFILE for db hits")
+    ap.add_argument("--out", help="write results JSON here")
+    args = ap.parse_args(argv)
+
+    if args.neo4j:
+        from neo4j import GraphDatabase
+        from backend.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+        from backend.schema import migrate
+        driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+        try:
+            migrate(driver)
+            if args.load:
+                load_neo4j(driver, args)
+            res = run_neo4j(driver, args)
+        finally:
+            driver.close()
+    else:
+        res = run_offline(args)
+
+    res["meta"] = {"users": args.users, "memories_per_user": args.memories, "queries": args.queries, "k": args.k,
+                   "mode": "neo4j" if args.neo4j else "in-process"}
+    print(json.dumps(res, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(res, indent=2))
+
+if __name__ == "__main__":
+    main()
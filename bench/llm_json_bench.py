@@ -0,0 +1,151 @@
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from backend.llm_json import extract_json, validate_memories, ALLOWED_KINDS, orjson
+
+# Correctness + fuzz + speed for backend/llm_json.py.
+#   python bench/llm_json_bench.py                 # corpus check, fuzz, benchmark
+#   python bench/llm_json_bench.py --fuzz 20000 --seed 7
+# The corpus (bench/llm_json_corpus.jsonl) holds malformed outputs seen from the
+# models: fences, prose around the object, trailing commas, max_tokens truncation,
+# stray braces. Exit status is 1 if any corpus case or fuzz invariant fails.
+
+CORPUS = Path(__file__).resolve().parent / "llm_json_corpus.jsonl"
+
+
+def legacy_parse(content: str) -> dict | None:
+    # the pre-llm_json path (regex fence strip, json.loads, greedy regex salvage), as a baseline
+    s = content.strip()
+    s = re.sub(r"^```(?:json)?\s*", "", s)
+    s = re.sub(r"\s*```$", "", s).strip()
+    try:
+        return json.loads(s)
+    except Exception:
+        try:
+            m = re.search(r"\{[\s\S]*\}", s)
+            if m:
+                return json.loads(m.group(0))
+        except Exception:
+            return None
+    return None
+
+
+def check_corpus() -> list[str]:
+    failures = []
+    for line in CORPUS.read_text(encoding="utf-8").splitlines():
+        case = json.loads(line)
+        out, how = extract_json(case["text"])
+        exp = case["expect"]
+        if exp is None:
+            if out is not None:
+                failures.append(f"{case['name']}: expected failure, got {how}")
+            continue
+        memories = validate_memories(out.get("memories")) if out else []
+        answer = out.get("answer") if out else None
+        if how != exp["how"] or len(memories) != exp["memories"] or (exp["answer"] and answer != exp["answer"]):
+            failures.append(f"{case['name']}: got {how}, answer={answer!r}, memories={len(memories)}")
+    return failures
+
+
+def _valid_output(rng: random.Random, answer_words: int) -> str:
+    words = ["index", "join", "cache", "{braces}", "\"quoted\"", "back\\slash", "naïve", "[list]", "comma,"]
+    return json.dumps({
+        "answer": " ".join(rng.choice(words) for _ in range(answer_words)),
+        "memories": [{"text": f"memory {i} {rng.choice(words)}", "kind": rng.choice(sorted(ALLOWED_KINDS)),
+                      "confidence": round(rng.random(), 2)} for i in range(rng.randint(0, 4))],
+    }, ensure_ascii=rng.random() < 0.5)
+
+def _mutate(rng: random.Random, s: str) -> str:
+    op = rng.randrange(6)
+    if op == 0:
+        return s[:rng.randrange(len(s) + 1)]                       # truncation
+    if op == 1:
+        return "Here you go:\n" + s + "\nHope that helps {:"         # prose around
+    if op == 2:
+        return "```json\n" + s + "\n```"                           # fences
+    if op == 3:
+        return s.replace("}", ",}", 1).replace("]", ",]", 1)       # trailing commas
+    if op == 4:
+        i = rng.randrange(len(s))
+        return s[:i] + s[i + 1:]                                   # dropped char
+    return "{ " * rng.randint(1, 20) + s                           # stray braces
+
+def fuzz(n: int, seed: int) -> tuple[list[str], dict]:
+    rng = random.Random(seed)
+    failures, outcomes = [], {}
+    worst = 0.0
+    for _ in range(n):
+        text = _mutate(rng, _valid_output(rng, rng.randint(1, 200)))
+        t0 = time.perf_counter()
+        try:
+            out, how = extract_json(text)
+            memories = validate_memories(out.get("memories")) if out else []
+        except Exception as e:
+            failures.append(f"raised {type(e).__name__}: {e} on {text[:80]!r}")
+            continue
+        worst = max(worst, time.perf_counter() - t0)
+        outcomes[how] = outcomes.get(how, 0) + 1
+        for m in memories:
+            if set(m) != {"text", "kind", "confidence"} or m["kind"] not in ALLOWED_KINDS \
+                    or not 0.0 <= m["confidence"] <= 1.0 or not m["text"]:
+                failures.append(f"off-schema memory {m!r}")
+    outcomes["worst_ms"] = round(worst * 1000, 3)
+    return failures, outcomes
+
+
+def _per_call_us(fn, arg, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+def benchmark(iterations: int) -> list[tuple[str, float, float]]:
+    rng = random.Random(1)
+    valid = _valid_output(rng, 600)  # ~900 tokens, max_tokens territory
+    inputs = {
+        "valid": valid,
+        "fenced": "```json\n" + valid + "\n```",
+        "prose_wrapped": "Sure, here it is:\n" + valid + "\nAnything else?",
+        "truncated": valid[: len(valid) * 2 // 3],
+        "braces_no_close": "{ " * 2000 + "no json here",
+    }
+    rows = []
+    for name, text in inputs.items():
+        n = max(1, iterations // 20) if name == "braces_no_close" else iterations
+        rows.append((name, _per_call_us(legacy_parse, text, n), _per_call_us(extract_json, text, n)))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="LLM JSON extractor corpus / fuzz / benchmark")
+    ap.add_argument("--fuzz", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--iterations", type=int, default=2000)
+    args = ap.parse_args(argv)
+
+    corpus_failures = check_corpus()
+    print(f"corpus: {'ok' if not corpus_failures else str(len(corpus_failures)) + ' failing'}")
+    for f in corpus_failures:
+        print("  ", f)
+
+    fuzz_failures, outcomes = fuzz(args.fuzz, args.seed)
+    print(f"fuzz: {args.fuzz} inputs, {len(fuzz_failures)} failures, outcomes {outcomes}")
+    for f in fuzz_failures[:10]:
+        print("  ", f)
+
+    print(f"\nbenchmark (orjson {'on' if orjson else 'off'})")
+    print(f"  {'input':18s} {'legacy us':>11s} {'llm_json us':>12s}")
+    for name, old, new in benchmark(args.iterations):
+        print(f"  {name:18s} {old:>11.1f} {new:>12.1f}")
+
+    if corpus_failures or fuzz_failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import httpx
+from bench.stub_llm import StubConfig, start as start_stub
+
+# Drives /auth/signup, /auth/login and /chat at a fixed concurrency and reports
+# throughput plus p50/p95/p99 per endpoint and per server-side stage (from the
+# debug_trace timings). By default it starts its own stub LLM and an API process
+# backed by FakeNeo4jClient (bench/serve_stubbed.py); --url targets a running one.
+#   python bench/load_test.py --concurrency 32 --users 100 --out results/HEAD.json
+#   python bench/load_test.py ... --baseline results/main.json   # exit 1 on regression
+#   python bench/load_test.py --diff results/main.json results/HEAD.json
+
+
+def percentile(sorted_vals: list[float], p: float) -> float:
+    # nearest-rank
+    if not sorted_vals:
+        return 0.0
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+def summarize(samples: list[float], seconds: float | None = None, errors: int = 0, rejected: int = 0) -> dict:
+    vals = sorted(samples)
+    out = {"count": len(vals), "errors": errors, "rejected": rejected,
+           "mean_ms": round(sum(vals) / len(vals), 2) if vals else 0.0,
+           "p50_ms": round(percentile(vals, 50), 2),
+           "p95_ms": round(percentile(vals, 95), 2),
+           "p99_ms": round(percentile(vals, 99), 2),
+           "max_ms": round(vals[-1], 2) if vals else 0.0}
+    if seconds:
+        out["rps"] = round(len(vals) / seconds, 1)
+    return out
+
+
+class Recorder:
+    def __init__(self):
+        self.latency: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.rejected: dict[str, int] = {}  # 429s from rate limiting / admission, not failures
+        self.stages: dict[str, list[float]] = {}
+        self.wall: dict[str, float] = {}
+
+    def ok(self, endpoint: str, ms: float):
+        self.latency.setdefault(endpoint, []).append(ms)
+
+    def error(self, endpoint: str):
+        self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def reject(self, endpoint: str):
+        self.rejected[endpoint] = self.rejected.get(endpoint, 0) + 1
+
+    def trace(self, trace: list[dict]):
+        for e in trace or []:
+            if e.get("status") == "ok" and "ms" in e:
+                self.stages.setdefault(e["stage"], []).append(float(e["ms"]))
+
+    def report(self) -> dict:
+        return {
+            "endpoints": {k: summarize(self.latency.get(k, []), self.wall.get(k), self.errors.get(k, 0),
+                                       self.rejected.get(k, 0))
+                          for k in sorted(set(self.latency) | set(self.errors) | set(self.rejected))},
+            "stages": {k: summarize(v) for k, v in sorted(self.stages.items())},
+        }
+
+
+async def _call(client: httpx.AsyncClient, rec: Recorder, endpoint: str, path: str, body: dict) -> dict | None:
+    t0 = time.perf_counter()
+    try:
+        r = await client.post(path, json=body)
+    except httpx.HTTPError:
+        rec.error(endpoint)
+        return None
+    if r.status_code == 429:
+        rec.reject(endpoint)
+        return None
+    if r.status_code != 200:
+        rec.error(endpoint)
+        return None
+    rec.ok(endpoint, (time.perf_counter() - t0) * 1000)
+    return r.json()
+
+async def _phase(rec: Recorder, endpoint: str, jobs: list, concurrency: int):
+    # fixed pool of workers pulling from a shared list = closed-loop load at `concurrency`
+    it = iter(jobs)
+    async def worker():
+        for job in it:
+            await job()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    rec.wall[endpoint] = time.perf_counter() - t0
+
+
+async def run_load(base_url: str, users: int, chats_per_user: int, concurrency: int) -> dict:
+    rec = Recorder()
+    names = [f"load-{uuid.uuid4().hex[:10]}" for _ in range(users)]
+    tokens: dict[str, str] = {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def signup(name):
+            await _call(client, rec, "signup", "/auth/signup", {"username": name, "password": "pw-" + name})
+
+        async def login(name):
+            out = await _call(client, rec, "login", "/auth/login", {"username": name, "password": "pw-" + name})
+            if out:
+                tokens[name] = out["session_token"]
+
+        async def chat(name, i):
+            token = tokens.get(name)
+            if not token:
+                rec.error("chat")
+                return
+            # distinct messages so an enabled LLM cache doesn't turn this into a cache benchmark
+            msg = f"turn {i}: how should I study indexing and caching for interviews? ({uuid.uuid4().hex[:6]})"
+            out = await _call(client, rec, "chat", "/chat", {"session_token": token, "message": msg})
+            if out:
+                rec.trace(out.get("debug_trace"))
+
+        await _phase(rec, "signup", [lambda n=n: signup(n) for n in names], concurrency)
+        await _phase(rec, "login", [lambda n=n: login(n) for n in names], concurrency)
+        await _phase(rec, "chat", [lambda n=n, i=i: chat(n, i) for i in range(chats_per_user) for n in names],
+                     concurrency)
+        stats = (await client.get("/stats")).json()
+    out = rec.report()
+    keys = ("chat_pipeline", "memory_writer", "llm_router", "conversations")
+    out["server_stats"] = {k: stats.get(k) for k in keys}
+    return out
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_healthy(url: str, proc: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"API process exited with {proc.returncode}")
+        try:
+            if httpx.get(url + "/health/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API did not become ready")
+
+def start_api(stub_url: str, tmp: str, neo4j_latency_ms: float, llm_cache: bool, pipeline: str = "single",
+              extractor: str = "gemini") -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(os.environ,
+               GROQ_API_KEY="bench", GROQ_URL=stub_url + "/openai/v1/chat/completions",
+               # the router runs Groq only; the Gemini key/URL are only used by the split pipeline's extractor
+               LLM_PROVIDERS="groq", API_KEY="bench", GEMINI_URL=stub_url + "/v1beta/models/stub:generateContent",
+               CHAT_PIPELINE=pipeline, EXTRACTOR=extractor,
+               LLM_CACHE_ENABLED="1" if llm_cache else "0", LLM_CACHE_PATH=str(Path(tmp) / "llm_cache.db"),
+               SESSION_DB_PATH=str(Path(tmp) / "sessions.db"), MEMORY_ARCHIVE_DIR=str(Path(tmp) / "archive"),
+               CONVERSATION_DIR=str(Path(tmp) / "conversations"),
+               PYTHONPATH=str(ROOT))
+    proc = subprocess.Popen([sys.executable, str(ROOT / "bench" / "serve_stubbed.py"), "--port", str(port),
+                             "--neo4j-latency-ms", str(neo4j_latency_ms), "--auth-db", str(Path(tmp) / "auth.db")],
+                            env=env, stdout=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_healthy(url, proc)
+    except Exception:
+        proc.kill()
+        raise
+    return proc, url
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+def compare(old: dict, new: dict, tolerance: float) -> list[str]:
+    # regressions = p50/p95/p99 more than `tolerance` slower, or rps lower by as much
+    regressions = []
+    print(f"{'':28s} {'metric':7s} {'old':>10s} {'new':>10s} {'change':>8s}")
+    for section in ("endpoints", "stages"):
+        for name, n in new.get(section, {}).items():
+            o = old.get(section, {}).get(name)
+            if not o:
+                continue
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+                if metric not in n or not o.get(metric):
+                    continue
+                change = (n[metric] - o[metric]) / o[metric]
+                worse = change < -tolerance if metric == "rps" else change > tolerance
+                flag = "  <-- regression" if worse else ""
+                print(f"{section[:-1] + ':' + name:28s} {metric:7s} {o[metric]:>10.1f} {n[metric]:>10.1f} "
+                      f"{change:>+7.0%}{flag}")
+                if worse:
+                    regressions.append(f"{name} {metric}")
+    return regressions
+
+
+def print_report(res: dict):
+    for section in ("endpoints", "stages"):
+        print(section)
+        for name, s in res[section].items():
+            rps = f"{s['rps']:>8.1f}/s" if "rps" in s else " " * 10
+            print(f"  {name:20s} n={s['count']:<6d} err={s['errors']:<4d} 429={s.get('rejected', 0):<4d} {rps}  "
+                  f"p50 {s['p50_ms']:>8.1f}  p95 {s['p95_ms']:>8.1f}  p99 {s['p99_ms']:>8.1f} ms")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load test signup/login/chat against stubbed LLM + Neo4j")
+    ap.add_argument("--url", help="target an already running API instead of starting one")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--chats-per-user", type=int, default=5)
+    ap.add_argument("--llm-latency-ms", type=float, default=300, help="median stub LLM latency")
+    ap.add_argument("--llm-jitter", type=float, default=0.4, help="lognormal sigma, 0 = fixed latency")
+    ap.add_argument("--answer-words", type=int, default=120)
+    ap.add_argument("--memories", type=int, default=2, help="memories per stub LLM response")
+    ap.add_argument("--llm-error-rate", type=float, default=0.0)
+    ap.add_argument("--llm-ms-per-token", type=float, default=0.0,
+                    help="stub decode time per output token, makes latency depend on response size")
+    ap.add_argument("--pipeline", choices=("single", "split"), default="single",
+                    help="CHAT_PIPELINE: one answer+memories call, or answer call + concurrent extraction")
+    ap.add_argument("--extractor", choices=("gemini", "groq"), default="gemini", help="extractor for --pipeline split")
+    ap.add_argument("--neo4j-latency-ms", type=float, default=2.0)
+    ap.add_argument("--llm-cache", action="store_true", help="run with the LLM response cache enabled")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="compare against this results JSON, exit 1 on regression")
+    ap.add_argument("--tolerance", type=float, default=0.15)
+    ap.add_argument("--diff", nargs=2, metavar=("OLD", "NEW"), help="only compare two results files")
+    args = ap.parse_args(argv)
+
+    if args.diff:
+        old, new = (json.loads(Path(p).read_text()) for p in args.diff)
+        sys.exit(1 if compare(old, new, args.tolerance) else 0)
+
+    stub_cfg = StubConfig(args.llm_latency_ms, args.llm_jitter, args.answer_words, args.memories,
+                          args.llm_error_rate, ms_per_token=args.llm_ms_per_token)
+    proc = None
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            if args.url:
+                url = args.url
+            else:
+                stub, stub_url = start_stub(stub_cfg)
+                proc, url = start_api(stub_url, tmp, args.neo4j_latency_ms, args.llm_cache, args.pipeline,
+                                      args.extractor)
+            t0 = time.perf_counter()
+            res = asyncio.run(run_load(url, args.users, args.chats_per_user, args.concurrency))
+            total = time.perf_counter() - t0
+        finally:
+            if proc:
+                proc.terminate()
+                proc.wait(timeout=30)
+
+    res["meta"] = {"git_rev": _git_rev(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "seconds": round(total, 2),
+                   "args": {k: v for k, v in vars(args).items() if k not in ("diff", "out", "baseline")}}
+    print_report(res)
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(res, indent=2))
+    if args.baseline:
+        regressions = compare(json.loads(Path(args.baseline).read_text()), res, args.tolerance)
+        if regressions:
+            print("regressed:", ", ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
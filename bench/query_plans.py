@@ -0,0 +1,185 @@
+import argparse
+import json
+import random
+import sys
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from neo4j import GraphDatabase
+from backend import neo4j_client as nc
+from backend.config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD
+from backend.entities import TAXONOMY, taxonomy_rows
+from backend.lifecycle import kind_ttl_seconds
+from backend.memory import make_memory
+from backend.schema import migrate
+
+# PROFILEs every *_QUERY in backend/neo4j_client.py against a seeded graph and
+# fails (exit 1) when a query's db hits go over its budget, or when a per-user
+# query falls back to scanning every Memory node.
+#   python bench/query_plans.py --users 50 --memories 400
+# Point NEO4J_URI at a scratch database: seeding writes real nodes (tagged
+# source="bench"), each query runs in a transaction that is rolled back, and
+# --cleanup removes the seed afterwards.
+#
+# A new query constant without an entry in CASES fails the run, so the budget
+# table can't silently fall behind the client.
+
+KINDS = ["fact", "goal", "preference", "weakness", "strength", "constraint"]
+SCANS = {"AllNodesScan", "NodeByLabelScan"}
+N_NEW = 5  # rows per write-query batch
+N_IDS = 5
+SKILLS = sorted({s for skills in TAXONOMY.values() for s in skills})
+
+# name -> (params(seed), budget(users, memories_per_user), label scan allowed)
+CASES = {
+    "ENSURE_USER_QUERY": (lambda s: {"user_id": s["user_id"], "username": "bench"},
+                          lambda u, m: 50, False),
+    "ADD_MEMORIES_QUERY": (lambda s: {"user_id": s["user_id"], "memories": s["new"]},
+                           lambda u, m: 60 * N_NEW, False),
+    "IMPORT_MEMORIES_QUERY": (lambda s: {"rows": [dict(r, user_id=s["user_id"]) for r in s["new"]]},
+                              lambda u, m: 80 * N_NEW, False),
+    "GET_MEMORIES_QUERY": (lambda s: {"user_id": s["user_id"], "limit": 10},
+                           lambda u, m: 200, False),
+    "SEARCH_MEMORIES_QUERY": (lambda s: {"user_id": s["user_id"], "embedding": s["embedding"], "limit": 12,
+                                         "kind_ttls": kind_ttl_seconds()},
+                              lambda u, m: 100 + 25 * m, False),
+    # per-user cost only: a skill mentioned by every seeded user must not show up in the budget
+    "GRAPH_SEARCH_MEMORIES_QUERY": (lambda s: {"user_id": s["user_id"], "embedding": s["embedding"],
+                                               "entity_keys": ["skill:indexing", "company:google"], "limit": 12,
+                                               "graph_weight": 0.3, "near_weight": 0.5,
+                                               "kind_ttls": kind_ttl_seconds()},
+                                    lambda u, m: 2000 + 45 * m, False),
+    "LINK_ENTITIES_QUERY": (lambda s: {"rows": [{"memory_id": i, "key": "skill:sql", "type": "skill", "name": "sql"}
+                                                for i in s["ids"]]},
+                            lambda u, m: 60 * N_IDS, False),
+    "SYNC_TAXONOMY_QUERY": (lambda s: {"rows": taxonomy_rows()},
+                            lambda u, m: 60 * len(taxonomy_rows()), False),
+    "USER_MEMORIES_QUERY": (lambda s: {"user_id": s["user_id"], "limit": 1000},
+                            lambda u, m: 100 + 30 * min(m, 1000), False),
+    "MERGE_MEMORIES_QUERY": (lambda s: {"rows": [{"memory_id": i, "confidence": 0.9} for i in s["ids"]]},
+                             lambda u, m: 40 * N_IDS, False),
+    "COMPACT_MEMORIES_QUERY": (lambda s: {"groups": [{"keep": s["ids"][0], "drop": s["ids"][1:3],
+                                                      "confidence": 0.9, "seen_count": 3}]},
+                               lambda u, m: 200, False),
+    "LIST_USERS_QUERY": (lambda s: {"after": "", "limit": 100},
+                         lambda u, m: 50 + 5 * min(u, 100), False),
+    "TOUCH_MEMORIES_QUERY": (lambda s: {"rows": [{"memory_id": i, "count": 1} for i in s["ids"]]},
+                             lambda u, m: 40 * N_IDS, False),
+    "DELETE_MEMORIES_QUERY": (lambda s: {"memory_ids": s["ids"]},
+                              lambda u, m: 40 * N_IDS, False),
+    "RESTORE_MEMORIES_QUERY": (lambda s: {"user_id": s["user_id"], "rows": s["new"]},
+                               lambda u, m: 100 * N_NEW, False),
+    # maintenance sweep over the whole store, scanning is the point
+    "MISSING_EMBEDDINGS_QUERY": (lambda s: {"limit": 1000},
+                                 lambda u, m: 10 + 3 * u * m, True),
+    "MISSING_FINGERPRINTS_QUERY": (lambda s: {"limit": 1000},
+                                   lambda u, m: 10 + 4 * u * m, True),
+    "SET_FINGERPRINTS_QUERY": (lambda s: {"rows": [{"memory_id": i, "text_hash": "0" * 16, "simhash": 0,
+                                                    "embedding": s["embedding"]} for i in s["ids"]]},
+                               lambda u, m: 50 * N_IDS, False),
+    "SET_EMBEDDINGS_QUERY": (lambda s: {"rows": [{"memory_id": i, "embedding": s["embedding"]} for i in s["ids"]]},
+                             lambda u, m: 40 * N_IDS, False),
+}
+
+
+def query_constants() -> dict[str, str]:
+    return {k: v for k, v in vars(nc).items() if k.endswith("_QUERY") and isinstance(v, str)}
+
+
+def _walk(plan):
+    yield plan
+    for child in plan.get("children") or []:
+        yield from _walk(child)
+
+def db_hits(profile: dict) -> int:
+    return sum(p.get("dbHits", 0) for p in _walk(profile))
+
+def operators(plan: dict) -> set[str]:
+    # operatorType carries a planner suffix like "NodeByLabelScan@neo4j"
+    return {p.get("operatorType", "").split("@")[0] for p in _walk(plan)}
+
+
+def seed(driver, users: int, memories: int) -> dict:
+    user_ids = [f"bench-{uuid.uuid4().hex[:12]}" for _ in range(users)]
+    rows = []
+    for uid in user_ids:
+        for i in range(memories):
+            skill = random.choice(SKILLS)
+            m = make_memory(f"bench memory {i}: working on {skill} for topic {random.randint(0, 50)}",
+                            kind=random.choice(KINDS), source="bench", confidence=round(random.random(), 2))
+            rows.append(dict(m, user_id=uid))
+    with driver.session() as s:
+        s.execute_write(nc._write, nc.SYNC_TAXONOMY_QUERY, rows=taxonomy_rows())
+        for i in range(0, len(rows), 5000):
+            batch = rows[i:i + 5000]
+            s.execute_write(nc._write_all, nc._with_links(nc.IMPORT_MEMORIES_QUERY,
+                                                          {"rows": [nc._import_row(r) for r in batch]}, batch))
+    target = user_ids[0]
+    ids = [r["memory_id"] for r in rows if r["user_id"] == target][:N_IDS]
+    new = [nc._memory_params(make_memory(f"new bench memory {i}", kind="fact", source="bench"))
+           for i in range(N_NEW)]
+    return {"user_ids": user_ids, "user_id": target, "ids": ids, "new": new,
+            "embedding": nc._memory_params(make_memory("topic", kind="fact", source="bench"))["embedding"]}
+
+def cleanup(driver, user_ids: list[str]):
+    with driver.session() as s:
+        s.run("""
+        MATCH (u:User) WHERE u.user_id IN $user_ids
+        OPTIONAL MATCH (u)-[:HAS_MEMORY]->(m:Memory)
+        DETACH DELETE u, m
+        """, user_ids=user_ids).consume()
+
+
+def profile(driver, query: str, params: dict) -> tuple[int, set[str]]:
+    with driver.session() as s:
+        tx = s.begin_transaction()
+        try:
+            summary = tx.run("PROFILE " + query, **params).consume()
+        finally:
+            tx.rollback()
+    return db_hits(summary.profile), operators(summary.profile)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PROFILE every Neo4jClient query against a db-hits budget")
+    ap.add_argument("--users", type=int, default=50)
+    ap.add_argument("--memories", type=int, default=400, help="memories per seeded user")
+    ap.add_argument("--cleanup", action="store_true", help="delete the seeded users afterwards")
+    ap.add_argument("--json", help="also write results to this file")
+    args = ap.parse_args(argv)
+
+    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+    failures = []
+    results = {}
+    try:
+        migrate(driver)
+        s = seed(driver, args.users, args.memories)
+        try:
+            for name, query in sorted(query_constants().items()):
+                if name not in CASES:
+                    failures.append(f"{name}: no entry in CASES")
+                    continue
+                params, budget, scan_ok = CASES[name]
+                hits, ops = profile(driver, query, params(s))
+                limit = budget(args.users, args.memories)
+                scans = sorted(ops & SCANS)
+                ok = hits <= limit and (scan_ok or not scans)
+                results[name] = {"db_hits": hits, "budget": limit, "scans": scans, "ok": ok}
+                print(f"{'ok  ' if ok else 'FAIL'} {name:28s} {hits:>9d} / {limit:<9d} {' '.join(scans)}")
+                if not ok:
+                    failures.append(name)
+        finally:
+            if args.cleanup:
+                cleanup(driver, s["user_ids"])
+    finally:
+        driver.close()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if failures:
+        print("over budget:", ", ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Runs the API with FakeNeo4jClient in place of the real driver, for load tests.
+# LLM endpoints come from the environment (GROQ_URL etc.); bench/load_test.py
+# starts this with everything pointed at bench/stub_llm.py.
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Serve backend.main against an in-memory Neo4j")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--neo4j-latency-ms", type=float, default=2.0)
+    ap.add_argument("--auth-db", help="sqlite path for users (default: the repo's auth.db)")
+    ap.add_argument("--real-neo4j", action="store_true", help="keep the real client (NEO4J_URI), e.g. to time boot")
+    args = ap.parse_args(argv)
+
+    import uvicorn
+    import backend.auth as auth
+    import backend.main as app_main
+    from bench.fake_neo4j import FakeNeo4jClient
+
+    if args.auth_db:
+        auth.AUTH_DB_PATH = Path(args.auth_db)
+    if not args.real_neo4j:
+        app_main.neo = FakeNeo4jClient(latency_ms=args.neo4j_latency_ms)
+        app_main.writer.neo = app_main.neo
+    uvicorn.run(app_main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
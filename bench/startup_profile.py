@@ -0,0 +1,112 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import httpx
+from bench.load_test import _free_port
+
+# How long a worker takes to come up, and where that time goes.
+#   python bench/startup_profile.py --runs 5
+#       imports: `python -X importtime -c "import backend.main"` in fresh processes,
+#                self time summed per top-level package (median over runs)
+#       boot:    starts bench/serve_stubbed.py and times the first 200 from /health/live
+#                and /health/ready, plus the server's own "startup" report from /stats
+#   python bench/startup_profile.py --real-neo4j
+#       boots against NEO4J_URI instead of the in-memory fake; with NEO4J_URI pointing
+#       at nothing, /health/live should still answer right away and /health/ready say 503
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_profile(runs: int) -> dict:
+    per_pkg: dict[str, list[float]] = {}
+    totals = []
+    env = dict(os.environ, HASH_WORKERS="0", PYTHONPATH=str(ROOT))
+    for _ in range(runs):
+        err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import backend.main"], cwd=ROOT, env=env,
+                             capture_output=True, text=True, check=True).stderr
+        run: dict[str, float] = {}
+        for m in _LINE.finditer(err):
+            self_us, cum_us, _, name = m.groups()
+            pkg = name.split(".")[0]
+            if pkg == "backend":
+                pkg = name  # our own modules one by one
+            run[pkg] = run.get(pkg, 0.0) + int(self_us) / 1000
+            if name == "backend.main":
+                totals.append(int(cum_us) / 1000)
+        for pkg, ms in run.items():
+            per_pkg.setdefault(pkg, []).append(ms)
+    med = {pkg: sorted(v)[len(v) // 2] for pkg, v in per_pkg.items()}
+    return {"backend.main_ms": sorted(totals)[len(totals) // 2],
+            "by_package_ms": dict(sorted(((k, round(v, 1)) for k, v in med.items()), key=lambda kv: -kv[1]))}
+
+
+def boot_profile(real_neo4j: bool, timeout: float) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SESSION_DB_PATH=str(Path(tmp) / "sessions.db"),
+                   LLM_CACHE_PATH=str(Path(tmp) / "llm_cache.db"), CONVERSATION_DIR=str(Path(tmp) / "conversations"),
+                   MEMORY_ARCHIVE_DIR=str(Path(tmp) / "archive"), PYTHONPATH=str(ROOT))
+        cmd = [sys.executable, str(ROOT / "bench" / "serve_stubbed.py"), "--port", str(port),
+               "--auth-db", str(Path(tmp) / "auth.db")]
+        if real_neo4j:
+            cmd.append("--real-neo4j")
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL)
+        res = {"live_s": None, "ready_s": None}
+        try:
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline and res["ready_s"] is None:
+                if proc.poll() is not None:
+                    raise RuntimeError(f"API process exited with {proc.returncode}")
+                for key, path in (("live_s", "/health/live"), ("ready_s", "/health/ready")):
+                    if res[key] is None:
+                        try:
+                            if httpx.get(url + path, timeout=1).status_code == 200:
+                                res[key] = round(time.perf_counter() - t0, 3)
+                        except httpx.HTTPError:
+                            pass
+                time.sleep(0.02)
+            if res["live_s"] is not None:
+                res["server"] = httpx.get(url + "/stats", timeout=5).json()["startup"]
+        finally:
+            proc.terminate()
+            proc.wait()
+    return res
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import-time and boot-time profile of the API")
+    ap.add_argument("--runs", type=int, default=5, help="fresh interpreters for the import profile")
+    ap.add_argument("--top", type=int, default=15, help="packages shown")
+    ap.add_argument("--real-neo4j", action="store_true", help="boot against NEO4J_URI instead of the fake")
+    ap.add_argument("--timeout", type=float, default=30, help="seconds to wait for /health/ready")
+    ap.add_argument("--out", help="write results JSON here")
+    args = ap.parse_args(argv)
+
+    imports = import_profile(args.runs)
+    boot = boot_profile(args.real_neo4j, args.timeout)
+
+    print(f"import backend.main  {imports['backend.main_ms']:.0f} ms (median of {args.runs})")
+    for pkg, ms in list(imports["by_package_ms"].items())[:args.top]:
+        print(f"  {pkg:32s} {ms:>8.1f} ms")
+    print(f"boot  live {boot['live_s']} s  ready {boot['ready_s']} s")
+    server = boot.get("server") or {}
+    for name, st in server.get("stages", {}).items():
+        print(f"  {name:32s} {st['s'] * 1000:>8.1f} ms  {st.get('status')}  attempts {st['attempts']}")
+    if server.get("errors"):
+        print("  not ready:", json.dumps(server["errors"]))
+    if args.out:
+        Path(args.out).write_text(json.dumps({"imports": imports, "boot": boot}, indent=2))
+
+if __name__ == "__main__":
+    main()
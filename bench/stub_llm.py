@@ -0,0 +1,133 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Local stand-in for the Groq (OpenAI-style) and Gemini endpoints with a configurable
+# latency distribution and response size. Used by bench/load_test.py; can also be
+# run on its own and pointed at with GROQ_URL / GEMINI_URL.
+#   python bench/stub_llm.py --port 8099 --latency-ms 400 --jitter 0.5
+
+WORDS = ("index", "cache", "latency", "queue", "shard", "replica", "btree", "hash", "lock", "batch")
+KINDS = ("fact", "goal", "preference", "weakness", "strength", "constraint")
+
+
+class StubConfig:
+    def __init__(self, latency_ms: float = 300, jitter: float = 0.4, answer_words: int = 120,
+                 memories: int = 2, error_rate: float = 0.0, stream_chunk: int = 8, ms_per_token: float = 0.0):
+        self.latency_ms = latency_ms
+        self.ms_per_token = ms_per_token  # decode time per output token (~4 chars), on top of latency_ms
+        self.jitter = jitter            # sigma of the lognormal around latency_ms (0 = fixed)
+        self.answer_words = answer_words
+        self.memories = memories
+        self.error_rate = error_rate
+        self.stream_chunk = stream_chunk
+
+    def delay(self) -> float:
+        if self.latency_ms <= 0:
+            return 0.0
+        if self.jitter <= 0:
+            return self.latency_ms / 1000
+        # lognormal with median latency_ms: long right tail like a real provider
+        return random.lognormvariate(0, self.jitter) * self.latency_ms / 1000
+
+    def content(self, prompt: str = "") -> str:
+        # shape follows the prompt's contract: conversation summary, extraction-only,
+        # answer-only (split pipeline) or the combined answer + memories object
+        if "running summary of a conversation" in prompt:
+            return json.dumps({"summary": "The user " + " ".join(random.choice(WORDS) for _ in range(40))})
+        extract = "You extract long-term memory" in prompt
+        out = {}
+        if not extract:
+            out["answer"] = " ".join(random.choice(WORDS) for _ in range(self.answer_words))
+        if extract or '"memories"' in prompt or not prompt:
+            out["memories"] = [{"text": f"I am studying {random.choice(WORDS)} {random.randint(0, 999)}",
+                                "kind": random.choice(KINDS), "confidence": round(random.uniform(0.6, 1.0), 2)}
+                               for _ in range(self.memories)]
+        return json.dumps(out)
+
+    def decode_time(self, content: str) -> float:
+        return self.ms_per_token * (len(content) // 4) / 1000
+
+
+def _handler(cfg: StubConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _json(self, status: int, data: dict):
+            out = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            time.sleep(cfg.delay())
+            if cfg.error_rate and random.random() < cfg.error_rate:
+                return self._json(503, {"error": "stub overloaded"})
+
+            if "generateContent" in self.path:
+                prompt = body["contents"][0]["parts"][0]["text"]
+            else:
+                prompt = body["messages"][-1]["content"]
+            content = cfg.content(prompt)
+            if not body.get("stream"):
+                time.sleep(cfg.decode_time(content))
+            if "generateContent" in self.path:
+                return self._json(200, {"candidates": [{"content": {"parts": [{"text": content}]}}],
+                                        "usageMetadata": {"promptTokenCount": 400, "candidatesTokenCount": 200}})
+            usage = {"prompt_tokens": 400, "completion_tokens": len(content) // 4}
+            if not body.get("stream"):
+                return self._json(200, {"choices": [{"message": {"content": content}}], "usage": usage})
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i in range(0, len(content), cfg.stream_chunk):
+                time.sleep(cfg.decode_time(content[i:i + cfg.stream_chunk]))
+                chunk = {"choices": [{"delta": {"content": content[i:i + cfg.stream_chunk]}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(f"data: {json.dumps({'choices': [], 'x_groq': {'usage': usage}})}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+
+    return Handler
+
+
+def start(cfg: StubConfig, port: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    srv = ThreadingHTTPServer(("127.0.0.1", port), _handler(cfg))
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_port}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stub LLM server")
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--latency-ms", type=float, default=300)
+    ap.add_argument("--jitter", type=float, default=0.4)
+    ap.add_argument("--answer-words", type=int, default=120)
+    ap.add_argument("--memories", type=int, default=2)
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--ms-per-token", type=float, default=0.0)
+    args = ap.parse_args(argv)
+
+    cfg = StubConfig(args.latency_ms, args.jitter, args.answer_words, args.memories, args.error_rate,
+                     ms_per_token=args.ms_per_token)
+    srv, url = start(cfg, args.port)
+    print(f"stub LLM on {url}  (GROQ_URL={url}/openai/v1/chat/completions)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        srv.shutdown()
+
+if __name__ == "__main__":
+    main()
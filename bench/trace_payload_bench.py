@@ -0,0 +1,90 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from backend.llm_groq import parse_answer_and_memories
+from backend.models import ChatResp, MemoryCitation
+from backend.utils import Trace, timed
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Response size and build/serialize cost of a /chat response per trace level.
+#   python bench/trace_payload_bench.py --iterations 5000 --prompt-chars 6000
+# Builds the same trace entries /chat does (stage timings, memory cache and
+# writer stats, groq_io previews) around a realistic LLM result, then serializes
+# the ChatResp with stdlib json, orjson (if installed) and pydantic's own JSON.
+
+
+def _llm_content(answer_chars: int) -> str:
+    answer = ("Index the join columns and check the plan. " * (answer_chars // 44 + 1))[:answer_chars]
+    return json.dumps({"answer": answer, "memories": [
+        {"text": "I am preparing for a backend SDE role", "kind": "goal", "confidence": 0.9}]})
+
+def build_response(level: str, prompt: str, content: str, raw_http: str) -> ChatResp:
+    # mirrors main.chat: detail entries are lambdas, so only "full" builds them
+    trace = Trace(level)
+    trace.detail(lambda: {"stage": "auth_scope", "status": "ok", "user_id": "u" * 36, "session_token_prefix": "abcd1234"})
+    with timed("retrieve_memories", trace):
+        trace.detail(lambda: {"stage": "memory_cache", "status": "hit", "hits": 10, "misses": 2, "hit_rate": 0.83,
+                              "entries": 100, "bytes": 123456, "max_bytes": 67108864, "evictions": 0})
+    with timed("prompt_build", trace):
+        pass
+    trace.detail(lambda: {"stage": "prompt_tokens", "status": "ok", "budget": 2000, "instructions": 180,
+                          "message": 40, "memories": 600, "packed": 12, "dropped": 0, "total": 820})
+    with timed("llm_call_groq", trace):
+        result = parse_answer_and_memories("llama-3.1-8b-instant", prompt, content, raw_http,
+                                           {"prompt_tokens": 820, "completion_tokens": 300}, full_debug=trace.full)
+    dbg = result["debug"]
+    trace.detail(lambda: {"stage": "groq_io", "status": "ok", "provider": "groq", "model": dbg.get("model"),
+                          "usage": dbg.get("usage"), "http_preview_len": len(dbg.get("raw_http_text", "")),
+                          "prompt_preview": dbg.get("prompt", "")[:1200],
+                          "raw_preview": dbg.get("raw_content", "")[:1200]})
+    with timed("store_memories", trace):
+        pass
+    trace.detail(lambda: {"stage": "stored_memories", "status": "ok", "count": 1, "items": result["memories"],
+                          "queued": True, "writer": {"queue_depth": 0, "enqueued": 10, "written": 10}})
+    citations = [MemoryCitation(memory_id=f"{i:08d}-0000-0000-0000-000000000000", snippet="x" * 80, score=0.5)
+                 for i in range(12)]
+    return ChatResp(answer=result["answer"], retrieval_time_ms=3, llm_time_ms=400,
+                    memory_citations=citations, debug_trace=trace.export())
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - t0) / iterations * 1e6
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="debug_trace payload size / serialization cost per trace level")
+    ap.add_argument("--iterations", type=int, default=3000)
+    ap.add_argument("--prompt-chars", type=int, default=6000)
+    ap.add_argument("--answer-chars", type=int, default=1500)
+    args = ap.parse_args(argv)
+
+    prompt = ("- (fact) some remembered detail about the user [id=...]\n" * (args.prompt_chars // 56 + 1))
+    content = _llm_content(args.answer_chars)
+    raw_http = json.dumps({"choices": [{"message": {"content": content}}], "usage": {"prompt_tokens": 820}})
+
+    serializers = {"json": lambda r: json.dumps(r.model_dump()).encode(),
+                   "pydantic": lambda r: r.model_dump_json().encode()}
+    if orjson is not None:
+        serializers["orjson"] = lambda r: orjson.dumps(r.model_dump())
+
+    print(f"{'level':8s} {'bytes':>7s} {'build us':>9s} " + " ".join(f"{k + ' us':>11s}" for k in serializers))
+    for level in ("off", "timings", "full"):
+        resp = build_response(level, prompt, content, raw_http)
+        size = len(resp.model_dump_json())
+        build = _per_call_us(lambda: build_response(level, prompt, content, raw_http), args.iterations)
+        ser = [_per_call_us(lambda f=f: f(resp), args.iterations) for f in serializers.values()]
+        print(f"{level:8s} {size:>7d} {build:>9.1f} " + " ".join(f"{t:>11.1f}" for t in ser))
+
+if __name__ == "__main__":
+    main()
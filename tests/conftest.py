@@ -0,0 +1,7 @@
+import os
+import sys
+from pathlib import Path
+
+# tests import the app's modules directly; nothing here talks to Neo4j, Redis or an LLM
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("HASH_WORKERS", "0")
@@ -0,0 +1,153 @@
+import asyncio
+import math
+import threading
+import time
+from backend.admission import _TAKE_LUA
+
+# In-memory stand-in for a Redis server: the commands our backends use, with EX/EXPIRE
+# expiry on a settable clock and byte-string replies like redis-py without
+# decode_responses. There is no Lua interpreter, so EVAL runs a Python twin of each
+# script we ship (below, line for line), under the same lock as every other command.
+# test_redis_backends.py also runs the backends on fakeredis, which executes the real
+# Lua, when `fakeredis[lua]` is installed.
+
+
+def _b(v) -> bytes:
+    if isinstance(v, bytes):
+        return v
+    if isinstance(v, float):
+        return repr(v).encode()
+    return str(v).encode()
+
+
+class FakeRedis:
+    def __init__(self):
+        self.now = time.time()
+        self.data: dict[str, object] = {}
+        self.expires: dict[str, float] = {}
+        self.lock = threading.RLock()
+        self.scripts = {_TAKE_LUA: _take}
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def _live(self, key: str):
+        if key in self.expires and self.expires[key] <= self.now:
+            self.data.pop(key, None)
+            del self.expires[key]
+        return self.data.get(key)
+
+    def call(self, cmd: str, *args):
+        with self.lock:
+            return getattr(self, "_" + cmd.lower())(*args)
+
+    def _get(self, key):
+        return self._live(key)
+
+    def _set(self, key, value, *opts):
+        self.data[key] = _b(value)
+        self.expires.pop(key, None)
+        if opts and str(opts[0]).upper() == "EX":
+            self.expires[key] = self.now + int(opts[1])
+        return True
+
+    def _del(self, *keys):
+        n = 0
+        for k in keys:
+            if self._live(k) is not None:
+                n += 1
+            self.data.pop(k, None)
+            self.expires.pop(k, None)
+        return n
+
+    def _expire(self, key, seconds):
+        if self._live(key) is None:
+            return 0
+        self.expires[key] = self.now + int(seconds)
+        return 1
+
+    def _hmget(self, key, *fields):
+        h = self._live(key) or {}
+        return [h.get(f) for f in fields]
+
+    def _hset(self, key, *pairs):
+        h = self._live(key)
+        if h is None:
+            h = self.data[key] = {}
+        for f, v in zip(pairs[::2], pairs[1::2]):
+            h[f] = _b(v)
+        return len(pairs) // 2
+
+    def _time(self):
+        return [int(self.now), int((self.now % 1) * 1_000_000)]
+
+    def _eval(self, script, numkeys, *keys_and_args):
+        script_fn = self.scripts.get(script)
+        if script_fn is None:
+            raise NotImplementedError("no Python twin for this script")
+        keys = [str(k) for k in keys_and_args[:numkeys]]
+        argv = [str(a) for a in keys_and_args[numkeys:]]
+        return script_fn(self._in_script, keys, argv)
+
+    def _in_script(self, cmd: str, *args):
+        # redis.call: the lock is already held for the whole script
+        return getattr(self, "_" + cmd.lower())(*args)
+
+
+def _take(call, KEYS, ARGV):
+    rate, burst, cost = float(ARGV[0]), float(ARGV[1]), float(ARGV[2])
+    t = call("TIME")
+    now = t[0] + t[1] / 1000000
+    v = call("HMGET", KEYS[0], "tokens", "ts")
+    tokens = float(v[0]) if v[0] is not None else burst
+    ts = float(v[1]) if v[1] is not None else now
+    tokens = min(burst, tokens + max(0, now - ts) * rate)
+    allowed, wait = 0, 0
+    if tokens >= cost:
+        tokens = tokens - cost
+        allowed = 1
+    else:
+        wait = (cost - tokens) / rate
+    call("HSET", KEYS[0], "tokens", tokens, "ts", now)
+    call("EXPIRE", KEYS[0], math.ceil(burst / rate) + 1)
+    return [allowed, _b(wait)]
+
+
+class SyncClient:
+    # redis.Redis surface used by RedisSessionStore
+    def __init__(self, server: FakeRedis):
+        self.server = server
+
+    def get(self, key):
+        return self.server.call("GET", key)
+
+    def set(self, key, value, ex=None):
+        return self.server.call("SET", key, value, *(("EX", ex) if ex else ()))
+
+    def delete(self, *keys):
+        return self.server.call("DEL", *keys)
+
+    def eval(self, script, numkeys, *keys_and_args):
+        return self.server.call("EVAL", script, numkeys, *keys_and_args)
+
+
+class AsyncClient:
+    # redis.asyncio.Redis surface used by RedisCacheBackend and RedisBucketBackend
+    def __init__(self, server: FakeRedis):
+        self._sync = SyncClient(server)
+
+    async def get(self, key):
+        await asyncio.sleep(0)
+        return self._sync.get(key)
+
+    async def set(self, key, value, ex=None):
+        await asyncio.sleep(0)
+        return self._sync.set(key, value, ex=ex)
+
+    async def delete(self, *keys):
+        await asyncio.sleep(0)
+        return self._sync.delete(*keys)
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        await asyncio.sleep(0)
+        return self._sync.eval(script, numkeys, *keys_and_args)
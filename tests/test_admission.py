@@ -0,0 +1,24 @@
+import asyncio
+from backend import main
+from backend.admission import AdmissionGate
+
+
+def test_background_llm_calls_take_their_own_slot(monkeypatch):
+    # split-mode extraction and summaries count against LLM_MAX_CONCURRENCY like answers do
+    gate = AdmissionGate(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    monkeypatch.setattr(main, "llm_gate", gate)
+    inflight, peak = [0], [0]
+
+    async def provider_call(n):
+        inflight[0] += 1
+        peak[0] = max(peak[0], inflight[0])
+        await asyncio.sleep(0.02)
+        inflight[0] -= 1
+        return n
+
+    async def run():
+        # more callers than queue room: the overflow sleeps out Retry-After instead of failing
+        return await asyncio.gather(*(main._gated(provider_call, n) for n in range(5)))
+
+    assert asyncio.run(run()) == list(range(5))
+    assert peak[0] == 1 and gate.inflight == 0 and gate.admitted == 5
@@ -0,0 +1,74 @@
+import asyncio
+from passlib.hash import pbkdf2_sha256
+from backend import auth
+
+
+def test_login_does_not_wait_for_the_rehash(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "_repo", auth.AuthRepository(tmp_path / "auth.db"))
+    auth.init_auth_db()
+    auth.auth_repo().insert_user("u1", "alice", pbkdf2_sha256.using(rounds=1000).hash("pw"))
+    hasher = auth.PasswordHasher(workers=0, rounds=2000)
+    monkeypatch.setattr(auth, "PASSWORD_HASHER", hasher)
+    release = asyncio.Event()
+    hash_now = hasher.hash
+
+    async def slow_hash(password):
+        await release.wait()
+        return await hash_now(password)
+
+    monkeypatch.setattr(hasher, "hash", slow_hash)
+
+    async def run():
+        assert await auth.verify_user("alice", "pw") == "u1"  # returned with the rehash still pending
+        assert hasher.rehashed == 0 and len(auth._rehash_tasks) == 1
+        release.set()
+        await auth.drain_rehashes(5)
+        assert hasher.rehashed == 1
+        _, stored = auth.auth_repo().get_credentials("alice")
+        assert pbkdf2_sha256.from_string(stored).rounds == 2000
+
+    asyncio.run(run())
+    auth.auth_repo().close()
+
+
+def test_exhausted_pool_is_busy_not_bad_request(tmp_path, monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+    from backend import main
+    from backend.models import SignupReq, LoginReq
+
+    pool = auth.SQLitePool(tmp_path / "auth.db", size=1, busy_timeout_ms=20)
+    with pool.connection():
+        with pytest.raises(auth.AuthDBBusy):
+            with pool.connection():
+                pass
+    pool.close()
+
+    async def busy(*args):
+        raise auth.AuthDBBusy("auth database connection pool exhausted")
+
+    monkeypatch.setattr(main, "create_user", busy)
+    monkeypatch.setattr(main, "verify_user", busy)
+    for call in (main.signup(SignupReq(username="alice", password="password1")),
+                 main.login(LoginReq(username="alice", password="password1"))):
+        with pytest.raises(HTTPException) as e:
+            asyncio.run(call)
+        assert e.value.status_code == 503 and e.value.headers["Retry-After"] == "1"
+
+
+def test_close_does_not_let_the_pool_outgrow_its_size(tmp_path):
+    import sqlite3
+    import pytest
+    pool = auth.SQLitePool(tmp_path / "auth.db", size=2)
+    with pool.connection() as out:
+        with pool.connection():
+            pass
+        pool.close()  # one idle connection closed, `out` still checked out
+        assert pool._created == 1
+    with pytest.raises(sqlite3.ProgrammingError):
+        out.execute("SELECT 1")  # closed on return instead of rejoining the pool
+    assert pool._created == 0 and pool._idle.qsize() == 0
+    with pool.connection(), pool.connection():
+        pass
+    assert pool._created == pool._idle.qsize() == 2
+    pool.close()
@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import random
+from datetime import datetime, timezone
+from bench.fake_neo4j import FakeNeo4jClient
+from backend.consolidation import simhash, plan_writes
+from backend.embeddings import tokenize
+from backend.memory import make_memory
+from backend.memory_writer import MemoryWriter
+
+
+def _reference_simhash(text: str) -> int:
+    # the original bit-by-bit definition; stored simhashes must keep matching it
+    toks = tokenize(text or "")
+    feats = toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])]
+    weights = [0] * 64
+    for f in feats:
+        h = int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    out = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            out |= 1 << bit
+    return out - (1 << 64) if out >= 1 << 63 else out
+
+
+def test_simhash_matches_reference():
+    rng = random.Random(3)
+    words = "i am preparing for system design interviews at google sql joins btree indexing".split()
+    texts = ["", "a", "Hello, world!"] + [" ".join(rng.choices(words, k=rng.randint(1, 40))) for _ in range(500)]
+    for t in texts:
+        assert simhash(t) == _reference_simhash(t), t
+
+
+def test_simhash_golden_values():
+    # stored in Neo4j and compared across workers: must not depend on the host
+    assert simhash("I struggle with SQL joins") == 5323915638969595654
+    assert simhash("I prefer evening study sessions") == -7129311762612585754
+    assert simhash("My interview is in May") == -4437926874812541083
+    assert simhash("") == 0
+
+
+def test_plan_writes_merges_near_duplicate():
+    existing = [dict(make_memory("I struggle with SQL joins", kind="weakness", source="chat"), memory_id="m1")]
+    creates, merges = plan_writes([make_memory("I struggle with sql joins!", kind="weakness", source="chat",
+                                               confidence=0.9)], existing)
+    assert creates == [] and merges == [{"memory_id": "m1", "confidence": 0.9}]
+
+
+def test_writer_persists_fingerprints_of_legacy_nodes():
+    async def run():
+        neo = FakeNeo4jClient()
+        legacy = {"memory_id": "old", "text": "I prefer evening study sessions", "kind": "preference",
+                  "confidence": 0.9, "source": "chat", "created_at": datetime.now(timezone.utc)}
+        neo.memories["u1"] = [legacy]
+        neo.by_id["old"] = legacy
+        writer = MemoryWriter(neo)
+
+        await writer.submit("u1", [make_memory("My interview is in May", kind="fact", source="chat")])
+        assert writer.fingerprinted == 1
+        assert legacy["simhash"] == simhash(legacy["text"]) and legacy["text_hash"]
+
+        await writer.submit("u1", [make_memory("I use Python daily", kind="fact", source="chat")])
+        assert writer.fingerprinted == 1  # stored the first time, not recomputed
+
+    asyncio.run(run())
+
+
+def test_writer_plans_against_copies_of_cached_rows():
+    from backend.memory_cache import MemoryCache, InMemoryCacheBackend
+
+    async def run():
+        cache = MemoryCache(InMemoryCacheBackend())
+        legacy = {"memory_id": "old", "text": "I prefer evening study sessions", "kind": "preference",
+                  "confidence": 0.9, "source": "chat", "created_at": datetime.now(timezone.utc)}
+        await cache.put("u1", [legacy])
+        cached = await cache.peek("u1")
+        before = [dict(m) for m in cached]
+        writer = MemoryWriter(FakeNeo4jClient(), cache=cache)
+        existing = await writer._existing("u1")
+        await asyncio.to_thread(plan_writes, [make_memory("I like graphs", kind="preference", source="chat")],
+                                existing)
+        assert existing[0]["simhash"] is not None  # the copies were fingerprinted
+        assert [dict(m) for m in cached] == before and "simhash" not in cached[0]
+
+    asyncio.run(run())
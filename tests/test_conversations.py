@@ -0,0 +1,30 @@
+import asyncio
+import os
+import threading
+import time
+from backend.conversations import ConversationStore
+
+
+def test_sweep_from_a_thread_alongside_requests(tmp_path):
+    store = ConversationStore(root=tmp_path, max_sessions=8)
+    tokens = [f"token-{i}" for i in range(32)]
+
+    async def run():
+        for t in tokens:
+            await store.append(t, "hello", "hi")
+        old = time.time() - 3600
+        for p in tmp_path.glob("*.jsonl"):
+            os.utime(p, (old, old))
+
+        removed = []
+        sweeper = threading.Thread(target=lambda: removed.extend(store.sweep(ttl=60) for _ in range(200)))
+        sweeper.start()
+        # LRU inserts/evictions on the loop while the sweep pops from another thread
+        while sweeper.is_alive():
+            for t in tokens:
+                await store.context(t)
+        sweeper.join()
+        assert sum(removed) == len(tokens)
+        assert store.stats()["sessions_cached"] <= 8
+
+    asyncio.run(run())
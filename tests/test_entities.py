@@ -0,0 +1,32 @@
+import pytest
+from backend.entities import entity_keys
+
+
+@pytest.mark.parametrize("text, keys", [
+    ("I have an interview at Google next week", ["company:google"]),
+    ("I joined Rivian as an SDE", ["company:rivian"]),
+    ("I work at Acme Corp on payments", ["company:acme"]),
+    ("I joined Stripe Inc. last year, Stripe is great", ["company:stripe"]),
+    ("Practice the STAR method for behavioural rounds", ["skill:star method", "topic:behavioral"]),
+    ("My answers need a clearer STAR structure", ["skill:star method"]),
+    ("building pivot tables in Excel", ["skill:excel"]),
+    ("I joined a C++ study group", ["skill:c++"]),
+])
+def test_extracts(text, keys):
+    assert entity_keys(text) == keys
+
+
+@pytest.mark.parametrize("text", [
+    "I'm not good at English",
+    "my interview is at Monday",
+    "we can meet at Noon on Friday",
+    "she was a star performer",
+    "I want to excel in interviews",
+    "thanks for the swift reply",
+])
+def test_rejects_junk(text):
+    assert entity_keys(text) == []
+
+
+def test_company_name_stops_before_known_skill():
+    assert entity_keys("I grind at Leetcode Hard problems") == ["skill:leetcode"]
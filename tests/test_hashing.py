@@ -0,0 +1,16 @@
+import asyncio
+import multiprocessing
+from backend.hashing import PasswordHasher
+
+
+def test_shutdown_joins_worker_processes():
+    hasher = PasswordHasher(workers=1, rounds=1000)
+
+    async def run():
+        pw_hash = await hasher.hash("hunter22")
+        assert await hasher.verify("hunter22", pw_hash) == (True, False)
+
+    asyncio.run(run())
+    assert multiprocessing.active_children()
+    hasher.shutdown()
+    assert multiprocessing.active_children() == []
@@ -0,0 +1,108 @@
+import threading
+import time
+from backend.lifecycle import append_archive, read_archive, rehydrate
+from backend.memory import make_memory
+
+
+class SlowRestore:
+    # restore_memories blocks until told to go on, to open the rehydrate race window
+    def __init__(self):
+        self.entered = threading.Event()
+        self.go = threading.Event()
+        self.restored = []
+
+    def restore_memories(self, user_id, memories):
+        self.entered.set()
+        self.go.wait(5)
+        self.restored.extend(memories)
+
+
+def test_append_during_rehydrate_is_not_overwritten(tmp_path):
+    root = str(tmp_path)
+    first = make_memory("I like graphs", kind="preference", source="chat")
+    append_archive("u1", [first], root)
+
+    neo = SlowRestore()
+    t = threading.Thread(target=rehydrate, args=(neo, "u1", [first["memory_id"]], root))
+    t.start()
+    assert neo.entered.wait(5)
+
+    late = make_memory("I prefer mornings", kind="preference", source="chat")
+    appender = threading.Thread(target=append_archive, args=("u1", [late], root))
+    appender.start()
+    time.sleep(0.1)
+    assert appender.is_alive()  # waits for the rehydrate's lock
+
+    neo.go.set()
+    t.join(5)
+    appender.join(5)
+    assert [m["memory_id"] for m in neo.restored] == [first["memory_id"]]
+    assert [m["memory_id"] for m in read_archive("u1", root)] == [late["memory_id"]]
+
+
+def test_rehydrate_subset_keeps_rest(tmp_path):
+    root = str(tmp_path)
+    ms = [make_memory(f"memory {i}", kind="fact", source="chat") for i in range(3)]
+    append_archive("u2", ms[:2], root)
+    append_archive("u2", ms[2:], root)
+    neo = SlowRestore()
+    neo.go.set()
+    assert rehydrate(neo, "u2", [ms[1]["memory_id"]], root) == 1
+    assert {m["memory_id"] for m in read_archive("u2", root)} == {ms[0]["memory_id"], ms[2]["memory_id"]}
+
+
+def test_retrieval_queries_leave_out_expired():
+    from backend import neo4j_client as nc
+    from backend.lifecycle import kind_ttl_seconds, DAY
+    from backend.config import MEMORY_KIND_TTLS
+    for query in (nc.SEARCH_MEMORIES_QUERY, nc.GRAPH_SEARCH_MEMORIES_QUERY):
+        assert nc._NOT_EXPIRED in query
+    ttls = kind_ttl_seconds()
+    assert all(ttls[k] == v * DAY for k, v in MEMORY_KIND_TTLS.items() if v is not None)
+    assert not any(k in ttls for k, v in MEMORY_KIND_TTLS.items() if v is None)
+
+
+class PagedUsers:
+    # list_user_ids with LIST_USERS_QUERY's keyset semantics; memories are deleted mid-scan
+    def __init__(self, memories: dict):
+        self.memories = memories
+        self.pages = []
+
+    def list_user_ids(self, after="", limit=100):
+        self.pages.append(after)
+        return sorted(u for u in self.memories if u > after)[:limit]
+
+    def get_memories_with_embeddings(self, user_id, limit=1000):
+        return self.memories[user_id][:limit]
+
+    def delete_memories(self, memory_ids):
+        for uid, ms in self.memories.items():
+            self.memories[uid] = [m for m in ms if m["memory_id"] not in memory_ids]
+
+
+def test_archive_cold_pages_by_last_user_id(monkeypatch):
+    from backend import lifecycle
+    from backend.neo4j_client import LIST_USERS_QUERY
+    assert "SKIP" not in LIST_USERS_QUERY and "u.user_id IS NOT NULL" in LIST_USERS_QUERY
+    archived = []
+    monkeypatch.setattr(lifecycle, "append_archive", lambda uid, ms: archived.append(uid))
+    monkeypatch.setattr(lifecycle, "is_cold", lambda m, now=None: True)
+    neo = PagedUsers({f"u{i}": [make_memory(f"memory {i}", kind="fact", source="chat")] for i in range(5)})
+    invalidated = []
+    stats = lifecycle.archive_cold(neo, batch_users=2, invalidate=invalidated.extend)
+    assert stats == {"users": 5, "archived": 5}
+    assert invalidated == [f"u{i}" for i in range(5)]
+    assert neo.pages == ["", "u1", "u3", "u4"]
+    assert archived == [f"u{i}" for i in range(5)]
+
+
+def test_batch_job_invalidator_drops_shared_cache_keys():
+    import asyncio
+    from fake_redis import FakeRedis, SyncClient, AsyncClient
+    from backend.memory_cache import MemoryCache, RedisCacheBackend, batch_job_invalidator
+    server = FakeRedis()
+    cache = MemoryCache(RedisCacheBackend(AsyncClient(server)))
+    asyncio.run(cache.put("u1", [{"memory_id": "m1", "text": "archived soon"}]))
+    assert batch_job_invalidator("memory") is None  # per-process cache: ages out within MEMORY_CACHE_TTL
+    batch_job_invalidator("redis", client=SyncClient(server))(["u1", "u2"])
+    assert asyncio.run(cache.peek("u1")) is None
@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from backend.llm_providers import CircuitBreaker, LLMProvider, LLMRouter, LLMUnavailable
+
+
+class FlakyProvider(LLMProvider):
+    def __init__(self, name: str, fail: bool = False, delay: float = 0.0):
+        self.name = name
+        self.fail = fail
+        self.delay = delay
+
+    async def complete(self, prompt: str, timeout: float, full_debug: bool = False) -> dict:
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("boom")
+        return {"answer": self.name, "memories": [], "debug": {}}
+
+
+def _half_open(breaker: CircuitBreaker):
+    breaker.record_failure()
+    breaker.opened_at -= breaker.reset_after
+    assert breaker.state == "half_open"
+
+
+def test_cancelled_probe_releases_half_open_slot():
+    async def run():
+        provider = FlakyProvider("groq", delay=10)
+        router = LLMRouter([provider], attempt_timeout=30, hedge=False)
+        breaker = router.breakers["groq"]
+        breaker.failure_threshold = 1
+        _half_open(breaker)
+
+        assert breaker.allow()
+        task = asyncio.create_task(router._call(provider, "hi"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert breaker.state == "half_open"
+        assert breaker.allow()  # a new probe may go out
+
+    asyncio.run(run())
+
+
+def test_hedge_loser_does_not_wedge_breaker():
+    async def run():
+        slow, fast = FlakyProvider("groq", delay=10), FlakyProvider("gemini")
+        router = LLMRouter([slow, fast], attempt_timeout=30, hedge_min_delay=0.01, hedge_max_delay=0.01)
+        router.breakers["groq"].failure_threshold = 1
+        _half_open(router.breakers["groq"])
+
+        result = await router.complete("hi")
+        assert result["provider"] == "gemini"
+        await asyncio.sleep(0.01)  # let the cancelled probe unwind
+        assert router.breakers["groq"].allow()
+
+    asyncio.run(run())
+
+
+def test_single_provider_recovers_after_probe_failure_then_success():
+    async def run():
+        provider = FlakyProvider("groq", fail=True)
+        router = LLMRouter([provider], attempt_timeout=1, retries=0, hedge=False)
+        breaker = router.breakers["groq"]
+        breaker.failure_threshold = 1
+        with pytest.raises(LLMUnavailable):
+            await router.complete("hi")
+        assert breaker.state == "open"
+        breaker.opened_at -= breaker.reset_after
+        provider.fail = False
+        assert (await router.complete("hi"))["answer"] == "groq"
+        assert breaker.state == "closed"
+
+    asyncio.run(run())
@@ -0,0 +1,72 @@
+import asyncio
+from backend.embeddings import embed, cosine, rank_memories, MemoryRows
+from backend.memory_cache import MemoryCache, InMemoryCacheBackend
+
+
+def _memories(texts):
+    # newest-first, like get_memories_with_embeddings
+    return [{"memory_id": f"m{i}", "text": t, "embedding": embed(t)} for i, t in enumerate(texts)]
+
+
+def test_rank_memories_matches_cosine_and_keeps_recency_on_ties():
+    mems = _memories(["I struggle with SQL joins", "system design at google", "SQL joins again", "unrelated"])
+    mems.append({"memory_id": "legacy", "text": "no embedding"})
+    mems.append(dict(mems[0], memory_id="m0-older"))  # same score as m0, older
+    query = embed("sql joins")
+    ranked = rank_memories(MemoryRows(mems), query, limit=len(mems))
+    expected = sorted(mems, key=lambda m: cosine(m.get("embedding"), query), reverse=True)
+    assert [m["memory_id"] for m in ranked] == [m["memory_id"] for m in expected]
+    assert [m["memory_id"] for m in ranked].index("m0") < [m["memory_id"] for m in ranked].index("m0-older")
+    assert all(abs(m["score"] - cosine(m.get("embedding"), query)) < 1e-5 for m in ranked)
+
+
+def test_rank_memories_keep_filters_before_limit():
+    mems = _memories(["sql joins", "sql joins and indexes", "sql", "graphs"])
+    ranked = rank_memories(mems, embed("sql joins"), limit=2, keep=lambda m: m["memory_id"] != "m0")
+    assert [m["memory_id"] for m in ranked] == ["m1", "m2"]
+    assert "score" not in mems[1]  # ranked rows are copies
+
+
+def test_cache_hit_returns_the_same_rows():
+    cache = MemoryCache(InMemoryCacheBackend())
+
+    async def run():
+        await cache.put("u1", _memories(["sql joins"]))
+        first, second = await cache.get("u1"), await cache.get("u1")
+        assert isinstance(first, MemoryRows) and first is second
+
+    asyncio.run(run())
+
+
+def test_put_after_invalidate_is_dropped():
+    cache = MemoryCache(InMemoryCacheBackend())
+
+    async def run():
+        generation = cache.generation("u1")  # reader misses and starts loading
+        stale = _memories(["sql joins"])
+        await cache.invalidate("u1")  # writer persists a new memory meanwhile
+        await cache.put("u1", stale, generation)
+        assert await cache.get("u1") is None and cache.stats()["stale_puts"] == 1
+        await cache.put("u1", stale, cache.generation("u1"))
+        assert await cache.get("u1") == stale
+
+    asyncio.run(run())
+
+
+def test_invalidations_are_forgotten_after_the_window():
+    cache = MemoryCache(InMemoryCacheBackend(), stale_window=0.05)
+
+    async def run():
+        slow = cache.generation("u0")
+        for i in range(1000):
+            await cache.invalidate(f"u{i}")
+        fresh = cache.generation("u1")
+        await asyncio.sleep(0.06)
+        await cache.invalidate("u-late")
+        assert len(cache._invalidated) == 1
+        await cache.put("u1", _memories(["sql"]), fresh)
+        assert await cache.get("u1") is not None
+        await cache.put("u0", _memories(["sql"]), slow)  # started before a forgotten invalidate
+        assert await cache.get("u0") is None and cache.stats()["stale_puts"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,18 @@
+from backend.prompt import truncate_tokens, count_tokens, TRUNCATION_MARK
+
+
+def test_truncate_never_exceeds_budget():
+    text = "I keep mixing up left and right joins in SQL interviews. " * 40
+    mark = count_tokens(TRUNCATION_MARK)
+    for budget in range(0, mark + 10):
+        out, truncated = truncate_tokens(text, budget)
+        assert truncated and count_tokens(out) <= budget
+        if budget <= mark:
+            # no room for the mark: a bare slice of the text, not the mark alone
+            assert TRUNCATION_MARK not in out and text.startswith(out)
+        else:
+            assert out.endswith(TRUNCATION_MARK)
+
+
+def test_short_text_untouched():
+    assert truncate_tokens("short", 50) == ("short", False)
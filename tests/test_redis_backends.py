@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import pytest
+from fake_redis import FakeRedis, SyncClient, AsyncClient
+from backend.admission import RedisBucketBackend, RateLimiter, Overloaded
+from backend.memory_cache import MemoryCache, RedisCacheBackend
+from backend.sessions import RedisSessionStore
+
+
+@pytest.fixture(params=["stand-in", "fakeredis"])
+def sync_redis(request):
+    if request.param == "stand-in":
+        return SyncClient(FakeRedis())
+    fakeredis = pytest.importorskip("fakeredis")
+    return fakeredis.FakeRedis()
+
+
+def test_session_create_revokes_previous_token(sync_redis):
+    store = RedisSessionStore(sync_redis, ttl=60)
+    first = store.create("u1")
+    second = store.create("u1")
+    assert store.get(first) is None and store.get(second) == "u1"
+    assert store.get("no-such-token") is None
+
+
+def test_session_expires():
+    server = FakeRedis()
+    store = RedisSessionStore(SyncClient(server), ttl=60)
+    token = store.create("u1")
+    server.advance(61)
+    assert store.get(token) is None
+
+
+def test_concurrent_logins_leave_one_live_token(sync_redis):
+    store = RedisSessionStore(sync_redis, ttl=60)
+    for _ in range(20):
+        start = threading.Barrier(8)
+        tokens = []
+
+        def login():
+            start.wait()
+            tokens.append(store.create("u1"))
+
+        threads = [threading.Thread(target=login) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sum(store.get(t) == "u1" for t in tokens) == 1
+
+
+def test_session_revoke(sync_redis):
+    store = RedisSessionStore(sync_redis, ttl=60)
+    token = store.create("u1")
+    store.revoke(token)
+    assert store.get(token) is None
+
+
+def test_redis_cache_round_trip_and_invalidate():
+    server = FakeRedis()
+    cache = MemoryCache(RedisCacheBackend(AsyncClient(server), ttl=30))
+    memories = [{"memory_id": "m1", "text": "sql joins", "embedding": [0.6, 0.8]}]
+
+    async def run():
+        await cache.put("u1", memories, cache.generation("u1"))
+        assert await cache.get("u1") == memories
+        await cache.invalidate("u1")
+        assert await cache.get("u1") is None
+        await cache.put("u1", memories)
+        server.advance(31)
+        assert await cache.get("u1") is None
+
+    asyncio.run(run())
+
+
+def test_redis_bucket_limits_and_refills():
+    server = FakeRedis()
+    limiter = RateLimiter(RedisBucketBackend(AsyncClient(server)), user_rate=1.0, user_burst=2, global_rate=0)
+
+    async def run():
+        await limiter.check("u1")
+        await limiter.check("u1")
+        with pytest.raises(Overloaded) as e:
+            await limiter.check("u1")
+        assert e.value.reason == "user_rate" and 0 < e.value.retry_after <= 1
+        await limiter.check("u2")  # buckets are per user
+        server.advance(1.0)
+        await limiter.check("u1")
+
+    asyncio.run(run())
+
+
+def test_take_lua_on_real_redis_semantics():
+    # the shipped _TAKE_LUA itself, run by fakeredis' embedded Lua
+    pytest.importorskip("lupa")
+    fakeredis = pytest.importorskip("fakeredis")
+    limiter = RateLimiter(RedisBucketBackend(fakeredis.FakeAsyncRedis()), user_rate=0.5, user_burst=2,
+                          global_rate=0)
+
+    async def run():
+        await limiter.check("u1")
+        await limiter.check("u1")
+        with pytest.raises(Overloaded) as e:
+            await limiter.check("u1")
+        assert e.value.reason == "user_rate" and 0 < e.value.retry_after <= 2
+        await limiter.check("u2")
+
+    asyncio.run(run())
+
+
+def test_redis_cache_on_fakeredis():
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = MemoryCache(RedisCacheBackend(fakeredis.FakeAsyncRedis(), ttl=30))
+    memories = [{"memory_id": "m1", "text": "sql joins", "embedding": [0.6, 0.8]}]
+
+    async def run():
+        await cache.put("u1", memories, cache.generation("u1"))
+        assert await cache.get("u1") == memories
+        await cache.invalidate("u1")
+        assert await cache.get("u1") is None
+
+    asyncio.run(run())
@@ -0,0 +1,12 @@
+from backend.sessions import MemorySessionStore
+
+
+def test_relogins_and_revokes_keep_the_expiry_heap_bounded():
+    store = MemorySessionStore(ttl=3600)
+    for i in range(5000):
+        token = store.create(f"u{i % 10}")
+        if i % 3 == 0:
+            store.revoke(token)
+    assert store.count() <= 10
+    assert len(store._expiry) <= 2 * store.count() + 65
+    assert {t for _, t in store._expiry} >= set(store._sessions)
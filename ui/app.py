@@ -1,3 +1,4 @@
+import json
 import streamlit as st
 import requests
 
@@ -81,31 +82,80 @@ st.text_area(
     key="msg",
 )
 
+use_stream = st.checkbox("Stream answer (/chat/stream)", value=True, key="use_stream")
+
+def read_sse(resp):
+    # minimal SSE reader: yields (event, data) pairs
+    event, data = "message", []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line == "":
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[6:].strip()
+        elif line.startswith("data:"):
+            data.append(line[5:].strip())
+
 if st.button("Send to /chat", key="chat_btn"):
     if not st.session_state["session_token"]:
         st.error("Login first.")
     else:
-        payload = {"session_token": st.session_state["session_token"], "message": st.session_state["msg"]}
-        r = requests.post(f"{API}/chat", json=payload)
-        st.write("API: POST /chat")
+        # the debug panels below need the full trace (server default is timings only)
+        payload = {"session_token": st.session_state["session_token"], "message": st.session_state["msg"],
+                   "trace": "full"}
+        left, right = st.columns(2)
+
+        if use_stream:
+            r = requests.post(f"{API}/chat/stream", json=payload, stream=True)
+            st.write("API: POST /chat/stream")
+            if r.status_code != 200:
+                st.error(f"Backend error {r.status_code}")
+                st.code(r.text)
+                st.stop()
 
-        try:
-            data = r.json()
-        except Exception:
-            st.error("Backend did not return JSON")
-            st.code(r.text)
-            st.stop()
+            with left:
+                st.markdown("### Answer")
+                answer_box = st.empty()
+
+            data, partial = None, ""
+            for event, body in read_sse(r):
+                if event == "token":
+                    partial += body.get("delta", "")
+                    answer_box.markdown(partial + " ▌")
+                elif event == "done":
+                    data = body
+                elif event == "error":
+                    st.error(body.get("detail", "stream error"))
+                    st.stop()
+
+            if data is None:
+                st.error("Stream ended without a result")
+                st.stop()
+            answer_box.markdown(data.get("answer", ""))
+        else:
+            r = requests.post(f"{API}/chat", json=payload)
+            st.write("API: POST /chat")
+
+            try:
+                data = r.json()
+            except Exception:
+                st.error("Backend did not return JSON")
+                st.code(r.text)
+                st.stop()
+
+            with left:
+                st.markdown("### Answer")
+                st.write(data.get("answer", ""))
 
         # store chat history locally (dev-tool feel)
         st.session_state["chat_log"].append(
             {"user": st.session_state["msg"], "answer": data.get("answer", ""), "raw": data}
         )
 
-        left, right = st.columns(2)
         with left:
-            st.markdown("### Answer")
-            st.write(data.get("answer", ""))
-
             st.markdown("### Timings")
             st.write("retrieval_time_ms:", data.get("retrieval_time_ms"))
             st.write("llm_time_ms:", data.get("llm_time_ms"))